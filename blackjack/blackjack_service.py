@@ -1,15 +1,35 @@
-from typing import Optional
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
 
 from blackjack.entities.deck_schema import StandardBlackjackSchema
 from blackjack.entities.random_wrapper import RandomWrapper
 from blackjack.entities.shoe import Shoe
-from blackjack.entities.state import GraphState
+from blackjack.entities.state import GraphState, Turn
 from blackjack.entities.state_transition_graph import StateTransitionGraph
 from blackjack.ev_calculator import EVCalculator, StateEV
 from blackjack.game import Game
 from blackjack.rules.standard import StandardBlackjackRules
-from blackjack.strategy.strategy import RandomStrategy, StandardDealerStrategy
+from blackjack.strategy.bandit import ActionStatistics, BanditStrategy
+from blackjack.strategy.base import Strategy
+from blackjack.strategy.lookup_table import LookupTableStrategy
+from blackjack.strategy.strategy import (
+    ExploringStrategy,
+    RandomStrategy,
+    StandardDealerStrategy,
+)
+from blackjack.stratification import (
+    Allocation,
+    InitialDealStratum,
+    StratumShare,
+    allocate_rounds,
+    allocation_weights,
+    enumerate_initial_deals,
+    payout_std,
+)
+from blackjack.summary import OutcomeSummary
 from blackjack.turn import state_machine_factory
+from blackjack.turn.action import Action
 
 
 def print_state_transition_graph(graph: StateTransitionGraph) -> None:
@@ -20,6 +40,36 @@ def print_state_transition_graph(graph: StateTransitionGraph) -> None:
                 print(f"    --{action.name}--> {next_state} [count={count}]")
 
 
+def optimal_actions(state_evs: dict[GraphState, StateEV]) -> dict[GraphState, Action]:
+    """The policy implied by EV results: the best action at every player decision."""
+    return {
+        state: state_ev.optimal_action
+        for state, state_ev in state_evs.items()
+        if getattr(state, "turn", None) == Turn.PLAYER and state_ev.optimal_action != Action.NOOP
+    }
+
+
+@dataclass(frozen=True)
+class PolicyIterationResult:
+    strategy: LookupTableStrategy
+    state_evs: dict[GraphState, StateEV]
+    graph: StateTransitionGraph
+    iterations: int
+    converged: bool
+
+
+@dataclass(frozen=True)
+class GraphUpdate:
+    """
+    Results of a chunk of rounds: either just that chunk's transitions, or the graph accumulated so far.
+    """
+
+    graph: StateTransitionGraph
+    rounds: int
+    rounds_played: int
+    total_rounds: int
+
+
 class BlackjackService:
     def __init__(
         self,
@@ -31,15 +81,19 @@ class BlackjackService:
         player_strategy=None,
         dealer_strategy=None,
         shoe: Optional[Shoe] = None,
+        branch_actions: bool = False,
+        num_seats: int = 1,
     ):
         self.output_tracker = output_tracker
         self.deck_schema = deck_schema or StandardBlackjackSchema()
         self.rules = rules or StandardBlackjackRules()
         self.state_machine = state_machine or state_machine_factory.blackjack_state_machine()
         self.player_strategy = player_strategy or RandomStrategy()
-        self.dealer_strategy = dealer_strategy or StandardDealerStrategy()
+        self.dealer_strategy = dealer_strategy or StandardDealerStrategy(self.rules)
         self.shoe = shoe or Shoe(self.deck_schema, num_decks)
         self.num_decks = num_decks
+        self.branch_actions = branch_actions
+        self.num_seats = num_seats
 
     @classmethod
     def create_null(
@@ -53,6 +107,8 @@ class BlackjackService:
         dealer_strategy=None,
         shoe_cards=None,
         choice_responses=None,
+        branch_actions=False,
+        num_seats=1,
     ):
         deck_schema = deck_schema or StandardBlackjackSchema()
         shoe = Shoe.create_null(deck_schema, num_decks, cards=shoe_cards)
@@ -62,7 +118,7 @@ class BlackjackService:
             player_strategy = RandomStrategy(random_wrapper=random_wrapper)
 
         if dealer_strategy is None:
-            dealer_strategy = StandardDealerStrategy()
+            dealer_strategy = StandardDealerStrategy(rules)
 
         return cls(
             num_decks=num_decks,
@@ -73,31 +129,43 @@ class BlackjackService:
             player_strategy=player_strategy,
             dealer_strategy=dealer_strategy,
             shoe=shoe,
+            branch_actions=branch_actions,
+            num_seats=num_seats,
+        )
+
+    def _new_game(self, graph: StateTransitionGraph, num_seats: Optional[int] = None) -> Game:
+        return Game(
+            self.player_strategy,
+            self.shoe,
+            self.rules,
+            self.state_machine,
+            self.dealer_strategy,
+            output_tracker=self.output_tracker,
+            state_transition_graph=graph,
+            branch_actions=self.branch_actions,
+            num_seats=num_seats or self.num_seats,
+            aggregate_rounds=True,
         )
 
     def play_games(
-        self, num_rounds: int = 1, shuffle_between_rounds: bool = True, printable: bool = True
+        self,
+        num_rounds: int = 1,
+        shuffle_between_rounds: bool = True,
+        printable: bool = True,
+        graph: Optional[StateTransitionGraph] = None,
     ) -> StateTransitionGraph:
-        graph = StateTransitionGraph()
+        graph = graph if graph is not None else StateTransitionGraph()
+        # One game plays every round, resetting its players and hands in place instead of allocating new ones
+        game = self._new_game(graph)
 
         for round_num in range(1, num_rounds + 1):
             if printable and num_rounds > 1:
                 print(f"\n=== Round {round_num} ===")
 
-            game = Game(
-                self.player_strategy,
-                self.shoe,
-                self.rules,
-                self.state_machine,
-                self.dealer_strategy,
-                output_tracker=self.output_tracker,
-                state_transition_graph=graph,
-            )
-
             game.play_round()
 
             if printable:
-                print_state_transition_graph(graph)
+                print_state_transition_graph(game.flush())
 
             if shuffle_between_rounds and round_num < num_rounds:
                 self.shoe.shuffle()
@@ -108,8 +176,247 @@ class BlackjackService:
             print("\n=== Summary ===")
             print(f"Total rounds played: {num_rounds}")
 
+        return game.flush()
+
+    def play_summary_games(
+        self, num_rounds: int, shuffle_between_rounds: bool = True, summary: Optional[OutcomeSummary] = None
+    ) -> OutcomeSummary:
+        """
+        Play num_rounds recording only each seat's net payout per initial hand, without building a graph or emitting
+        events. Much faster than play_games when the house edge of the configured strategy is all that is needed.
+        """
+        if self.branch_actions:
+            raise ValueError("Action branching needs the graph, it cannot be used with an outcome summary")
+
+        summary = summary if summary is not None else OutcomeSummary()
+        game = Game(
+            self.player_strategy,
+            self.shoe,
+            self.rules,
+            self.state_machine,
+            self.dealer_strategy,
+            state_transition_graph=StateTransitionGraph(),
+            num_seats=self.num_seats,
+            summary=summary,
+        )
+
+        for round_num in range(1, num_rounds + 1):
+            game.play_round()
+            if shuffle_between_rounds and round_num < num_rounds:
+                self.shoe.shuffle()
+
+        return summary
+
+    def play_games_iter(
+        self,
+        num_rounds: int,
+        chunk_size: int = 1000,
+        shuffle_between_rounds: bool = True,
+        snapshots: bool = False,
+        chunk_seconds: Optional[float] = None,
+    ) -> Iterator[GraphUpdate]:
+        """
+        Play num_rounds and yield an update every chunk_size rounds, or sooner once a chunk has run for chunk_seconds.
+        Each update holds a new graph with only that chunk's transitions, or with snapshots the one accumulated graph,
+        which keeps changing as iteration goes on.
+        """
+        if chunk_size < 1:
+            raise ValueError(f"Chunks need at least one round, got {chunk_size}")
+
+        accumulated: Optional[StateTransitionGraph] = StateTransitionGraph() if snapshots else None
+        played = 0
+
+        while played < num_rounds:
+            graph = accumulated if accumulated is not None else StateTransitionGraph()
+            chunk_rounds = min(chunk_size, num_rounds - played)
+            if chunk_seconds is None:
+                if played and shuffle_between_rounds:
+                    self.shoe.shuffle()
+                self.play_games(
+                    chunk_rounds, shuffle_between_rounds=shuffle_between_rounds, printable=False, graph=graph
+                )
+                rounds = chunk_rounds
+            else:
+                rounds = self._play_timed_chunk(chunk_rounds, chunk_seconds, played, shuffle_between_rounds, graph)
+
+            played += rounds
+            yield GraphUpdate(graph, rounds, played, num_rounds)
+
+    def _play_timed_chunk(
+        self,
+        max_rounds: int,
+        seconds: float,
+        played: int,
+        shuffle_between_rounds: bool,
+        graph: StateTransitionGraph,
+    ) -> int:
+        """Play rounds one at a time until max_rounds or seconds run out, always at least one. Returns rounds played."""
+        game = self._new_game(graph)
+        deadline = time.monotonic() + seconds
+        rounds = 0
+        while rounds < max_rounds and (not rounds or time.monotonic() < deadline):
+            if (played or rounds) and shuffle_between_rounds:
+                self.shoe.shuffle()
+            game.play_round()
+            rounds += 1
+
+        game.flush()
+        return rounds
+
+    def play_stratified_games(
+        self, num_rounds: int, allocation: Allocation = Allocation.PROPORTIONAL, pilot_rounds: int = 10
+    ) -> StateTransitionGraph:
+        """
+        Play rounds stratified by initial deal instead of dealing them at random. Every stratum's transitions are
+        reweighted by its exact probability, so the graph carries the same total mass as num_rounds random rounds.
+        Strata fix a single seat's initial deal, so these rounds are always played with one seat.
+        """
+        share, graph = self.allocate_strata(num_rounds, allocation, pilot_rounds)
+        graph.merge(self.play_stratum_share(share))
         return graph
 
-    def calculate_evs(self, graph: StateTransitionGraph) -> dict[GraphState, StateEV]:
+    def allocate_strata(
+        self, num_rounds: int, allocation: Allocation = Allocation.PROPORTIONAL, pilot_rounds: int = 10
+    ) -> tuple[StratumShare, StateTransitionGraph]:
+        """
+        Allocate a stratified run's rounds across the strata once, for the whole run, so it can be split between
+        workers. Optimal allocation plays its pilot rounds here first. Returns the rounds left to play and the pilot's
+        graph, weighted like the rest.
+        """
+        strata: list[InitialDealStratum] = enumerate_initial_deals(self.deck_schema, self.num_decks)
+        stratum_graphs: list[StateTransitionGraph] = [StateTransitionGraph() for _ in strata]
+        pilot_counts: list[int] = [0] * len(strata)
+
+        if allocation == Allocation.OPTIMAL:
+            if num_rounds < pilot_rounds * len(strata):
+                raise ValueError(
+                    f"Optimal allocation needs at least {pilot_rounds * len(strata)} rounds for its pilot, "
+                    f"got {num_rounds}"
+                )
+
+            for stratum, stratum_graph in zip(strata, stratum_graphs):
+                self._play_stratum(stratum, pilot_rounds, stratum_graph)
+
+            pilot_counts = [pilot_rounds] * len(strata)
+            stds = [payout_std(stratum_graph, self.rules) for stratum_graph in stratum_graphs]
+            round_counts = allocate_rounds(
+                allocation_weights(strata, allocation, stds), num_rounds - sum(pilot_counts), minimum=0
+            )
+        else:
+            round_counts = allocate_rounds(allocation_weights(strata, allocation), num_rounds)
+
+        share = StratumShare(
+            tuple(round_counts),
+            tuple(pilot_count + round_count for pilot_count, round_count in zip(pilot_counts, round_counts)),
+            num_rounds,
+        )
+        graph = StateTransitionGraph()
+        for stratum, stratum_graph, total_count in zip(strata, stratum_graphs, share.total_counts):
+            if total_count:
+                graph.merge(stratum_graph, weight=stratum.probability * num_rounds / total_count)
+
+        return share, graph
+
+    def play_stratum_share(self, share: StratumShare) -> StateTransitionGraph:
+        """Play one share of a stratified run, weighting every stratum by its rounds in the whole run."""
+        strata: list[InitialDealStratum] = enumerate_initial_deals(self.deck_schema, self.num_decks)
+        if len(strata) != len(share.round_counts):
+            raise ValueError(f"The share covers {len(share.round_counts)} strata, but the shoe has {len(strata)}")
+
+        graph = StateTransitionGraph()
+        for stratum, round_count, total_count in zip(strata, share.round_counts, share.total_counts):
+            if not round_count:
+                continue
+
+            stratum_graph = StateTransitionGraph()
+            self._play_stratum(stratum, round_count, stratum_graph)
+            graph.merge(stratum_graph, weight=stratum.probability * share.num_rounds / total_count)
+
+        return graph
+
+    def _play_stratum(self, stratum: InitialDealStratum, num_rounds: int, graph: StateTransitionGraph) -> None:
+        game = self._new_game(graph, num_seats=1)
+        for _ in range(num_rounds):
+            self.shoe.shuffle()
+            self.shoe.stack_top(stratum.deal_order())
+            game.play_round()
+        game.flush()
+
+    def iterate_policy(
+        self, rounds_per_iteration: int, max_iterations: int = 10, exploration_rate: float = 0.05
+    ) -> PolicyIterationResult:
+        """
+        Alternate between simulating with the current policy and deriving an improved one from the EVs, starting
+        from the configured player strategy, until the optimal actions stop changing. Every iteration adds to the
+        same graph, and improved policies keep exploring at exploration_rate so other actions stay sampled.
+        """
+        if max_iterations < 1:
+            raise ValueError(f"Policy iteration needs at least one iteration, got {max_iterations}")
+
+        initial_strategy: Strategy = self.player_strategy
+        graph = StateTransitionGraph()
+        previous_policy: Optional[dict[GraphState, Action]] = None
+
+        try:
+            for iteration in range(1, max_iterations + 1):
+                self.shoe.shuffle()
+                self.play_games(rounds_per_iteration, printable=False, graph=graph)
+                state_evs = self.calculate_evs(graph)
+                strategy = LookupTableStrategy.from_evs(state_evs, rules=self.rules)
+
+                policy = optimal_actions(state_evs)
+                if policy == previous_policy:
+                    return PolicyIterationResult(strategy, state_evs, graph, iteration, converged=True)
+
+                previous_policy = policy
+                self.player_strategy = ExploringStrategy(strategy, exploration_rate)
+        finally:
+            self.player_strategy = initial_strategy
+
+        return PolicyIterationResult(strategy, state_evs, graph, max_iterations, converged=False)
+
+    def play_bandit_games(
+        self,
+        num_rounds: int,
+        refresh_every: int = 1000,
+        exploration: float = 1.0,
+        prior: Optional[ActionStatistics] = None,
+        estimates: Optional[dict[GraphState, dict[Action, float]]] = None,
+        graph: Optional[StateTransitionGraph] = None,
+    ) -> tuple[StateTransitionGraph, ActionStatistics]:
+        """
+        Play rounds with a BanditStrategy, refreshing its action EV estimates from the graph every refresh_every
+        rounds. Returns the graph and the action statistics gathered here, without the prior ones, so statistics
+        from several workers can be merged.
+        """
+        if refresh_every < 1:
+            raise ValueError(f"Bandit estimates must be refreshed at least every round, got {refresh_every}")
+
+        initial_strategy: Strategy = self.player_strategy
+        strategy = BanditStrategy(self.rules, exploration, prior, estimates)
+        graph = graph if graph is not None else StateTransitionGraph()
+        played = 0
+
+        try:
+            self.player_strategy = strategy
+            while played < num_rounds:
+                batch_size = min(refresh_every, num_rounds - played)
+                self.shoe.shuffle()
+                self.play_games(batch_size, printable=False, graph=graph)
+                played += batch_size
+                if played < num_rounds:
+                    strategy.update_estimates(self.calculate_evs(graph))
+        finally:
+            self.player_strategy = initial_strategy
+
+        return graph, strategy.statistics
+
+    def calculate_evs(self, graph: StateTransitionGraph, parallel: int = 1) -> dict[GraphState, StateEV]:
+        calculator = EVCalculator(self.rules)
+        return calculator.calculate_evs(graph, parallel)
+
+    def calculate_evs_from_states(
+        self, states: Iterable[tuple[GraphState, dict[Action, dict[GraphState, float]]]]
+    ) -> dict[GraphState, StateEV]:
         calculator = EVCalculator(self.rules)
-        return calculator.calculate_evs(graph)
+        return calculator.calculate_evs_from_states(states)
@@ -1,97 +1,43 @@
-import concurrent.futures
-import cProfile
 import logging
-import pickle
-import pstats
+import os
 from typing import Optional
 
 import click
 
-from blackjack.blackjack_service import BlackjackService, print_state_transition_graph
-from blackjack.entities.state import GraphState, Turn
-from blackjack.entities.state_transition_graph import StateTransitionGraph
-from blackjack.ev_calculator import StateEV
-from blackjack.turn.action import Action
-
-
-def print_ev_results(state_evs: dict[GraphState, StateEV]) -> None:
-    """Print the EV calculation results in a readable format."""
-    print("\n=== Expected Value Analysis ===")
-
-    for state, state_ev in state_evs.items():
-        if hasattr(state, "turn") and (state.turn != Turn.PLAYER or state_ev.optimal_action == Action.NOOP):
-            continue
-
-        print(f"\nState: {state}")
-        print(f"  Optimal Action: {state_ev.optimal_action.name}")
-        print(f"  Total Count: {state_ev.total_count}")
-        print("  Action EVs:")
-        for action, ev in state_ev.action_evs.items():
-            print(f"    {action.name}: {ev:.8f}")
-
-
-def run_batch(
-    num_decks: int,
-    num_rounds: int,
-    shuffle_between_rounds: bool,
-    printable: bool = True,
-) -> StateTransitionGraph:
-    cli = BlackjackService(num_decks=num_decks)
-
-    return cli.play_games(
-        num_rounds=num_rounds,
-        shuffle_between_rounds=shuffle_between_rounds,
-        printable=printable,
-    )
-
-
-def run_batch_with_args(args):
-    return run_batch(*args)
+# Allocation values, spelled out so that --help and argument errors do not import the simulation
+STRATIFY_CHOICES: list[str] = ["fixed", "proportional", "optimal"]
 
 
-def run_parallel_batches(
-    num_decks: int,
-    num_rounds: int,
-    no_shuffle_between: bool,
-    no_print: bool,
-    parallel: int,
-    main_graph: StateTransitionGraph,
-) -> None:
-    if parallel == 1 or num_rounds == 1:
-        graph = run_batch(num_decks, num_rounds, not no_shuffle_between, not no_print)
-        main_graph.merge(graph)
-        return
-
-    base_batch = num_rounds // parallel
-    remainder = num_rounds % parallel
-    batch_sizes = [base_batch + (1 if i < remainder else 0) for i in range(parallel)]
+def __getattr__(name: str):
+    # Keeps `from blackjack.cli import BlackjackService` working without importing the simulation at startup
+    if name == "BlackjackService":
+        from blackjack.blackjack_service import BlackjackService
 
-    args_list = [(num_decks, batch_size, not no_shuffle_between, False) for batch_size in batch_sizes]
+        return BlackjackService
 
-    with concurrent.futures.ProcessPoolExecutor(max_workers=parallel) as executor:
-        graphs = list(executor.map(run_batch_with_args, args_list))
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    for g in graphs:
-        main_graph.merge(g)
 
+class DefaultCommandGroup(click.Group):
+    """A group that runs its default command when not given a subcommand, so plain simulation runs keep working."""
 
-def import_graph(input_file: Optional[str]) -> StateTransitionGraph:
-    if not input_file:
-        return StateTransitionGraph()
+    def __init__(self, *args, default_command: str, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
 
-    with open(input_file, "rb") as f:
-        return pickle.load(f)
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        if not args or (args[0] not in self.commands and args[0] not in ctx.help_option_names):
+            args = [self.default_command, *args]
 
+        return super().parse_args(ctx, args)
 
-def export_graph(graph: StateTransitionGraph, output_file: Optional[str]) -> None:
-    if not output_file:
-        return
 
-    with open(output_file, "wb") as f:
-        return pickle.dump(graph, f)
+@click.group(cls=DefaultCommandGroup, default_command="run")
+def main() -> None:
+    """Blackjack simulation: `run` (the default) simulates one configuration, `sweep` a grid of them."""
 
 
-@click.command()
+@main.command("run")
 @click.option("--num-decks", default=1, show_default=True, type=click.IntRange(1, 8), help="Number of decks (1-8).")
 @click.option(
     "--num-rounds",
@@ -107,13 +53,99 @@ def export_graph(graph: StateTransitionGraph, output_file: Optional[str]) -> Non
     default=1,
     show_default=True,
     type=click.IntRange(1, 128),
-    help="Number of parallel batches to run.",
+    help="Number of parallel batches to run, and of processes solving the final EVs one dealer upcard each.",
+)
+@click.option(
+    "--chunk-rounds",
+    default=0,
+    show_default=True,
+    type=click.IntRange(0, 1000000000),
+    help="Rounds per parallel work item, merged as each completes (default: one batch per worker).",
+)
+@click.option(
+    "--tree-merge",
+    is_flag=True,
+    help="Merge worker graphs pairwise on the workers instead of one at a time in the parent.",
+)
+@click.option(
+    "--flush-rounds",
+    default=0,
+    show_default=True,
+    type=click.IntRange(0, 1000000000),
+    help="Have parallel workers send their counts to the parent every this many rounds and start afresh.",
+)
+@click.option(
+    "--flush-seconds",
+    default=None,
+    type=click.FloatRange(0, min_open=True),
+    help="Have parallel workers send their counts to the parent at least this often.",
+)
+@click.option(
+    "--spill-entries",
+    default=0,
+    show_default=True,
+    type=click.IntRange(0, 1000000000),
+    help="Keep at most this many transitions in memory, spilling sorted runs to disk and merging them at the end.",
+)
+@click.option(
+    "--summary-only",
+    is_flag=True,
+    help="Skip the graph and only record net payouts per initial hand, printing the house edge of the strategy played.",
 )
 @click.option(
     "--profile",
     is_flag=True,
     help="Enable profiling and save results to profile_results.prof.",
 )
+@click.option(
+    "--seats",
+    default=1,
+    show_default=True,
+    type=click.IntRange(1, 7),
+    help="Number of player seats at the table, sharing the shoe and the dealer's hand.",
+)
+@click.option(
+    "--stratify",
+    default=None,
+    type=click.Choice(STRATIFY_CHOICES),
+    help="Enumerate every initial deal and allocate rounds across them instead of dealing at random.",
+)
+@click.option(
+    "--branch-actions",
+    is_flag=True,
+    help="At every player decision, also play each alternative action on the same remaining cards.",
+)
+@click.option(
+    "--strategy-file",
+    default=None,
+    help="Compiled lookup table strategy file to play the player's hands with (default: random play)",
+)
+@click.option(
+    "--strategy-output-file",
+    default=None,
+    help="File to write the lookup table strategy compiled from the final EVs to",
+)
+@click.option(
+    "--policy-iterations",
+    default=0,
+    show_default=True,
+    type=click.IntRange(0, 1000),
+    help="Run policy iteration for up to this many iterations of --num-rounds each, starting from random play.",
+)
+@click.option(
+    "--exploration-rate",
+    default=0.05,
+    show_default=True,
+    type=click.FloatRange(0, 1),
+    help="Probability of a random action while playing an improved policy during policy iteration.",
+)
+@click.option(
+    "--bandit-epochs",
+    default=0,
+    show_default=True,
+    type=click.IntRange(0, 1000),
+    help="Explore with a UCB bandit per decision state, refreshing its EV estimates after each of this many epochs.",
+)
 @click.option(
     "--graph-output-file",
     default=None,
@@ -124,8 +156,43 @@ def export_graph(graph: StateTransitionGraph, output_file: Optional[str]) -> Non
     default=None,
     help="File to read the starting graph from",
 )
-def main(
-    num_decks, num_rounds, no_shuffle_between, no_print, parallel, profile, graph_output_file, graph_input_file
+@click.option(
+    "--compact",
+    is_flag=True,
+    help="Collapse deterministic NOOP chains in the final graph before exporting it and calculating EVs.",
+)
+@click.option(
+    "--prune-below",
+    default=0,
+    show_default=True,
+    type=click.FloatRange(0),
+    help="When compacting, drop transitions seen fewer times than this, moving their count to the remaining ones.",
+)
+def run(
+    num_decks,
+    num_rounds,
+    no_shuffle_between,
+    no_print,
+    parallel,
+    chunk_rounds,
+    tree_merge,
+    flush_rounds,
+    flush_seconds,
+    spill_entries,
+    summary_only,
+    profile,
+    seats,
+    stratify,
+    branch_actions,
+    strategy_file,
+    strategy_output_file,
+    policy_iterations,
+    exploration_rate,
+    bandit_epochs,
+    graph_output_file,
+    graph_input_file,
+    compact,
+    prune_below,
 ) -> None:
     """Run a blackjack simulation from the command line."""
     logging.basicConfig(level=logging.ERROR if no_print else logging.DEBUG, format="%(message)s")
@@ -134,54 +201,358 @@ def main(
         logging.error("Profiling is not supported with parallel processing (parallel > 1)")
         raise SystemExit(1)
 
+    if seats > 1 and (stratify or branch_actions):
+        logging.error("--stratify and --branch-actions are only supported with a single seat")
+        raise SystemExit(1)
+
+    if (flush_rounds or flush_seconds) and (stratify or tree_merge):
+        logging.error("--flush-rounds and --flush-seconds cannot be combined with --stratify or --tree-merge")
+        raise SystemExit(1)
+
+    if policy_iterations and bandit_epochs:
+        logging.error("--policy-iterations and --bandit-epochs cannot be combined")
+        raise SystemExit(1)
+
+    if (policy_iterations or bandit_epochs) and (
+        seats > 1
+        or stratify
+        or branch_actions
+        or strategy_file
+        or no_shuffle_between
+        or tree_merge
+        or flush_rounds
+        or flush_seconds
+    ):
+        logging.error(
+            "--policy-iterations and --bandit-epochs play a single seat from random play, shuffling between rounds, "
+            "and cannot be combined with --seats, --stratify, --branch-actions, --strategy-file, "
+            "--no-shuffle-between, --tree-merge, --flush-rounds or --flush-seconds"
+        )
+        raise SystemExit(1)
+
+    if spill_entries and (stratify or branch_actions or tree_merge or policy_iterations or bandit_epochs):
+        logging.error(
+            "--spill-entries cannot be combined with --stratify, --branch-actions, --tree-merge, --policy-iterations "
+            "or --bandit-epochs"
+        )
+        raise SystemExit(1)
+
+    if spill_entries and graph_output_file:
+        logging.error("--graph-output-file is not supported with --spill-entries")
+        raise SystemExit(1)
+
+    if prune_below and not compact:
+        logging.error("--prune-below requires --compact")
+        raise SystemExit(1)
+
+    if spill_entries and compact:
+        logging.error("--compact is not supported with --spill-entries")
+        raise SystemExit(1)
+
+    graph_options = (
+        stratify
+        or branch_actions
+        or tree_merge
+        or policy_iterations
+        or bandit_epochs
+        or spill_entries
+        or flush_rounds
+        or flush_seconds
+        or graph_input_file
+        or graph_output_file
+        or strategy_output_file
+        or compact
+    )
+    if summary_only and graph_options:
+        logging.error("--summary-only cannot be combined with options that build, read or write the graph")
+        raise SystemExit(1)
+
+    # Imported here rather than at module level, so that --help and option errors return without loading the
+    # simulation
+    from blackjack.blackjack_service import (
+        BlackjackService,
+        print_state_transition_graph,
+    )
+    from blackjack.compaction import compact_graph
+    from blackjack.entities.spilling_graph import SpillingTransitionGraph
+    from blackjack.entities.state import GraphState
+    from blackjack.entities.state_transition_graph import StateTransitionGraph
+    from blackjack.ev_calculator import StateEV
+    from blackjack.runner import (
+        export_graph,
+        import_graph,
+        print_ev_results,
+        run_bandit_exploration,
+        run_parallel_batches,
+        run_policy_iteration,
+        run_spilling_batches,
+        run_summary_batches,
+    )
+    from blackjack.strategy.lookup_table import LookupTableStrategy
+    from blackjack.summary import OutcomeSummary, print_summary
+
+    spilled_graph: Optional[SpillingTransitionGraph] = None
+    summary: Optional[OutcomeSummary] = None
     try:
         if profile:
+            import cProfile
+
             profiler = cProfile.Profile()
             profiler.enable()
 
         try:
             main_graph: StateTransitionGraph = import_graph(graph_input_file)
-            if not no_print:
+            if not no_print and not summary_only:
                 print("--START INITIAL GRAPH--")
                 print_state_transition_graph(main_graph)
                 print("--END INITIAL GRAPH--")
 
-            run_parallel_batches(
-                num_decks=num_decks,
-                num_rounds=num_rounds,
-                no_shuffle_between=no_shuffle_between,
-                no_print=no_print,
-                parallel=parallel,
-                main_graph=main_graph,
-            )
+            if summary_only:
+                summary = run_summary_batches(
+                    num_decks=num_decks,
+                    num_rounds=num_rounds,
+                    parallel=parallel,
+                    shuffle_between_rounds=not no_shuffle_between,
+                    strategy_file=strategy_file,
+                    num_seats=seats,
+                    chunk_size=chunk_rounds,
+                )
+            elif policy_iterations:
+                iterations = run_policy_iteration(
+                    num_decks=num_decks,
+                    num_rounds=num_rounds,
+                    parallel=parallel,
+                    max_iterations=policy_iterations,
+                    exploration_rate=exploration_rate,
+                    main_graph=main_graph,
+                )
+                logging.info(f"Policy iteration finished after {iterations} iterations")
+            elif bandit_epochs:
+                statistics = run_bandit_exploration(
+                    num_decks=num_decks,
+                    num_rounds=num_rounds,
+                    parallel=parallel,
+                    epochs=bandit_epochs,
+                    main_graph=main_graph,
+                )
+                logging.info(f"Bandit exploration made {sum(statistics.state_counts.values())} decisions")
+            elif spill_entries:
+                spilled_graph = SpillingTransitionGraph(spill_entries)
+                spilled_graph.merge(main_graph)
+                main_graph = StateTransitionGraph()
+                run_spilling_batches(
+                    num_decks=num_decks,
+                    num_rounds=num_rounds,
+                    parallel=parallel,
+                    spilled_graph=spilled_graph,
+                    chunk_size=chunk_rounds or 10000,
+                    shuffle_between_rounds=not no_shuffle_between,
+                    strategy_file=strategy_file,
+                    num_seats=seats,
+                )
+            else:
+                run_parallel_batches(
+                    num_decks=num_decks,
+                    num_rounds=num_rounds,
+                    no_shuffle_between=no_shuffle_between,
+                    no_print=no_print,
+                    parallel=parallel,
+                    main_graph=main_graph,
+                    stratify=stratify,
+                    branch_actions=branch_actions,
+                    strategy_file=strategy_file,
+                    num_seats=seats,
+                    chunk_size=chunk_rounds,
+                    tree_merge=tree_merge,
+                    flush_rounds=flush_rounds,
+                    flush_seconds=flush_seconds,
+                )
         finally:
             if profile:
                 profiler.disable()
 
         if profile:
+            import pstats
+
             stats = pstats.Stats(profiler)
             stats.sort_stats("cumulative")
 
             stats.dump_stats("profile_results.prof")
             print("Profile data saved to: profile_results.prof")
 
+        if summary is not None:
+            print_summary(summary)
+            return
+
+        if compact:
+            main_graph, report = compact_graph(main_graph, prune_below)
+            logging.info(f"Compacted graph: {report}")
+
         export_graph(main_graph, graph_output_file)
 
-        if not no_print:
+        if not no_print and spilled_graph is None:
             print_state_transition_graph(main_graph)
 
         # Calculate and print EV analysis
-        if not no_print:
+        state_evs: Optional[dict[GraphState, StateEV]] = None
+        if not no_print or strategy_output_file:
             try:
                 cli = BlackjackService(num_decks=num_decks)
-                state_evs = cli.calculate_evs(main_graph)
-                print_ev_results(state_evs)
+                if spilled_graph is not None:
+                    state_evs = cli.calculate_evs_from_states(spilled_graph.iter_states_bottom_up())
+                else:
+                    state_evs = cli.calculate_evs(main_graph, parallel)
             except Exception as exc:
                 logging.error(f"Error calculating EV analysis: {exc}")
 
+        if state_evs is not None and not no_print:
+            print_ev_results(state_evs)
+
+        if state_evs is not None and strategy_output_file:
+            LookupTableStrategy.from_evs(state_evs).save(strategy_output_file)
+
     except Exception as exc:
         logging.error(f"Error running blackjack simulation: {exc}")
         raise SystemExit(1)
+    finally:
+        if spilled_graph is not None:
+            spilled_graph.close()
+
+
+@main.command("sweep")
+@click.option(
+    "--num-decks", multiple=True, default=[1], type=click.IntRange(1, 8), help="Number of decks (repeatable)."
+)
+@click.option(
+    "--max-splits", multiple=True, default=[3], type=click.IntRange(0, 8), help="Maximum splits (repeatable)."
+)
+@click.option("--resplit-aces", multiple=True, default=[False], type=bool, help="Allow resplitting aces (repeatable).")
+@click.option(
+    "--play-split-aces", multiple=True, default=[False], type=bool, help="Allow playing split aces (repeatable)."
+)
+@click.option(
+    "--num-rounds",
+    multiple=True,
+    default=[100000],
+    type=click.IntRange(0, 1000000000),
+    help="Number of rounds per configuration (repeatable).",
+)
+@click.option(
+    "--parallel",
+    default=os.cpu_count() or 1,
+    show_default=True,
+    type=click.IntRange(1, 128),
+    help="Number of worker processes shared by all configurations.",
+)
+@click.option(
+    "--chunk-rounds",
+    default=10000,
+    show_default=True,
+    type=click.IntRange(1, 1000000000),
+    help="Rounds per work item.",
+)
+@click.option(
+    "--strategy-file",
+    default=None,
+    help="Compiled lookup table strategy file to play the player's hands with (default: random play)",
+)
+@click.option("--output-file", default=None, help="CSV file to write the results table to")
+def sweep(
+    num_decks, max_splits, resplit_aces, play_split_aces, num_rounds, parallel, chunk_rounds, strategy_file, output_file
+) -> None:
+    """Simulate every combination of the given options on one worker pool and print EVs and house edge per config."""
+    from blackjack.sweep import (
+        expand_grid,
+        format_results_table,
+        run_sweep,
+        write_results_csv,
+    )
+
+    configs = expand_grid(
+        list(num_decks), list(max_splits), list(resplit_aces), list(play_split_aces), list(num_rounds)
+    )
+    results = run_sweep(configs, parallel, chunk_rounds, strategy_file)
+
+    click.echo(format_results_table(results))
+    if output_file:
+        with open(output_file, "w", newline="") as f:
+            write_results_csv(results, f)
+
+
+@main.group("shard")
+def shard() -> None:
+    """Run one simulation across several machines that share a directory."""
+
+
+@shard.command("create")
+@click.argument("directory")
+@click.option("--num-decks", default=1, show_default=True, type=click.IntRange(1, 8), help="Number of decks (1-8).")
+@click.option(
+    "--num-rounds",
+    default=1000000,
+    show_default=True,
+    type=click.IntRange(0, 1000000000000),
+    help="Total number of rounds across all shards.",
+)
+@click.option("--chunk-rounds", default=100000, show_default=True, type=click.IntRange(1), help="Rounds per chunk.")
+@click.option("--seats", default=1, show_default=True, type=click.IntRange(1, 7), help="Number of player seats.")
+@click.option("--strategy-file", default=None, help="Lookup table strategy file, readable by every node.")
+def shard_create(directory, num_decks, num_rounds, chunk_rounds, seats, strategy_file) -> None:
+    """Write the chunk manifest for a sharded run to DIRECTORY."""
+    from blackjack.sharding import ShardCoordinator
+
+    manifest = ShardCoordinator(directory).create_job(num_rounds, chunk_rounds, num_decks, seats, strategy_file)
+    click.echo(f"Created {len(manifest.chunks)} chunks of up to {chunk_rounds} rounds in {directory}")
+
+
+@shard.command("node")
+@click.argument("directory")
+@click.option(
+    "--workers", default=1, show_default=True, type=click.IntRange(1, 128), help="Local node processes to run."
+)
+@click.option(
+    "--lease-seconds",
+    default=300.0,
+    show_default=True,
+    type=click.FloatRange(min=0, min_open=True),
+    help="Claims not refreshed for this long are taken over from nodes presumed dead.",
+)
+@click.option("--wait", is_flag=True, help="Keep polling until every chunk is done, taking over stale claims.")
+def shard_node(directory, workers, lease_seconds, wait) -> None:
+    """Claim and run chunks of the sharded run in DIRECTORY."""
+    from blackjack.sharding import run_local_nodes, run_node
+
+    if workers == 1:
+        finished = run_node(directory, lease_seconds=lease_seconds, wait=wait)
+    else:
+        finished = run_local_nodes(directory, workers, lease_seconds=lease_seconds, wait=wait)
+    click.echo(f"Finished {finished} chunks")
+
+
+@shard.command("reduce")
+@click.argument("directory")
+@click.option("--no-print", is_flag=True, help="Disable printing of the EV results.")
+@click.option("--graph-output-file", default=None, help="File to write the merged graph to")
+@click.option("--strategy-output-file", default=None, help="File to write the compiled lookup table strategy to")
+def shard_reduce(directory, no_print, graph_output_file, strategy_output_file) -> None:
+    """Merge the shards in DIRECTORY and calculate EVs."""
+    from blackjack.blackjack_service import BlackjackService
+    from blackjack.runner import export_graph, print_ev_results
+    from blackjack.sharding import ShardCoordinator, ShardError
+    from blackjack.strategy.lookup_table import LookupTableStrategy
+
+    coordinator = ShardCoordinator(directory)
+    try:
+        graph = coordinator.reduce()
+    except ShardError as exc:
+        raise click.ClickException(str(exc))
+
+    export_graph(graph, graph_output_file)
+    state_evs = BlackjackService(num_decks=coordinator.load_manifest().num_decks).calculate_evs(graph)
+    if not no_print:
+        print_ev_results(state_evs)
+    if strategy_output_file:
+        LookupTableStrategy.from_evs(state_evs).save(strategy_output_file)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,181 @@
+from dataclasses import dataclass
+
+from blackjack.entities.state import GraphState, SplitState, TerminalState
+from blackjack.entities.state_transition_graph import StateTransitionGraph
+from blackjack.turn.action import Action
+
+Transitions = dict[GraphState, dict[Action, dict[GraphState, float]]]
+
+
+@dataclass(frozen=True)
+class CompactionReport:
+    states_before: int
+    edges_before: int
+    states_after: int
+    edges_after: int
+    collapsed_states: int
+    pruned_edges: int
+
+    @property
+    def state_reduction(self) -> float:
+        return 1 - self.states_after / self.states_before if self.states_before else 0.0
+
+    @property
+    def edge_reduction(self) -> float:
+        return 1 - self.edges_after / self.edges_before if self.edges_before else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.states_before} -> {self.states_after} states ({self.state_reduction:.1%} fewer), "
+            f"{self.edges_before} -> {self.edges_after} edges ({self.edge_reduction:.1%} fewer), "
+            f"{self.collapsed_states} states collapsed, {self.pruned_edges} edges pruned"
+        )
+
+
+def count_edges(transitions: Transitions) -> int:
+    return sum(len(next_states) for actions in transitions.values() for next_states in actions.values())
+
+
+def _split_components(transitions: Transitions) -> set[GraphState]:
+    return {
+        component
+        for actions in transitions.values()
+        for next_states in actions.values()
+        for next_state in next_states
+        if isinstance(next_state, SplitState)
+        for component in (next_state.first_hand_state, next_state.second_hand_state)
+    }
+
+
+def _has_only_noop(transitions: Transitions, state: GraphState) -> bool:
+    if isinstance(state, (TerminalState, SplitState)):
+        return True
+    actions = transitions.get(state)
+    return actions is not None and len(actions) == 1 and Action.NOOP in actions
+
+
+def collapse_noop_chains(transitions: Transitions) -> tuple[Transitions, int]:
+    """
+    Point edges into chains of states that lead on by NOOP to a single next state straight at the end of the chain.
+
+    A chain state's EV is the next state's best EV, but an edge reached by another action only gets the best EV among
+    the actions allowed after it. So an edge taken by NOOP, or leading to a chain ending in a state without choices,
+    skips the whole chain, while any other edge keeps the chain's last state in front of the decision. The hand
+    states of a split are never collapsed, since EVCalculator looks them up. Returns the new transitions and how many
+    states were dropped.
+    """
+    protected = _split_components(transitions)
+    links: dict[GraphState, GraphState] = {
+        state: next(iter(actions[Action.NOOP]))
+        for state, actions in transitions.items()
+        if state not in protected and len(actions) == 1 and len(actions.get(Action.NOOP, ())) == 1
+    }
+    has_in_edges = {
+        next_state for actions in transitions.values() for next_states in actions.values() for next_state in next_states
+    }
+
+    ends: dict[GraphState, tuple[GraphState, GraphState]] = {}
+
+    def chain_end(state: GraphState) -> tuple[GraphState, GraphState]:
+        """The chain's last link and the state it leads to."""
+        if state not in ends:
+            next_state = links[state]
+            ends[state] = chain_end(next_state) if next_state in links else (state, next_state)
+        return ends[state]
+
+    compacted: Transitions = {}
+    kept_links: list[GraphState] = []
+
+    def add(state: GraphState, action: Action, next_state: GraphState, count: float) -> None:
+        if next_state in links:
+            last, end = chain_end(next_state)
+            if action == Action.NOOP or _has_only_noop(transitions, end):
+                next_state = end
+            else:
+                next_state = last
+                kept_links.append(last)
+
+        next_states = compacted.setdefault(state, {}).setdefault(action, {})
+        next_states[next_state] = next_states.get(next_state, 0) + count
+
+    for state, actions in transitions.items():
+        # Chain states are only kept as the entry to a decision, or as roots nothing leads to
+        if state in links and state in has_in_edges:
+            continue
+        for action, next_states in actions.items():
+            for next_state, count in next_states.items():
+                add(state, action, next_state, count)
+
+    for link in kept_links:
+        if link not in compacted:
+            compacted[link] = {Action.NOOP: dict(transitions[link][Action.NOOP])}
+
+    return compacted, len(transitions) - len(compacted)
+
+
+def prune_rare_transitions(transitions: Transitions, min_count: float) -> tuple[Transitions, int]:
+    """
+    Drop next states seen fewer than min_count times after an action, spreading their count over the remaining next
+    states in proportion, so every action keeps its total count. The most frequent next state is always kept.
+    States no longer reachable from the graph's roots are dropped too. Returns the new transitions and how many edges
+    were pruned.
+    """
+    pruned_edges = 0
+    pruned: Transitions = {}
+    for state, actions in transitions.items():
+        pruned[state] = {}
+        for action, next_states in actions.items():
+            kept = {next_state: count for next_state, count in next_states.items() if count >= min_count}
+            if not kept:
+                most_frequent = max(next_states, key=lambda next_state: next_states[next_state])
+                kept = {most_frequent: next_states[most_frequent]}
+
+            pruned_edges += len(next_states) - len(kept)
+            scale = sum(next_states.values()) / sum(kept.values())
+            pruned[state][action] = {next_state: count * scale for next_state, count in kept.items()}
+
+    has_in_edges = {
+        next_state for actions in transitions.values() for next_states in actions.values() for next_state in next_states
+    }
+    reachable: set[GraphState] = set()
+    stack = [state for state in transitions if state not in has_in_edges]
+    while stack:
+        state = stack.pop()
+        if state in reachable:
+            continue
+        reachable.add(state)
+        if isinstance(state, SplitState):
+            stack.extend((state.first_hand_state, state.second_hand_state))
+        for next_states in pruned.get(state, {}).values():
+            stack.extend(next_states)
+
+    return {state: actions for state, actions in pruned.items() if state in reachable}, pruned_edges
+
+
+def compact_graph(graph: StateTransitionGraph, prune_below: float = 0) -> tuple[StateTransitionGraph, CompactionReport]:
+    """
+    A smaller graph with the same EVs for every state it keeps: NOOP chains are collapsed and, with prune_below,
+    rare transitions are pruned, which changes EVs by the mass it moves.
+    """
+    transitions: Transitions = graph.get_graph()
+    compacted, collapsed_states = collapse_noop_chains(transitions)
+
+    pruned_edges = 0
+    if prune_below > 0:
+        compacted, pruned_edges = prune_rare_transitions(compacted, prune_below)
+
+    result = StateTransitionGraph()
+    for state, actions in compacted.items():
+        for action, next_states in actions.items():
+            for next_state, count in next_states.items():
+                result.add_transition(state, action, next_state, count)
+
+    report = CompactionReport(
+        states_before=len(transitions),
+        edges_before=count_edges(transitions),
+        states_after=len(compacted),
+        edges_after=count_edges(compacted),
+        collapsed_states=collapsed_states,
+        pruned_edges=pruned_edges,
+    )
+    return result, report
@@ -1,36 +1,69 @@
+from typing import ClassVar
+
+
 class Card:
+    """
+    A playing card. There is one instance per rank and suit: Card(rank, suit) returns the shared instance, so shoes
+    only hold references, and every derived attribute is computed once when the instance is created.
+    """
+
     SUITS: list[str] = ["♥", "♦", "♣", "♠"]
     RANKS: list[str] = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"]
     TEN_RANKS: set[str] = {"10", "J", "Q", "K"}
+    GRAPH_RANKS: list[str] = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "A"]
+
+    _instances: ClassVar[dict[tuple[str, str], "Card"]] = {}
+
+    __slots__ = ("rank", "suit", "rank_value", "graph_rank", "_is_ace", "_is_ten", "_hash")
+
+    rank: str
+    suit: str
+    rank_value: int
+    graph_rank: str
+    _is_ace: bool
+    _is_ten: bool
+    _hash: int
+
+    def __new__(cls, rank: str, suit: str) -> "Card":
+        card = cls._instances.get((rank, suit))
+        if card is not None:
+            return card
 
-    def __init__(self, rank: str, suit: str) -> None:
         if rank not in Card.RANKS:
             raise ValueError(f"Invalid rank: {rank}")
 
         if suit not in Card.SUITS:
             raise ValueError(f"Invalid suit: {suit}")
 
-        self.rank: str = rank
-        self.suit: str = suit
+        card = super().__new__(cls)
+        is_ace = rank == "A"
+        is_ten = rank in Card.TEN_RANKS
+        for name, value in (
+            ("rank", rank),
+            ("suit", suit),
+            ("rank_value", 10 if is_ten else 11 if is_ace else int(rank)),
+            ("graph_rank", "10" if is_ten else rank),
+            ("_is_ace", is_ace),
+            ("_is_ten", is_ten),
+            ("_hash", hash((rank, suit))),
+        ):
+            object.__setattr__(card, name, value)
 
-    def is_ace(self) -> bool:
-        return self.rank == "A"
+        cls._instances[(rank, suit)] = card
+        return card
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(f"Card is immutable, cannot set {name}")
 
-    @property
-    def rank_value(self) -> int:
-        if self.rank in Card.TEN_RANKS:
-            return 10
-        elif self.is_ace():
-            return 11
-        else:
-            return int(self.rank)
+    def __reduce__(self) -> tuple[type, tuple[str, str]]:
+        # Unpickling goes through Card(rank, suit) too, so it returns the shared instance
+        return Card, (self.rank, self.suit)
 
-    @property
-    def graph_rank(self) -> str:
-        return "10" if self.rank in Card.TEN_RANKS else self.rank
+    def is_ace(self) -> bool:
+        return self._is_ace
 
     def is_ten(self) -> bool:
-        return self.rank in Card.TEN_RANKS
+        return self._is_ten
 
     def __str__(self) -> str:
         return f"{self.rank}{self.suit}"
@@ -42,7 +75,11 @@ class Card:
         if not isinstance(other, Card):
             return NotImplemented
 
-        return self.rank == other.rank and self.suit == other.suit
+        return self is other
 
     def __hash__(self):
-        return hash((self.rank, self.suit))
+        return self._hash
+
+
+# Every card of one standard deck, in rank then suit order
+DECK: tuple[Card, ...] = tuple(Card(rank, suit) for rank in Card.RANKS for suit in Card.SUITS)
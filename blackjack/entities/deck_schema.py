@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 
-from blackjack.entities.card import Card
+from blackjack.entities.card import DECK, Card
 
 
 class DeckSchema(ABC):
@@ -8,7 +8,14 @@ class DeckSchema(ABC):
     def card_counts(self) -> dict[tuple[str, str], int]:
         pass
 
+    def cards(self) -> list[Card]:
+        """One deck's cards, as the shared Card instances."""
+        return [Card(rank, suit) for (rank, suit), count in self.card_counts().items() for _ in range(count)]
+
 
 class StandardBlackjackSchema(DeckSchema):
     def card_counts(self) -> dict[tuple[str, str], int]:
-        return {(rank, suit): 1 for rank in Card.RANKS for suit in Card.SUITS}
+        return {(card.rank, card.suit): 1 for card in DECK}
+
+    def cards(self) -> list[Card]:
+        return list(DECK)
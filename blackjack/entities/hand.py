@@ -4,6 +4,7 @@ from blackjack.entities.card import Card
 class Hand:
     def __init__(self) -> None:
         self.cards: list[Card] = []
+        self.doubled: bool = False
 
     def add_card(self, card: Card) -> None:
         self.cards.append(card)
@@ -8,6 +8,8 @@ class Player:
         self.hands: list[Hand] = [Hand()]
         self.active_index: int = 0
         self.strategy: Strategy = strategy
+        # Hands emptied by reset, handed out again by later splits instead of allocating new ones
+        self._spare_hands: list[Hand] = []
 
     @property
     def hand(self) -> Hand:
@@ -17,10 +19,19 @@ class Player:
         if len(self.hand.cards) != 2:
             raise RuntimeError(f"Cannot split a hand that does not have exactly two cards: {self.hand!r}")
 
-        new_hand = Hand()
+        new_hand = self._spare_hands.pop() if self._spare_hands else Hand()
         new_hand.add_card(self.hand.cards.pop())
         self.hands.insert(self.active_index + 1, new_hand)
 
+    def reset(self) -> None:
+        """Empty the player's hands in place for a new round, back to a single hand."""
+        for hand in self.hands:
+            hand.cards.clear()
+            hand.doubled = False
+        self._spare_hands.extend(self.hands[1:])
+        del self.hands[1:]
+        self.active_index = 0
+
     def __str__(self) -> str:
         return f"{self.name}: {self.hands}"
 
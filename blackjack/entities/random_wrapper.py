@@ -1,5 +1,5 @@
 import random
-from typing import Any, Optional, TypeVar
+from typing import Any, Optional, Sequence, TypeVar
 
 from blackjack.entities.card import Card
 
@@ -11,21 +11,28 @@ class RandomWrapper:
         def shuffle(self, cards: list) -> None:
             random.shuffle(cards)
 
-        def choice(self, items: list[T]) -> T:
+        def choice(self, items: Sequence[T]) -> T:
             return random.choice(items)
 
+        def random(self) -> float:
+            return random.random()
+
     class _NullImpl:
         def __init__(
-            self, shuffle_response: Optional[list[Card]] = None, choice_responses: Optional[list[Any]] = None
+            self,
+            shuffle_response: Optional[list[Card]] = None,
+            choice_responses: Optional[list[Any]] = None,
+            random_responses: Optional[list[float]] = None,
         ) -> None:
             self._shuffle_response = shuffle_response
             self._choice_responses = choice_responses or []
+            self._random_responses = random_responses or []
 
         def shuffle(self, cards: list[Card]) -> None:
             if self._shuffle_response:
                 cards[:] = self._shuffle_response.copy()
 
-        def choice(self, items: list[T]) -> T:
+        def choice(self, items: Sequence[T]) -> T:
             if not self._choice_responses:
                 return items[0]
 
@@ -35,20 +42,31 @@ class RandomWrapper:
 
             return response
 
+        def random(self) -> float:
+            if not self._random_responses:
+                # Never below any probability threshold, so null randomness takes the default path
+                return 1.0
+
+            return self._random_responses.pop(0)
+
     def __init__(
         self,
         null: bool = False,
         shuffle_response: Optional[list[Card]] = None,
         choice_responses: Optional[list[Any]] = None,
+        random_responses: Optional[list[float]] = None,
     ) -> None:
         self._impl: "RandomWrapper._NullImpl | RandomWrapper._LiveImpl"
         if null:
-            self._impl = self._NullImpl(shuffle_response, choice_responses)
+            self._impl = self._NullImpl(shuffle_response, choice_responses, random_responses)
         else:
             self._impl = self._LiveImpl()
 
     def shuffle(self, cards: list) -> None:
         self._impl.shuffle(cards)
 
-    def choice(self, items: list[T]) -> T:
+    def choice(self, items: Sequence[T]) -> T:
         return self._impl.choice(items)
+
+    def random(self) -> float:
+        return self._impl.random()
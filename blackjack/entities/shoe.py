@@ -1,23 +1,28 @@
-from typing import Optional
+from typing import Optional, Sequence
 
 from blackjack.entities.card import Card
 from blackjack.entities.deck_schema import DeckSchema
 from blackjack.entities.random_wrapper import RandomWrapper
 
+# Position of every rank in the composition, ten-value cards sharing the "10" slot
+RANK_INDEX: dict[str, int] = {
+    rank: Card.GRAPH_RANKS.index("10" if rank in Card.TEN_RANKS else rank) for rank in Card.RANKS
+}
+
 
 class Shoe:
     def __init__(
         self, deck_schema: DeckSchema, num_decks: int = 1, random_wrapper: Optional[RandomWrapper] = None
     ) -> None:
-        self.cards: list[Card] = []
+        self.cards: list[Card] = deck_schema.cards() * num_decks
         self.dealt_cards: list[Card] = []
         self.randomizer = random_wrapper or RandomWrapper()
 
-        card_counts = deck_schema.card_counts()
-        for _ in range(num_decks):
-            for (rank, suit), count in card_counts.items():
-                for _ in range(count):
-                    self.cards.append(Card(rank, suit))
+        # Cards of each graph rank left in the shoe, kept up to date as cards are dealt and returned
+        self._full_composition: list[int] = [0] * len(Card.GRAPH_RANKS)
+        for card in self.cards:
+            self._full_composition[RANK_INDEX[card.rank]] += 1
+        self._composition: list[int] = self._full_composition.copy()
 
         self.shuffle()
 
@@ -28,6 +33,7 @@ class Shoe:
     def shuffle(self) -> None:
         self.cards.extend(self.dealt_cards)
         self.dealt_cards.clear()
+        self._composition[:] = self._full_composition
         self.randomizer.shuffle(self.cards)
 
     def deal_card(self) -> Card:
@@ -36,7 +42,49 @@ class Shoe:
 
         card = self.cards.pop()
         self.dealt_cards.append(card)
+        self._composition[RANK_INDEX[card.rank]] -= 1
         return card
 
+    def stack_top(self, graph_ranks: list[str]) -> None:
+        """Move one card of each graph rank to the top of the shoe so they are dealt in the given order."""
+        stacked: list[Card] = []
+        for rank in graph_ranks:
+            index = next((i for i, card in enumerate(self.cards) if card.graph_rank == rank), None)
+            if index is None:
+                raise ValueError(f"No card of rank {rank} left in the shoe to stack.")
+
+            stacked.append(self.cards.pop(index))
+
+        self.cards.extend(reversed(stacked))
+
+    def dealt_count(self) -> int:
+        return len(self.dealt_cards)
+
+    def rewind(self, dealt_count: int) -> None:
+        """Put back every card dealt since `dealt_count` cards had been dealt, in their original order."""
+        if not 0 <= dealt_count <= len(self.dealt_cards):
+            raise ValueError(f"Cannot rewind to {dealt_count} dealt cards, {len(self.dealt_cards)} have been dealt.")
+
+        while len(self.dealt_cards) > dealt_count:
+            card = self.dealt_cards.pop()
+            self.cards.append(card)
+            self._composition[RANK_INDEX[card.rank]] += 1
+
     def cards_left(self) -> int:
         return len(self.cards)
+
+    def composition(self, unseen: Sequence[Card] = ()) -> tuple[int, ...]:
+        """
+        Cards left of each rank, in Card.GRAPH_RANKS order with every ten-value card counted under "10". Dealt cards
+        that are still face down can be passed as unseen to count them as left.
+        """
+        if not unseen:
+            return tuple(self._composition)
+
+        composition = self._composition.copy()
+        for card in unseen:
+            composition[RANK_INDEX[card.rank]] += 1
+        return tuple(composition)
+
+    def remaining(self, graph_rank: str) -> int:
+        return self._composition[RANK_INDEX[graph_rank]]
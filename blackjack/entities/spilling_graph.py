@@ -0,0 +1,238 @@
+import heapq
+import mmap
+import os
+import pickle
+import shutil
+import tempfile
+from array import array
+from typing import Iterator, Optional
+
+from blackjack.entities.state import GraphState, SplitState
+from blackjack.entities.state_transition_graph import StateTransitionGraph
+from blackjack.turn.action import Action
+
+SortKey = tuple[str, str, str]
+TransitionRecord = tuple[SortKey, GraphState, Action, GraphState, float]
+StateRecord = tuple[int, GraphState, dict[Action, dict[GraphState, float]]]
+
+
+def _sort_key(state: GraphState, action: Action, next_state: GraphState) -> SortKey:
+    # States are not orderable, but their reprs are stable across processes, and grouping by the state first keeps
+    # each state's transitions together in the merged output
+    return repr(state), action.name, repr(next_state)
+
+
+def _read_run(path: str) -> Iterator:
+    with open(path, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+class SpillingTransitionGraph:
+    """
+    Accumulates transition counts in a bounded buffer. Once the buffer holds more than max_entries transitions it is
+    sorted and spilled to a run file on disk, and iterating the graph k-way merges the runs and the buffer, summing
+    the counts of the same transition. Memory stays bounded by max_entries however many transitions are added.
+    """
+
+    def __init__(self, max_entries: int = 1000000, directory: Optional[str] = None) -> None:
+        if max_entries < 1:
+            raise ValueError(f"The buffer needs room for at least one transition, got {max_entries}")
+
+        self.max_entries: int = max_entries
+        self.directory: str = tempfile.mkdtemp(prefix="blackjack-graph-", dir=directory)
+        self.run_paths: list[str] = []
+        self._buffer: dict[tuple[GraphState, Action, GraphState], float] = {}
+
+    def __enter__(self) -> "SpillingTransitionGraph":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Delete the run files."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.run_paths = []
+        self._buffer = {}
+
+    def add_transition(self, state: GraphState, action: Action, next_state: GraphState, count: float = 1) -> None:
+        key = (state, action, next_state)
+        self._buffer[key] = self._buffer.get(key, 0) + count
+        if len(self._buffer) > self.max_entries:
+            self.spill()
+
+    def merge(self, other: StateTransitionGraph, weight: float = 1) -> None:
+        for state, actions in other.get_graph().items():
+            for action, next_states in actions.items():
+                for next_state, count in next_states.items():
+                    self.add_transition(state, action, next_state, count * weight)
+
+    def _sorted_buffer(self) -> list[TransitionRecord]:
+        return sorted(
+            ((_sort_key(*key), *key, count) for key, count in self._buffer.items()),
+            key=lambda record: record[0],
+        )
+
+    def spill(self) -> None:
+        """Write the buffer out as a sorted run and empty it."""
+        if not self._buffer:
+            return
+
+        path = os.path.join(self.directory, f"run-{len(self.run_paths):06d}")
+        with open(path, "wb") as f:
+            for record in self._sorted_buffer():
+                pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self.run_paths.append(path)
+        self._buffer = {}
+
+    def iter_transitions(self) -> Iterator[tuple[GraphState, Action, GraphState, float]]:
+        """Every distinct transition with its summed count, in sort order, reading each run once."""
+        runs = [_read_run(path) for path in self.run_paths] + [iter(self._sorted_buffer())]
+        current: Optional[TransitionRecord] = None
+
+        for record in heapq.merge(*runs, key=lambda record: record[0]):
+            if current is not None and record[0] == current[0]:
+                current = (*current[:4], current[4] + record[4])
+                continue
+
+            if current is not None:
+                yield current[1:]
+            current = record
+
+        if current is not None:
+            yield current[1:]
+
+    def iter_states(self) -> Iterator[tuple[GraphState, dict[Action, dict[GraphState, float]]]]:
+        """The transitions grouped by state, one state at a time."""
+        state: Optional[GraphState] = None
+        actions: dict[Action, dict[GraphState, float]] = {}
+
+        for next_record in self.iter_transitions():
+            if state is not None and next_record[0] != state:
+                yield state, actions
+                actions = {}
+
+            state, action, next_state, count = next_record
+            actions.setdefault(action, {})[next_state] = count
+
+        if state is not None:
+            yield state, actions
+
+    def iter_states_bottom_up(self) -> Iterator[tuple[GraphState, dict[Action, dict[GraphState, float]]]]:
+        """
+        The transitions grouped by state like iter_states, but every state comes after all the states it leads to,
+        and after both hands of a split it leads to, so EVs can be solved as the states arrive.
+
+        Memory stays bounded by max_entries transitions plus a few integers per state: the next states are written to
+        an adjacency file on disk, a depth-first search over it finds the order, and the states are sorted into that
+        order through spilled runs, like the transitions themselves.
+        """
+        ids: dict[GraphState, int] = {}
+        states: list[GraphState] = []
+        starts, ends = array("q"), array("q")
+
+        def state_id(state: GraphState) -> int:
+            if state not in ids:
+                ids[state] = len(states)
+                states.append(state)
+                starts.append(0)
+                ends.append(0)
+            return ids[state]
+
+        edges_path = os.path.join(self.directory, "edges")
+        written = 0
+        with open(edges_path, "wb") as f:
+            for state, actions in self.iter_states():
+                source = state_id(state)
+                next_ids = array(
+                    "q", (state_id(next_state) for next_states in actions.values() for next_state in next_states)
+                )
+                next_ids.tofile(f)
+                starts[source], ends[source] = written, written + len(next_ids)
+                written += len(next_ids)
+
+        if not written:
+            os.remove(edges_path)
+            return
+
+        run_paths: list[str] = []
+        try:
+            with open(edges_path, "rb") as edges_file:
+                with mmap.mmap(edges_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    edges = memoryview(mapped).cast("q")
+                    try:
+                        positions = self._post_order(states, ids, starts, ends, edges)
+                    finally:
+                        edges.release()
+
+            buffer: list[StateRecord] = []
+            entries = 0
+            for state, actions in self.iter_states():
+                buffer.append((positions[ids[state]], state, actions))
+                entries += sum(len(next_states) for next_states in actions.values())
+                if entries > self.max_entries:
+                    run_paths.append(self._spill_states(buffer, len(run_paths)))
+                    buffer, entries = [], 0
+
+            buffer.sort(key=lambda record: record[0])
+            runs = [_read_run(path) for path in run_paths] + [iter(buffer)]
+            for _, state, actions in heapq.merge(*runs, key=lambda record: record[0]):
+                yield state, actions
+        finally:
+            for path in [edges_path, *run_paths]:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @staticmethod
+    def _post_order(
+        states: list[GraphState], ids: dict[GraphState, int], starts: array, ends: array, edges: memoryview
+    ) -> array:
+        """Each state's position in a depth-first post-order, which puts every state after the states it leads to."""
+
+        def next_ids(node: int) -> list[int]:
+            result = edges[slice(starts[node], ends[node])].tolist()
+            state = states[node]
+            if isinstance(state, SplitState):
+                result.extend(ids[hand] for hand in (state.first_hand_state, state.second_hand_state) if hand in ids)
+            return result
+
+        positions = array("q", [0]) * len(states)
+        visited = bytearray(len(states))
+        position = 0
+        for root in range(len(states)):
+            if visited[root]:
+                continue
+
+            visited[root] = 1
+            stack = [(root, iter(next_ids(root)))]
+            while stack:
+                node, children = stack[-1]
+                for child in children:
+                    if not visited[child]:
+                        visited[child] = 1
+                        stack.append((child, iter(next_ids(child))))
+                        break
+                else:
+                    stack.pop()
+                    positions[node] = position
+                    position += 1
+
+        return positions
+
+    def _spill_states(self, buffer: list[StateRecord], index: int) -> str:
+        path = os.path.join(self.directory, f"states-{index:06d}")
+        with open(path, "wb") as f:
+            for record in sorted(buffer, key=lambda record: record[0]):
+                pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return path
+
+    def to_graph(self) -> StateTransitionGraph:
+        graph = StateTransitionGraph()
+        for state, action, next_state, count in self.iter_transitions():
+            graph.add_transition(state, action, next_state, count)
+        return graph
@@ -1,5 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from enum import Enum, auto
+from typing import ClassVar, TypeVar
 
 
 class Turn(Enum):
@@ -19,15 +20,68 @@ class Outcome(Enum):
     IN_PROGRESS = auto()
 
 
+S = TypeVar("S", bound="GraphState")
+
+
 class GraphState:
     """
     Base class for all graph state types in blackjack.
+
+    States are frozen dataclasses declared with eq=False, so equality and hashing come from here: both work on the
+    tuple of field values, whose hash is computed once per instance. Building states through `of` returns one shared
+    instance per distinct value, which makes the graph's dict lookups succeed on identity alone.
     """
 
-    pass
+    _instances: ClassVar[dict[tuple, "GraphState"]]
+    _key: tuple
+    _hash: int
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._instances = {}
+
+    def __post_init__(self) -> None:
+        key = tuple(getattr(self, field.name) for field in fields(self))  # type: ignore[arg-type]
+        object.__setattr__(self, "_key", key)
+        object.__setattr__(self, "_hash", hash((type(self).__name__, key)))
+
+    @classmethod
+    def of(cls: type[S], *values) -> S:
+        """The shared instance of this state with the given field values, in field order."""
+        state = cls._instances.get(values)
+        if state is None:
+            state = cls._instances[values] = cls(*values)
+        return state  # type: ignore[return-value]
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if type(self) is not type(other):
+            return NotImplemented
+        return self._key == other._key  # type: ignore[attr-defined]
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self):
+        # String hashes differ between processes, so states are rebuilt (and interned) on unpickling rather than
+        # restoring the cached hash
+        return rebuild_state, (type(self), self._key)
+
+    def __getattr__(self, name: str):
+        # States unpickled from graphs saved before interning skip __post_init__, so they get a key on first use
+        if name not in ("_key", "_hash"):
+            raise AttributeError(name)
+        self.__post_init__()
+        return object.__getattribute__(self, name)
+
+
+def rebuild_state(cls: type[S], key: tuple) -> S:
+    """Unpickle a state as the shared instance of its class and field values."""
+    return cls.of(*key)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class ProperState(GraphState):
     """
     Represents a unique decision point in a blackjack game (not terminal).
@@ -40,7 +94,7 @@ class ProperState(GraphState):
     turn: Turn
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class PairState(GraphState):
     """
     Represents a state where the player has a pair (e.g., after being dealt 8-8)
@@ -52,7 +106,7 @@ class PairState(GraphState):
     split_count: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class TerminalState(GraphState):
     """
     Represents a terminal state (win/lose/push/bust/blackjack) in a blackjack game.
@@ -61,21 +115,21 @@ class TerminalState(GraphState):
     outcome: Outcome
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class PendingSplitHandState(GraphState):
     player_card: str
     dealer_upcard_rank: str
     min_split_count: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class NewSplitHandState(GraphState):
     player_card: str
     dealer_upcard_rank: str
     split_count: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class PreDealState(GraphState):
     """
     Represents the state before any cards are dealt.
@@ -84,7 +138,7 @@ class PreDealState(GraphState):
     pass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class CompoundState(GraphState):
     """
     Represents a state where the player has split and has multiple hands, each represented as a GraphState.
@@ -96,7 +150,7 @@ class CompoundState(GraphState):
     turn: Turn
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class SplitState(GraphState):
     first_hand_state: NewSplitHandState
     second_hand_state: PendingSplitHandState
@@ -1,14 +1,19 @@
 from collections import defaultdict
+from typing import Mapping
 
 from blackjack.entities.state import GraphState
 from blackjack.turn.action import Action
 
+Transition = tuple[GraphState, Action, GraphState]
+# Every transition of one round, in order
+RoundSignature = tuple[Transition, ...]
 
-def _default_next_state() -> dict[GraphState, int]:
+
+def _default_next_state() -> dict[GraphState, float]:
     return defaultdict(int)
 
 
-def _default_action_transition() -> dict[Action, dict[GraphState, int]]:
+def _default_action_transition() -> dict[Action, dict[GraphState, float]]:
     return defaultdict(_default_next_state)
 
 
@@ -19,21 +24,29 @@ class StateTransitionGraph:
     """
 
     def __init__(self) -> None:
-        self.transitions: dict[GraphState, dict[Action, dict[GraphState, int]]] = defaultdict(
+        self.transitions: dict[GraphState, dict[Action, dict[GraphState, float]]] = defaultdict(
             _default_action_transition
         )
 
-    def add_transition(self, state: GraphState, action: Action, next_state: GraphState):
-        self.transitions[state][action][next_state] += 1
+    def add_transition(self, state: GraphState, action: Action, next_state: GraphState, count: float = 1):
+        self.transitions[state][action][next_state] += count
 
-    def get_graph(self) -> dict[GraphState, dict[Action, dict[GraphState, int]]]:
+    def get_graph(self) -> dict[GraphState, dict[Action, dict[GraphState, float]]]:
         return self.transitions
 
     def __repr__(self):
         return f"StateTransitionGraph(transitions={dict(self.transitions)})"
 
-    def merge(self, other: "StateTransitionGraph") -> None:
+    def merge(self, other: "StateTransitionGraph", weight: float = 1) -> None:
+        """Add the counts of another graph into this one, optionally scaling them by a sampling weight."""
         for state, actions in other.get_graph().items():
             for action, next_states in actions.items():
                 for next_state, count in next_states.items():
-                    self.transitions[state][action][next_state] += count
+                    self.transitions[state][action][next_state] += count * weight
+
+    def add_round_signatures(self, signatures: Mapping[RoundSignature, float]) -> None:
+        """Add every transition of each round signature, as many times as the signature was counted."""
+        transitions = self.transitions
+        for signature, count in signatures.items():
+            for state, action, next_state in signature:
+                transitions[state][action][next_state] += count
@@ -1,8 +1,18 @@
-from dataclasses import dataclass
+import concurrent.futures
+from array import array
+from dataclasses import dataclass, fields
 from graphlib import TopologicalSorter
+from itertools import islice, repeat
+from typing import AbstractSet, Iterable, Optional, get_args, get_origin, get_type_hints
 
 from blackjack.entities.state import (
+    CompoundState,
     GraphState,
+    NewSplitHandState,
+    PairState,
+    PendingSplitHandState,
+    PreDealState,
+    ProperState,
     SplitState,
     TerminalState,
 )
@@ -14,66 +24,381 @@ EV_MULTIPLIER: dict[Action, int] = {
     Action.DOUBLE: 2,
 }
 
+# Position of each previous action in a state's best EVs
+ACTIONS: tuple[Action, ...] = tuple(Action)
+ACTION_INDEX: dict[Action, int] = {action: index for index, action in enumerate(ACTIONS)}
+
+Transitions = dict[GraphState, dict[Action, dict[GraphState, float]]]
+
+# A state's best EV after each previous action, in ACTION_INDEX order; None where no action is allowed
+BestEVs = tuple[Optional[float], ...]
+
 
 @dataclass(frozen=True)
 class StateEV:
     optimal_action: Action
     action_evs: dict[Action, float]
-    total_count: int
+    total_count: float
+
+
+# State types by their code in encoded states
+STATE_TYPES: tuple[type[GraphState], ...] = (
+    PreDealState,
+    ProperState,
+    PairState,
+    TerminalState,
+    PendingSplitHandState,
+    NewSplitHandState,
+    SplitState,
+    CompoundState,
+)
+STATE_TYPE_CODES: dict[type[GraphState], int] = {state_type: code for code, state_type in enumerate(STATE_TYPES)}
+
+# Which fields of a state type hold other states: NESTED_STATE for one state, NESTED_STATES for a tuple of states and
+# None for a plain value. Types without nested states are left out, since their field values are encoded as they are
+NESTED_STATE = "state"
+NESTED_STATES = "states"
+
+
+def _field_kind(hint: object) -> Optional[str]:
+    if isinstance(hint, type) and issubclass(hint, GraphState):
+        return NESTED_STATE
+    if get_origin(hint) is tuple and any(
+        isinstance(arg, type) and issubclass(arg, GraphState) for arg in get_args(hint)
+    ):
+        return NESTED_STATES
+    return None
+
+
+def _field_kinds(state_type: type[GraphState]) -> tuple[Optional[str], ...]:
+    hints = get_type_hints(state_type)
+    return tuple(_field_kind(hints[field.name]) for field in fields(state_type))  # type: ignore[arg-type]
+
+
+NESTED_FIELDS: dict[type[GraphState], tuple[Optional[str], ...]] = {
+    state_type: _field_kinds(state_type) for state_type in STATE_TYPES if any(_field_kinds(state_type))
+}
+
+
+def _index_array(values: list[int]) -> array:
+    """The values in the narrowest unsigned array type that holds them all."""
+    largest = max(values, default=0)
+    return array("B" if largest < 1 << 8 else "H" if largest < 1 << 16 else "L", values)
+
+
+def _count_array(values: list[float]) -> array:
+    if all(float(value).is_integer() and 0 <= value < 1 << 32 for value in values):
+        return array("L", map(int, values))
+    return array("d", values)
+
+
+class _StateIndex(dict[GraphState, int]):
+    """Each state's position in states, which lists every state looked up as encoded by EncodedTransitions."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.states: list[tuple] = []
+
+    def __missing__(self, state: GraphState) -> int:
+        state_type = type(state)
+        kinds = NESTED_FIELDS.get(state_type)
+        # Nested states are listed first, so decoding finds them already rebuilt
+        values = state._key if kinds is None else tuple(map(self._encode_field, kinds, state._key))
+        self[state] = len(self.states)
+        self.states.append((STATE_TYPE_CODES[state_type], *values))
+        return self[state]
+
+    def _encode_field(self, kind: Optional[str], value):
+        if kind == NESTED_STATE:
+            return self[value]
+        if kind == NESTED_STATES:
+            return tuple(self[state] for state in value)
+        return value
+
+
+@dataclass(frozen=True)
+class EncodedTransitions:
+    """
+    Transitions as flat arrays, for sending to worker processes: every state is listed once as a tuple of its type's
+    code in STATE_TYPES and its field values, with nested states as indices of earlier entries, so no state objects
+    are pickled. Transitions are grouped by state and action: group i leaves state
+    sources[i] by ACTIONS[actions[i]] and owns the next sizes[i] entries of next_states (indices into states) and of
+    counts. Every array uses the narrowest type its values fit.
+    """
+
+    states: list[tuple]
+    sources: array
+    actions: array
+    sizes: array
+    next_states: array
+    counts: array
+
+    @classmethod
+    def encode(cls, transitions: Transitions) -> "EncodedTransitions":
+        return cls.encode_with_states(transitions)[1]
+
+    @classmethod
+    def encode_with_states(cls, transitions: Transitions) -> tuple[list[GraphState], "EncodedTransitions"]:
+        """The encoded transitions, and the states they list in the order of their entries."""
+        index = _StateIndex()
+        state_index = index.__getitem__
+
+        sources: list[int] = []
+        actions: list[int] = []
+        sizes: list[int] = []
+        next_states: list[int] = []
+        counts: list[float] = []
+        for state, state_actions in transitions.items():
+            source = state_index(state)
+            for action, action_next_states in state_actions.items():
+                sources.append(source)
+                actions.append(ACTION_INDEX[action])
+                sizes.append(len(action_next_states))
+                next_states.extend(map(state_index, action_next_states))
+                counts.extend(action_next_states.values())
+
+        # The index is a dict, so its keys are the states in the order they were listed
+        return list(index), cls(
+            index.states,
+            _index_array(sources),
+            _index_array(actions),
+            _index_array(sizes),
+            _index_array(next_states),
+            _count_array(counts),
+        )
+
+    def decode_states(self) -> list[GraphState]:
+        """The states in the order of self.states, rebuilt as their shared instances."""
+        states: list[GraphState] = []
+
+        def decode_field(kind: Optional[str], value):
+            if kind == NESTED_STATE:
+                return states[value]
+            if kind == NESTED_STATES:
+                return tuple(states[i] for i in value)
+            return value
+
+        for code, *values in self.states:
+            state_type = STATE_TYPES[code]
+            kinds = NESTED_FIELDS.get(state_type)
+            states.append(state_type.of(*(values if kinds is None else map(decode_field, kinds, values))))
+        return states
+
+    def decode(self, states: Optional[list[GraphState]] = None) -> Transitions:
+        states = self.decode_states() if states is None else states
+        transitions: Transitions = {}
+        next_states = map(states.__getitem__, self.next_states)
+        counts = iter(self.counts)
+        for source, action, size in zip(self.sources, self.actions, self.sizes):
+            transitions.setdefault(states[source], {})[ACTIONS[action]] = dict(
+                zip(islice(next_states, size), islice(counts, size))
+            )
+        return transitions
+
+
+def _dealer_upcard(state: GraphState) -> Optional[str]:
+    if isinstance(state, SplitState):
+        state = state.first_hand_state
+    upcard = getattr(state, "dealer_upcard_rank", None)
+    return getattr(state, "dealer_upcard", None) if upcard is None else upcard
+
+
+def partition_by_upcard(transitions: Transitions) -> Optional[tuple[Transitions, list[Transitions]]]:
+    """
+    Split the transitions into the states without a dealer upcard, such as PreDealState, and one part per upcard,
+    whose states only lead to states of the same upcard or to terminal states. None if the graph does not split that
+    way into at least two parts.
+    """
+    root: Transitions = {}
+    parts: dict[str, Transitions] = {}
+    for state, actions in transitions.items():
+        upcard = _dealer_upcard(state)
+        if upcard is None:
+            root[state] = actions
+            continue
+
+        for next_states in actions.values():
+            for next_state in next_states:
+                if not isinstance(next_state, TerminalState) and _dealer_upcard(next_state) != upcard:
+                    return None
+        parts.setdefault(upcard, {})[state] = actions
+
+    if len(parts) < 2:
+        return None
+
+    return root, list(parts.values())
+
+
+def _solve_partition(rules: Rules, encoded: EncodedTransitions) -> tuple[array, array, array]:
+    """
+    Worker side of the parallel EV calculation. Returns the optimal action index, the action EVs (in the order of the
+    state's actions) and the total count of every non-terminal state, in the order of encoded.states.
+    """
+    states = encoded.decode_states()
+    state_evs = EVCalculator(rules)._calculate_transition_evs(encoded.decode(states))
+    optimal_actions, action_evs, total_counts = array("b"), array("d"), array("d")
+    for state in states:
+        if isinstance(state, TerminalState):
+            continue
+        state_ev = state_evs[state]
+        optimal_actions.append(ACTION_INDEX[state_ev.optimal_action])
+        action_evs.extend(state_ev.action_evs.values())
+        total_counts.append(state_ev.total_count)
+    return optimal_actions, action_evs, total_counts
 
 
 class EVCalculator:
     def __init__(self, rules: Rules):
         self.rules = rules
+        # The actions allowed after each previous action, in ACTION_INDEX order; None allows every action
+        self._allowed_actions: tuple[Optional[AbstractSet[Action]], ...] = tuple(
+            None if action == Action.NOOP else rules.get_viable_actions(action) for action in Action
+        )
 
-    def calculate_evs(self, graph: StateTransitionGraph) -> dict[GraphState, StateEV]:
-        transitions = graph.get_graph()
+    def calculate_evs(self, graph: StateTransitionGraph, parallel: int = 1) -> dict[GraphState, StateEV]:
+        """
+        With parallel > 1, and a graph that splits by dealer upcard, each upcard's states are solved on their own
+        worker process, and the states before the deal are solved from their results.
+        """
+        return self._calculate_transition_evs(graph.get_graph(), parallel)
+
+    def calculate_evs_from_states(
+        self, states: Iterable[tuple[GraphState, dict[Action, dict[GraphState, float]]]]
+    ) -> dict[GraphState, StateEV]:
+        """
+        Calculate EVs from a stream of states and their transitions in which every state comes after the states it
+        leads to, such as SpillingTransitionGraph.iter_states_bottom_up. Each state is solved as it arrives, so only
+        its own transitions are held, never the whole graph.
+        """
+        state_evs: dict[GraphState, StateEV] = {}
+        best_evs: dict[GraphState, BestEVs] = {}
+        self._initialize_terminal_states(state_evs, best_evs)
 
+        solved_any = False
+        for state, actions in states:
+            for next_states in actions.values():
+                for next_state in next_states:
+                    if next_state in best_evs:
+                        continue
+                    if not isinstance(next_state, SplitState) or not (
+                        next_state.first_hand_state in best_evs and next_state.second_hand_state in best_evs
+                    ):
+                        raise ValueError(f"State {state} came before {next_state}, which it leads to")
+                    self._solve_split_state(next_state, state_evs, best_evs)
+
+            self._solve_state(state, actions, state_evs, best_evs)
+            solved_any = True
+
+        return state_evs if solved_any else {}
+
+    def _calculate_transition_evs(self, transitions: Transitions, parallel: int = 1) -> dict[GraphState, StateEV]:
         if not transitions:
             return {}
 
         state_evs: dict[GraphState, StateEV] = {}
+        # Filled in as each state is finalized, so every incoming edge looks up its constrained EV by index
+        best_evs: dict[GraphState, BestEVs] = {}
+        self._initialize_terminal_states(state_evs, best_evs)
+
+        partitions = partition_by_upcard(transitions) if parallel > 1 else None
+        if partitions is not None:
+            transitions, parts = partitions
+            self._solve_parts_in_parallel(parts, parallel, state_evs, best_evs)
 
-        self._initialize_terminal_states(transitions, state_evs)
+        self._solve(transitions, state_evs, best_evs)
+        return state_evs
+
+    def _solve_parts_in_parallel(
+        self,
+        parts: list[Transitions],
+        parallel: int,
+        state_evs: dict[GraphState, StateEV],
+        best_evs: dict[GraphState, BestEVs],
+    ) -> None:
+        part_states, encoded_parts = zip(*(EncodedTransitions.encode_with_states(part) for part in parts))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=parallel) as executor:
+            results = executor.map(_solve_partition, repeat(self.rules), encoded_parts)
+            for part, states, (optimal_actions, action_evs, total_counts) in zip(parts, part_states, results):
+                evs = iter(action_evs)
+                solved_states = (state for state in states if not isinstance(state, TerminalState))
+                for state, optimal_index, total_count in zip(solved_states, optimal_actions, total_counts):
+                    actions = list(part[state]) if state in part else [Action.NOOP]
+                    state_evs[state] = StateEV(ACTIONS[optimal_index], dict(zip(actions, evs)), total_count)
+                    best_evs[state] = self._best_evs(state_evs[state])
+
+    def _solve(
+        self, transitions: Transitions, state_evs: dict[GraphState, StateEV], best_evs: dict[GraphState, BestEVs]
+    ) -> None:
+        """Calculate the EVs of the states in transitions, and of the split states they lead to, in place."""
         sorted_states = self._topological_sort(transitions)
 
         for state in reversed(sorted_states):
-            if isinstance(state, TerminalState):
+            if isinstance(state, TerminalState) or state in state_evs:
                 continue
 
             if isinstance(state, SplitState):
-                # For split states, calculate EV as the sum of both hands states
-                action_evs = {
-                    Action.NOOP: self._get_state_ev(state.first_hand_state, state_evs, Action.SPLIT)
-                    + self._get_state_ev(state.second_hand_state, state_evs, Action.SPLIT)
-                }
-                state_evs[state] = StateEV(Action.NOOP, action_evs, 0)
+                self._solve_split_state(state, state_evs, best_evs)
                 continue
 
             if state not in transitions:
                 raise ValueError(f"State {state} is in the graph but not in transitions. This is a bug.")
 
-            action_evs = self._calculate_action_evs(state, transitions[state], state_evs)
+            self._solve_state(state, transitions[state], state_evs, best_evs)
 
-            optimal_action = max(action_evs, key=lambda a: action_evs[a])
-            total_count = sum(sum(next_states.values()) for next_states in transitions[state].values())
-            state_evs[state] = StateEV(optimal_action, action_evs, total_count)
+    def _solve_split_state(
+        self, state: SplitState, state_evs: dict[GraphState, StateEV], best_evs: dict[GraphState, BestEVs]
+    ) -> None:
+        # For split states, calculate EV as the sum of both hands states
+        split_index = ACTION_INDEX[Action.SPLIT]
+        action_evs = {
+            Action.NOOP: self._get_state_ev(state.first_hand_state, best_evs, split_index)
+            + self._get_state_ev(state.second_hand_state, best_evs, split_index)
+        }
+        state_evs[state] = StateEV(Action.NOOP, action_evs, 0)
+        best_evs[state] = self._best_evs(state_evs[state])
+
+    def _solve_state(
+        self,
+        state: GraphState,
+        actions: dict[Action, dict[GraphState, float]],
+        state_evs: dict[GraphState, StateEV],
+        best_evs: dict[GraphState, BestEVs],
+    ) -> None:
+        action_evs = self._calculate_action_evs(state, actions, best_evs)
 
-        return state_evs
+        optimal_action = max(action_evs, key=lambda a: action_evs[a])
+        total_count = sum(sum(next_states.values()) for next_states in actions.values())
+        state_evs[state] = StateEV(optimal_action, action_evs, total_count)
+        best_evs[state] = self._best_evs(state_evs[state])
 
     def _initialize_terminal_states(
-        self, transitions: dict[GraphState, dict[Action, dict[GraphState, int]]], state_evs: dict[GraphState, StateEV]
+        self, state_evs: dict[GraphState, StateEV], best_evs: dict[GraphState, BestEVs]
     ) -> None:
         for outcome in self.rules.get_possible_outcomes():
             terminal_state = TerminalState(outcome)
             payout = self.rules.get_outcome_payout(outcome)
             state_evs[terminal_state] = StateEV(Action.NOOP, {Action.NOOP: payout}, 0)
+            best_evs[terminal_state] = self._best_evs(state_evs[terminal_state])
+
+    def _best_evs(self, state_ev: StateEV) -> BestEVs:
+        best_ev = state_ev.action_evs[state_ev.optimal_action]
+        if state_ev.optimal_action == Action.NOOP:
+            return (best_ev,) * len(self._allowed_actions)
+
+        return tuple(
+            (
+                best_ev
+                if allowed_actions is None
+                else max((ev for a, ev in state_ev.action_evs.items() if a in allowed_actions), default=None)
+            )
+            for allowed_actions in self._allowed_actions
+        )
 
     def _calculate_action_evs(
-        self, state: GraphState, actions: dict[Action, dict[GraphState, int]], state_evs: dict[GraphState, StateEV]
+        self, state: GraphState, actions: dict[Action, dict[GraphState, float]], best_evs: dict[GraphState, BestEVs]
     ) -> dict[Action, float]:
         action_evs = {
-            action: self._calculate_single_action_ev(action, next_states, state_evs)
+            action: self._calculate_single_action_ev(action, next_states, best_evs)
             for action, next_states in actions.items()
         }
 
@@ -86,33 +411,31 @@ class EVCalculator:
         return action_evs
 
     def _calculate_single_action_ev(
-        self, action: Action, next_states: dict[GraphState, int], state_evs: dict[GraphState, StateEV]
+        self, action: Action, next_states: dict[GraphState, float], best_evs: dict[GraphState, BestEVs]
     ) -> float:
         if not next_states:
             raise ValueError(f"Action {action} has no next states")
 
         total_count = sum(next_states.values())
+        multiplier = EV_MULTIPLIER.get(action, 1)
+        index = ACTION_INDEX[action]
 
         return sum(
-            self._get_state_ev(next_state, state_evs, action) * (count / total_count) * EV_MULTIPLIER.get(action, 1)
+            self._get_state_ev(next_state, best_evs, index) * (count / total_count) * multiplier
             for next_state, count in next_states.items()
         )
 
-    def _get_state_ev(self, state: GraphState, state_evs: dict[GraphState, StateEV], action: Action) -> float:
-        assert state in state_evs, f"Next state {state} not found in state_evs. This is a bug."
-        state_ev = state_evs[state]
-        if action == Action.NOOP or state_ev.optimal_action == Action.NOOP:
-            return state_ev.action_evs[state_ev.optimal_action]
-
-        allowed_actions: set[Action] = self.rules.get_viable_actions(action)
-        allowed_action_evs = {a: ev for a, ev in state_ev.action_evs.items() if a in allowed_actions}
-        if not allowed_action_evs:
-            raise RuntimeError(f"No allowed actions for state {state} after previous action {action}")
+    def _get_state_ev(self, state: GraphState, best_evs: dict[GraphState, BestEVs], index: int) -> float:
+        assert state in best_evs, f"Next state {state} not found in state_evs. This is a bug."
+        best_ev = best_evs[state][index]
+        if best_ev is None:
+            raise RuntimeError(f"No allowed actions for state {state} after previous action {list(Action)[index]}")
 
-        best_action = max(allowed_action_evs, key=lambda a: allowed_action_evs[a])
-        return allowed_action_evs[best_action]
+        return best_ev
 
-    def _topological_sort(self, transitions: dict[GraphState, dict[Action, dict[GraphState, int]]]) -> list[GraphState]:
+    def _topological_sort(
+        self, transitions: dict[GraphState, dict[Action, dict[GraphState, float]]]
+    ) -> list[GraphState]:
         sorter: TopologicalSorter = TopologicalSorter()
         all_states = set()
 
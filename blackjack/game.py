@@ -1,8 +1,9 @@
+from collections import Counter
 from typing import Callable, Optional
 
 from blackjack.entities.hand import Hand
 from blackjack.entities.player import Player
-from blackjack.entities.shoe import Shoe
+from blackjack.entities.shoe import RANK_INDEX, Shoe
 from blackjack.entities.state import (
     GraphState,
     NewSplitHandState,
@@ -15,15 +16,26 @@ from blackjack.entities.state import (
     TerminalState,
     Turn,
 )
-from blackjack.entities.state_transition_graph import StateTransitionGraph
-from blackjack.game_events import GameEvent, RoundResultEvent
-from blackjack.gameplay.game_context import GameContext
-from blackjack.gameplay.turn_handler import Decision
+from blackjack.entities.state_transition_graph import (
+    RoundSignature,
+    StateTransitionGraph,
+    Transition,
+)
+from blackjack.game_events import GameEvent, RoundResultEvent, ignore_event
+from blackjack.gameplay.game_context import GameContext, GameContextSnapshot
+from blackjack.gameplay.turn_handler import Decision, TakeTurnHandler
 from blackjack.rules.base import HandValue, Rules
 from blackjack.strategy.base import Strategy
+from blackjack.summary import InitialHand, OutcomeSummary
+from blackjack.turn.action import Action
 from blackjack.turn.state_machine import StateMachine
 from blackjack.turn.turn_state import TurnState
 
+MAX_SEATS: int = 7
+# Distinct round signatures counted before they are flushed into the graph, so the counts stay bounded however many
+# rounds one call plays
+MAX_ROUND_SIGNATURES: int = 4096
+
 
 class Game:
     def __init__(
@@ -35,13 +47,52 @@ class Game:
         dealer_strategy: Strategy,
         state_transition_graph: StateTransitionGraph,
         output_tracker: Optional[Callable[[GameEvent], None]] = None,
+        branch_actions: bool = False,
+        num_seats: int = 1,
+        aggregate_rounds: bool = False,
+        summary: Optional[OutcomeSummary] = None,
+        max_round_signatures: int = MAX_ROUND_SIGNATURES,
     ) -> None:
-        player: Player = Player("Player", player_strategy)
+        if not 1 <= num_seats <= MAX_SEATS:
+            raise ValueError(f"A table has 1 to {MAX_SEATS} seats, got {num_seats}")
+        if branch_actions and num_seats > 1:
+            raise ValueError("Action branching is only supported with a single seat")
+        if branch_actions and summary is not None:
+            raise ValueError("Action branching needs the graph, it cannot be used with an outcome summary")
+
+        if num_seats == 1:
+            seats: list[Player] = [Player("Player", player_strategy)]
+        else:
+            seats = [Player(f"Player {seat}", player_strategy) for seat in range(1, num_seats + 1)]
         dealer: Player = Player("Dealer", dealer_strategy)
-        self.game_context = GameContext(player, shoe, rules, dealer)
+        self.seats: list[Player] = seats
+        self.game_context = GameContext(seats[0], shoe, rules, dealer, players=list(seats))
         self.state_machine = state_machine
-        self.output_tracker = output_tracker or (lambda _: None)
+        self.output_tracker = output_tracker or ignore_event
         self.state_transition_graph = state_transition_graph
+        self.branch_actions = branch_actions
+        # With a summary, rounds only record each seat's net payout there: no graph states, transitions or events
+        self.summary: Optional[OutcomeSummary] = summary
+
+        # Aggregating rounds records each round's transitions as one signature and counts repeats of it, leaving the
+        # graph untouched until flush() or until max_round_signatures distinct signatures are counted; most rounds
+        # repeat a common path, so few signatures ever reach the graph
+        self.round_signatures: Optional[Counter[RoundSignature]] = Counter() if aggregate_rounds else None
+        self.max_round_signatures: int = max_round_signatures
+        self._round_transitions: list[Transition] = []
+        self._add_transition: Callable[[GraphState, Action, GraphState], None] = (
+            self._buffer_transition if aggregate_rounds else state_transition_graph.add_transition
+        )
+
+    def _buffer_transition(self, state: GraphState, action: Action, next_state: GraphState) -> None:
+        self._round_transitions.append((state, action, next_state))
+
+    def flush(self) -> StateTransitionGraph:
+        """Add the counted round signatures to the graph and reset the counts."""
+        if self.round_signatures:
+            self.state_transition_graph.add_round_signatures(self.round_signatures)
+            self.round_signatures.clear()
+        return self.state_transition_graph
 
     def _make_graph_state(self, player_hand: Hand, turn_state: TurnState) -> GraphState:
         # if we are in the mixed terminal state, we need to instantiate one
@@ -51,7 +102,7 @@ class Game:
             if len(outcomes) != 1:
                 raise RuntimeError(f"Expected exactly one outcome for terminal state {turn_state}, got: {outcomes}")
 
-            return TerminalState(outcomes[0])
+            return TerminalState.of(outcomes[0])
 
         dealer_upcard_rank = self.game_context.dealer.hand.cards[0].graph_rank
         turn = turn_state.turn
@@ -61,26 +112,162 @@ class Game:
     def _hand_to_graph_state(self, hand: Hand, turn, dealer_upcard_rank) -> GraphState:
         hand_value: HandValue = self.game_context.rules.hand_value(hand)
         if hand.is_pair():
-            return PairState(
-                pair_rank=hand.cards[0].graph_rank,
-                turn=turn,
-                dealer_upcard=dealer_upcard_rank,
-                split_count=len(self.game_context.player.hands) - 1,
+            return PairState.of(
+                hand.cards[0].graph_rank, turn, dealer_upcard_rank, len(self.game_context.player.hands) - 1
             )
-        return ProperState(
-            player_hand_value=hand_value.value,
-            player_hand_soft=hand_value.soft,
-            dealer_upcard_rank=dealer_upcard_rank,
-            turn=turn,
-        )
+        return ProperState.of(hand_value.value, hand_value.soft, dealer_upcard_rank, turn)
 
     def play_round(self) -> StateTransitionGraph:
-        turn_state: TurnState = TurnState.PRE_DEAL
-        graph_states: list[GraphState] = [PreDealState()]
-        graph_index: int = 0
+        """Play one round. A game can play any number of rounds, its players and hands are reset for each one."""
+        self.game_context.reset(self.seats)
+        if self.summary is not None:
+            self._play_summary_round(self.summary)
+            return self.state_transition_graph
+
+        self._round_transitions.clear()
+        if len(self.seats) == 1:
+            self._play_from(TurnState.PRE_DEAL, [PreDealState.of()], 0, self.output_tracker, self.branch_actions)
+        else:
+            self._play_table()
+
+        if self.round_signatures is not None:
+            self.round_signatures[tuple(self._round_transitions)] += 1
+            self._round_transitions.clear()
+            if len(self.round_signatures) >= self.max_round_signatures:
+                self.flush()
+
+        self.output_tracker(
+            RoundResultEvent(self.game_context.dealer.name, self.game_context.dealer.hand.cards.copy(), None)
+        )
+        return self.state_transition_graph
 
-        while not turn_state.handler.is_terminal():
-            decision, action = turn_state.handler.handle_turn(turn_state, self.game_context, self.output_tracker)
+    def _play_table(self) -> None:
+        """
+        Play every seat against one deal and one dealer hand: all seats are dealt, then each seat plays its turn in
+        order up to the dealer's turn, then the dealer plays once and every seat still in the round is settled.
+        """
+        context: GameContext = self.game_context
+        decision, action = TurnState.PRE_DEAL.handler.handle_turn(TurnState.PRE_DEAL, context, self.output_tracker)
+        turn_state: TurnState = self.state_machine.transition(TurnState.PRE_DEAL, decision)
+
+        waiting: list[tuple[Player, list[GraphState], int]] = []
+        for seat in self.seats:
+            context.player = seat
+            graph_states: list[GraphState] = [self._make_graph_state(seat.hand, turn_state)]
+            self._add_transition(PreDealState.of(), action, graph_states[0])
+
+            seat_turn_state, graph_index, last_action = self._advance(
+                turn_state, graph_states, 0, self.output_tracker, False, stop_at=TurnState.DEALER_TURN
+            )
+            if seat_turn_state == TurnState.DEALER_TURN:
+                waiting.append((seat, graph_states, graph_index))
+            else:
+                self._record_outcomes(seat_turn_state, graph_states, graph_index, last_action, self.output_tracker)
+
+        context.players = [seat for seat, _, _ in waiting]
+        for seat, graph_states, graph_index in waiting:
+            context.player = seat
+            self._play_from(TurnState.DEALER_TURN, graph_states, graph_index, self.output_tracker, False)
+            context.dealer_done = True
+
+    def _play_summary_round(self, summary: OutcomeSummary) -> None:
+        """Play a round like _play_table does, but only step the state machine and record payouts."""
+        context: GameContext = self.game_context
+        decision, _ = TurnState.PRE_DEAL.handler.handle_turn(TurnState.PRE_DEAL, context, ignore_event)
+        dealt_turn_state: TurnState = self.state_machine.transition(TurnState.PRE_DEAL, decision)
+        upcard_rank: str = context.dealer.hand.cards[0].graph_rank
+
+        waiting: list[tuple[Player, InitialHand]] = []
+        for seat in self.seats:
+            context.player = seat
+            first, second = seat.hand.cards
+            if RANK_INDEX[first.rank] > RANK_INDEX[second.rank]:
+                first, second = second, first
+            initial_hand: InitialHand = (first.graph_rank, second.graph_rank, upcard_rank)
+
+            turn_state = self._step(dealt_turn_state, stop_at=TurnState.DEALER_TURN)
+            if turn_state == TurnState.DEALER_TURN:
+                waiting.append((seat, initial_hand))
+            else:
+                summary.record(initial_hand, self._payout(turn_state))
+
+        context.players = [seat for seat, _ in waiting]
+        for seat, initial_hand in waiting:
+            context.player = seat
+            summary.record(initial_hand, self._payout(self._step(TurnState.DEALER_TURN)))
+            context.dealer_done = True
+
+    def _step(self, turn_state: TurnState, stop_at: Optional[TurnState] = None) -> TurnState:
+        while not turn_state.handler.is_terminal() and turn_state != stop_at:
+            decision, _ = turn_state.handler.handle_turn(turn_state, self.game_context, ignore_event)
+            turn_state = self.state_machine.transition(turn_state, decision)
+        return turn_state
+
+    def _payout(self, turn_state: TurnState) -> float:
+        """The current seat's net payout over all its hands, doubled hands paying twice."""
+        rules: Rules = self.game_context.rules
+        outcomes: list[Outcome] = turn_state.handler.get_outcomes(self.game_context, turn_state)
+        return sum(
+            rules.get_outcome_payout(outcome) * (2 if hand.doubled else 1)
+            for outcome, hand in zip(outcomes, self.game_context.player.hands)
+        )
+
+    def _is_player_decision(self, turn_state: TurnState) -> bool:
+        return isinstance(turn_state.handler, TakeTurnHandler) and turn_state.handler.is_player
+
+    def _play_alternative_actions(
+        self, turn_state: TurnState, graph_states: list[GraphState], graph_index: int
+    ) -> None:
+        """
+        Play every action the strategy did not choose from the same snapshot, so each one sees the same remaining
+        cards (common random numbers), then set up the chosen action to continue the round.
+        """
+        player: Player = self.game_context.player
+        actions = self.game_context.rules.available_actions(turn_state, player.hand, len(player.hands) - 1)
+        chosen: Action = player.strategy.choose_action(
+            player.hand, actions, self.game_context.strategy_state(player, turn_state.turn)
+        )
+        snapshot: GameContextSnapshot = self.game_context.snapshot()
+
+        for action in actions:
+            if action == chosen:
+                continue
+
+            self.game_context.forced_action = action
+            self._play_from(turn_state, list(graph_states), graph_index, ignore_event, branch_actions=False)
+            self.game_context.restore(snapshot)
+
+        self.game_context.forced_action = chosen
+
+    def _play_from(
+        self,
+        turn_state: TurnState,
+        graph_states: list[GraphState],
+        graph_index: int,
+        output_tracker: Callable[[GameEvent], None],
+        branch_actions: bool,
+    ) -> None:
+        turn_state, graph_index, action = self._advance(
+            turn_state, graph_states, graph_index, output_tracker, branch_actions
+        )
+        self._record_outcomes(turn_state, graph_states, graph_index, action, output_tracker)
+
+    def _advance(
+        self,
+        turn_state: TurnState,
+        graph_states: list[GraphState],
+        graph_index: int,
+        output_tracker: Callable[[GameEvent], None],
+        branch_actions: bool,
+        stop_at: Optional[TurnState] = None,
+    ) -> tuple[TurnState, int, Action]:
+        """Step the state machine until a terminal state (or stop_at), recording transitions along the way."""
+        action: Action = Action.NOOP
+        while not turn_state.handler.is_terminal() and turn_state != stop_at:
+            if branch_actions and self._is_player_decision(turn_state):
+                self._play_alternative_actions(turn_state, graph_states, graph_index)
+
+            decision, action = turn_state.handler.handle_turn(turn_state, self.game_context, output_tracker)
             next_turn_state: TurnState = self.state_machine.transition(turn_state, decision)
 
             player_card = self.game_context.player.hand.cards[0].graph_rank
@@ -93,28 +280,17 @@ class Game:
                 ), "Expected game context to have a split given transitioning to next hand"
 
                 graph_index += 1
-                next_graph_state: GraphState = NewSplitHandState(
-                    player_card=player_card,
-                    dealer_upcard_rank=dealer_upcard_rank,
-                    split_count=split_count,
-                )
-                self.state_transition_graph.add_transition(graph_states[graph_index], action, next_graph_state)
+                next_graph_state: GraphState = NewSplitHandState.of(player_card, dealer_upcard_rank, split_count)
+                self._add_transition(graph_states[graph_index], action, next_graph_state)
                 graph_states[graph_index] = next_graph_state
             elif decision == Decision.SPLIT:
-                next_graph_state = NewSplitHandState(
-                    player_card=player_card,
-                    dealer_upcard_rank=dealer_upcard_rank,
-                    split_count=split_count,
-                )
-
-                later_graph_state: PendingSplitHandState = PendingSplitHandState(
-                    player_card=player_card,
-                    dealer_upcard_rank=dealer_upcard_rank,
-                    min_split_count=split_count,
+                next_graph_state = NewSplitHandState.of(player_card, dealer_upcard_rank, split_count)
+                later_graph_state: PendingSplitHandState = PendingSplitHandState.of(
+                    player_card, dealer_upcard_rank, split_count
                 )
 
-                self.state_transition_graph.add_transition(
-                    graph_states[graph_index], action, SplitState(next_graph_state, later_graph_state)
+                self._add_transition(
+                    graph_states[graph_index], action, SplitState.of(next_graph_state, later_graph_state)
                 )
                 graph_states.append(later_graph_state)
                 graph_states[graph_index] = next_graph_state
@@ -126,7 +302,7 @@ class Game:
                 if next_turn_state.turn != Turn.DEALER and next_turn_state != TurnState.EVALUATE_GAME:
                     next_graph_state = self._make_graph_state(self.game_context.player.hand, next_turn_state)
                     if next_graph_state != graph_states[graph_index]:
-                        self.state_transition_graph.add_transition(graph_states[graph_index], action, next_graph_state)
+                        self._add_transition(graph_states[graph_index], action, next_graph_state)
                         graph_states[graph_index] = next_graph_state
 
                     turn_state = next_turn_state
@@ -139,11 +315,21 @@ class Game:
 
                     # TODO: should we only count this once per unique transition?
                     if next_graph_state != graph_states[i]:
-                        self.state_transition_graph.add_transition(graph_states[i], action, next_graph_state)
+                        self._add_transition(graph_states[i], action, next_graph_state)
                         graph_states[i] = next_graph_state
 
             turn_state = next_turn_state
 
+        return turn_state, graph_index, action
+
+    def _record_outcomes(
+        self,
+        turn_state: TurnState,
+        graph_states: list[GraphState],
+        graph_index: int,
+        action: Action,
+        output_tracker: Callable[[GameEvent], None],
+    ) -> None:
         player: Player = self.game_context.player
         outcomes: list[Outcome] = turn_state.handler.get_outcomes(self.game_context, turn_state)
         assert (
@@ -159,21 +345,17 @@ class Game:
                         f"but got new outcome {outcome}"
                     )
 
-                self.output_tracker(RoundResultEvent(player.name, player.hands[i].cards, outcome))
+                output_tracker(RoundResultEvent(player.name, player.hands[i].cards.copy(), outcome))
                 continue
 
-            terminal_state: TerminalState = TerminalState(outcome)
-            self.state_transition_graph.add_transition(graph_states[i], action, terminal_state)
-            self.output_tracker(RoundResultEvent(player.name, player.hands[i].cards, outcome))
+            terminal_state: TerminalState = TerminalState.of(outcome)
+            self._add_transition(graph_states[i], action, terminal_state)
+            output_tracker(RoundResultEvent(player.name, player.hands[i].cards.copy(), outcome))
             graph_states[i] = terminal_state
 
-        self.output_tracker(RoundResultEvent(self.game_context.dealer.name, self.game_context.dealer.hand.cards, None))
-
         assert (
             graph_index == len(graph_states) - 1
         ), f"Graph index {graph_index} should match the length of graph states {len(graph_states)}"
         assert all(
             isinstance(state, TerminalState) for state in graph_states
         ), f"All split source nodes should be terminal states at the end of a round, got: {graph_states}"
-
-        return self.state_transition_graph
@@ -98,3 +98,7 @@ GameEvent = Union[
     HitEvent,
     RoundResultEvent,
 ]
+
+
+def ignore_event(_: GameEvent) -> None:
+    """Output tracker for when nobody is listening; handlers skip building events for it."""
@@ -1,6 +1,26 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from blackjack.entities.card import Card
+from blackjack.entities.hand import Hand
 from blackjack.entities.player import Player
 from blackjack.entities.shoe import Shoe
+from blackjack.entities.state import Turn
 from blackjack.rules.base import Rules
+from blackjack.turn.action import Action
+
+
+@dataclass(frozen=True)
+class GameContextSnapshot:
+    """
+    Copy-light record of a round in progress: only the shoe cursor, card references and indices are kept.
+    """
+
+    dealt_count: int
+    player_hands: tuple[tuple[Card, ...], ...]
+    doubled: tuple[bool, ...]
+    active_index: int
+    dealer_card_count: int
 
 
 class GameContext:
@@ -10,12 +30,66 @@ class GameContext:
         shoe: Shoe,
         rules: Rules,
         dealer: Player,
+        players: Optional[list[Player]] = None,
     ) -> None:
+        # player is the seat currently being played; players are all seats still in the round, in seat order
         self.player: Player = player
+        self.players: list[Player] = players or [player]
         self.shoe: Shoe = shoe
         self.rules: Rules = rules
         self.dealer: Player = dealer
         self.is_player_turn: bool = True
+        self.forced_action: Optional[Action] = None
+        self.dealer_done: bool = False
+
+    def reset(self, players: list[Player]) -> None:
+        """Set up the context and every seat and the dealer for a new round, reusing their objects."""
+        for player in players:
+            player.reset()
+        self.dealer.reset()
+        self.player = players[0]
+        self.players[:] = players
+        self.is_player_turn = True
+        self.forced_action = None
+        self.dealer_done = False
 
     def has_split(self):
         return len(self.player.hands) > 1
+
+    def strategy_state(self, actor: Player, turn: Turn) -> dict[str, object]:
+        """The game_state handed to Strategy.choose_action: what a player can see at the table."""
+        # Until the dealer plays, the hole card is as unknown to the players as the cards left in the shoe
+        hole_cards = self.dealer.hand.cards[1:] if turn != Turn.DEALER else []
+        return {
+            "dealer_upcard_rank": self.dealer.hand.cards[0].graph_rank,
+            "split_count": len(actor.hands) - 1,
+            "turn": turn,
+            "shoe_composition": self.shoe.composition(hole_cards),
+        }
+
+    def snapshot(self) -> GameContextSnapshot:
+        return GameContextSnapshot(
+            dealt_count=self.shoe.dealt_count(),
+            player_hands=tuple(tuple(hand.cards) for hand in self.player.hands),
+            doubled=tuple(hand.doubled for hand in self.player.hands),
+            active_index=self.player.active_index,
+            dealer_card_count=len(self.dealer.hand.cards),
+        )
+
+    def restore(self, snapshot: GameContextSnapshot) -> None:
+        """Rewind the shoe and hands to a snapshot, so the same remaining cards are dealt again."""
+        self.shoe.rewind(snapshot.dealt_count)
+
+        hands: list[Hand] = self.player.hands
+        num_hands: int = len(snapshot.player_hands)
+        del hands[num_hands:]
+        for i, cards in enumerate(snapshot.player_hands):
+            if i == len(hands):
+                hands.append(Hand())
+            hands[i].cards[:] = cards
+            hands[i].doubled = snapshot.doubled[i]
+
+        self.player.active_index = snapshot.active_index
+        dealer_card_count: int = snapshot.dealer_card_count
+        del self.dealer.hand.cards[dealer_card_count:]
+        self.forced_action = None
@@ -1,7 +1,7 @@
 import logging
 from abc import ABC, abstractmethod
 from enum import Enum, auto
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING, Callable, Optional
 
 from blackjack.entities.hand import Hand
 from blackjack.entities.player import Player
@@ -15,6 +15,7 @@ from blackjack.game_events import (
     GameEvent,
     HitEvent,
     TwentyOneEvent,
+    ignore_event,
 )
 from blackjack.gameplay.game_context import GameContext
 from blackjack.rules.base import HandValue, Rules
@@ -73,9 +74,10 @@ class PreDealHandler(TurnHandler):
         self, state: "TurnState", game_context: GameContext, output_tracker: Callable[[GameEvent], None]
     ) -> tuple[Decision, Action]:
         for _ in range(2):
-            card = game_context.shoe.deal_card()
-            game_context.player.hand.add_card(card)
-            output_tracker(DealEvent(to=game_context.player.name, card=card))
+            for player in game_context.players:
+                card = game_context.shoe.deal_card()
+                player.hand.add_card(card)
+                output_tracker(DealEvent(to=player.name, card=card))
 
             card = game_context.shoe.deal_card()
             game_context.dealer.hand.add_card(card)
@@ -154,10 +156,18 @@ class TakeTurnHandler(TurnHandler):
         rules: Rules = game_context.rules
         actor: Player = game_context.player if self.is_player else game_context.dealer
 
-        # Skip dealer's turn if all players are busted
-        if not self.is_player and all(rules.is_bust(hand) for hand in game_context.player.hands):
+        # Skip dealer's turn if it was already played for another seat, or if all players are busted
+        if not self.is_player and (
+            game_context.dealer_done
+            or all(rules.is_bust(hand) for player in game_context.players for hand in player.hands)
+        ):
             return Decision.STAND, Action.NOOP
 
+        if not self.is_player:
+            dealer_rules: Optional[Rules] = actor.strategy.dealer_rules
+            if dealer_rules is not None:
+                return play_dealer_hand(game_context, output_tracker, dealer_rules), Action.NOOP
+
         actions = rules.available_actions(state, actor.hand, len(actor.hands) - 1)
         if not actions:
             raise RuntimeError(
@@ -166,7 +176,12 @@ class TakeTurnHandler(TurnHandler):
             )
 
         hand_value: HandValue = rules.hand_value(actor.hand)
-        action: Action = actor.strategy.choose_action(actor.hand, actions, {})
+        action: Action
+        if self.is_player and game_context.forced_action is not None:
+            action = game_context.forced_action
+            game_context.forced_action = None
+        else:
+            action = actor.strategy.choose_action(actor.hand, actions, game_context.strategy_state(actor, state.turn))
         output_tracker(ChooseActionEvent(player=actor.name, action=action, hand=actor.hand.cards.copy()))
         if logger.isEnabledFor(logging.INFO):
             logging.info(f"{actor.name} chooses {action.name} with hand: {actor.hand} ({hand_value})")
@@ -193,6 +208,7 @@ class TakeTurnHandler(TurnHandler):
         elif action == Action.DOUBLE:
             card = game_context.shoe.deal_card()
             actor.hand.add_card(card)
+            actor.hand.doubled = True
             new_hand_value = rules.hand_value(actor.hand)
 
             output_tracker(
@@ -220,6 +236,49 @@ class TakeTurnHandler(TurnHandler):
             )
 
 
+def play_dealer_hand(
+    game_context: GameContext, output_tracker: Callable[[GameEvent], None], dealer_rules: Rules
+) -> Decision:
+    """
+    Play out the dealer's hand in one loop, hitting whenever the dealer strategy's rules say so, instead of a
+    DEALER_TURN and CHECK_DEALER_CARD_STATE step per card. Emits the same events those steps would, unless nobody is
+    listening.
+    """
+    rules: Rules = game_context.rules
+    dealer: Player = game_context.dealer
+    hand: Hand = dealer.hand
+    emit: bool = output_tracker is not ignore_event
+    log: bool = logger.isEnabledFor(logging.INFO)
+
+    while dealer_rules.dealer_should_hit(hand):
+        if emit:
+            output_tracker(ChooseActionEvent(player=dealer.name, action=Action.HIT, hand=hand.cards.copy()))
+
+        card = game_context.shoe.deal_card()
+        hand.add_card(card)
+        hand_value: HandValue = rules.hand_value(hand)
+        if emit:
+            output_tracker(HitEvent(player=dealer.name, card=card, new_hand=hand.cards.copy(), value=hand_value.value))
+        if log:
+            logging.info(f"{dealer.name} hit and receives: {card}. New hand: {hand} ({hand_value})")
+
+        if hand_value.value > 21:
+            if emit:
+                output_tracker(BustEvent(player=dealer.name, hand=hand.cards.copy(), value=hand_value.value))
+            if log:
+                logging.info(f"{dealer.name} busts with hand: {hand} ({hand_value})")
+            return Decision.BUST
+
+        if hand_value.value == 21:
+            if emit:
+                output_tracker(TwentyOneEvent(player=dealer.name, hand=hand.cards.copy()))
+            return Decision.STAND
+
+    if emit:
+        output_tracker(ChooseActionEvent(player=dealer.name, action=Action.STAND, hand=hand.cards.copy()))
+    return Decision.STAND
+
+
 class CheckPlayerCardStateHandler(TurnHandler):
     def __init__(self, is_player: bool):
         super().__init__()
@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, AbstractSet
 
 from blackjack.entities.hand import Hand
 from blackjack.entities.state import Outcome
@@ -36,7 +36,7 @@ class Rules:
     def blackjack_payout(self) -> float:
         raise NotImplementedError  # pragma: nocover
 
-    def available_actions(self, turn_state: "TurnState", hand: Hand, split_count_so_far: int) -> list[Action]:
+    def available_actions(self, turn_state: "TurnState", hand: Hand, split_count_so_far: int) -> tuple[Action, ...]:
         raise NotImplementedError  # pragma: nocover
 
     def get_outcome_payout(self, outcome: Outcome) -> float:
@@ -45,5 +45,5 @@ class Rules:
     def get_possible_outcomes(self) -> list[Outcome]:
         raise NotImplementedError  # pragma: nocover
 
-    def get_viable_actions(self, previous_action):
-        raise NotImplementedError
+    def get_viable_actions(self, previous_action: Action) -> AbstractSet[Action]:
+        raise NotImplementedError  # pragma: nocover
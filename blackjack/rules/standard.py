@@ -1,9 +1,13 @@
+from typing import AbstractSet
+
 from blackjack.entities.hand import Hand
 from blackjack.entities.state import Outcome, Turn
 from blackjack.rules.base import HandValue, Rules
 from blackjack.turn.action import Action
 from blackjack.turn.turn_state import TurnState
 
+DEALER_ACTIONS: tuple[Action, ...] = (Action.HIT, Action.STAND)
+
 
 class StandardBlackjackRules(Rules):
     def __init__(self, resplit_aces: bool = False, play_split_aces: bool = False, max_splits: int = 3) -> None:
@@ -11,6 +15,42 @@ class StandardBlackjackRules(Rules):
         self.max_splits: int = max_splits
         self.play_split_aces: bool = play_split_aces
 
+        # Player actions indexed by [initial turn][pair][first card is an ace][split count], where every split count
+        # past max_splits shares the last entry, so a decision is a few list lookups returning a shared tuple
+        self._player_actions: list[list[list[list[tuple[Action, ...]]]]] = [
+            [
+                [
+                    [
+                        self._compile_player_actions(initial, pair, ace, split_count)
+                        for split_count in range(max_splits + 2)
+                    ]
+                    for ace in (False, True)
+                ]
+                for pair in (False, True)
+            ]
+            for initial in (False, True)
+        ]
+        self._viable_actions: dict[Action, frozenset[Action]] = {
+            Action.HIT: frozenset({Action.HIT, Action.STAND}),
+            Action.DOUBLE: frozenset({Action.STAND}),
+            Action.SPLIT: frozenset({Action.HIT, Action.STAND, Action.DOUBLE, Action.SPLIT}),
+        }
+
+    def _compile_player_actions(self, initial: bool, pair: bool, ace: bool, split_count: int) -> tuple[Action, ...]:
+        actions = [Action.STAND]
+
+        if split_count == 0 or not ace or self.play_split_aces:
+            actions.append(Action.HIT)
+
+            if initial:
+                actions.append(Action.DOUBLE)
+
+        if pair and split_count < self.max_splits:
+            if split_count == 0 or not ace or self.resplit_aces:
+                actions.append(Action.SPLIT)
+
+        return tuple(actions)
+
     def hand_value(self, hand: Hand) -> HandValue:
         value: int = 0
         aces: int = 0
@@ -34,27 +74,20 @@ class StandardBlackjackRules(Rules):
     def is_bust(self, hand: Hand) -> bool:
         return self.hand_value(hand).value > 21
 
+    def dealer_should_hit(self, hand: Hand) -> bool:
+        return self.hand_value(hand).value < 17
+
     def blackjack_payout(self) -> float:
         return 1.5
 
-    def available_actions(self, turn_state: TurnState, hand: Hand, split_count_so_far: int) -> list[Action]:
+    def available_actions(self, turn_state: TurnState, hand: Hand, split_count_so_far: int) -> tuple[Action, ...]:
         if turn_state.turn == Turn.DEALER:
-            return [Action.HIT, Action.STAND]
+            return DEALER_ACTIONS
         elif turn_state.turn == Turn.PLAYER:
-            actions = [Action.STAND]
-            pair: bool = hand.is_pair()
-
-            if split_count_so_far == 0 or not hand.cards[0].is_ace() or self.play_split_aces:
-                actions.append(Action.HIT)
-
-                if turn_state == TurnState.PLAYER_INITIAL_TURN:
-                    actions.append(Action.DOUBLE)
-
-            if pair and split_count_so_far < self.max_splits:
-                if split_count_so_far == 0 or not hand.cards[0].is_ace() or self.resplit_aces:
-                    actions.append(Action.SPLIT)
-
-            return actions
+            by_split_count = self._player_actions[turn_state == TurnState.PLAYER_INITIAL_TURN][hand.is_pair()][
+                hand.cards[0].is_ace()
+            ]
+            return by_split_count[min(split_count_so_far, self.max_splits + 1)]
 
         raise RuntimeError(f"Unexpected turn state to choose actions: {turn_state}")
 
@@ -73,12 +106,5 @@ class StandardBlackjackRules(Rules):
     def get_possible_outcomes(self) -> list[Outcome]:
         return [Outcome.WIN, Outcome.LOSE, Outcome.PUSH, Outcome.BLACKJACK]
 
-    def get_viable_actions(self, previous_action):
-        if previous_action == Action.HIT:
-            return {Action.HIT, Action.STAND}
-        elif previous_action == Action.DOUBLE:
-            return set(Action.STAND)
-        elif previous_action == Action.SPLIT:
-            return {Action.HIT, Action.STAND, Action.DOUBLE, Action.SPLIT}
-        else:
-            return set()
+    def get_viable_actions(self, previous_action: Action) -> AbstractSet[Action]:
+        return self._viable_actions.get(previous_action, frozenset())
@@ -0,0 +1,559 @@
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import pickle
+import queue
+import tempfile
+from typing import Iterator, Optional
+
+from blackjack.blackjack_service import (
+    BlackjackService,
+    GraphUpdate,
+    optimal_actions,
+)
+from blackjack.entities.spilling_graph import SpillingTransitionGraph
+from blackjack.entities.state import GraphState, Turn
+from blackjack.entities.state_transition_graph import StateTransitionGraph
+from blackjack.ev_calculator import StateEV
+from blackjack.strategy.bandit import ActionStatistics, estimates_from_evs
+from blackjack.strategy.base import Strategy
+from blackjack.strategy.lookup_table import LookupTableStrategy
+from blackjack.strategy.strategy import ExploringStrategy
+from blackjack.stratification import Allocation, StratumShare, split_stratum_share
+from blackjack.summary import OutcomeSummary
+from blackjack.turn.action import Action
+
+
+def print_ev_results(state_evs: dict[GraphState, StateEV]) -> None:
+    """Print the EV calculation results in a readable format."""
+    print("\n=== Expected Value Analysis ===")
+
+    for state, state_ev in state_evs.items():
+        if hasattr(state, "turn") and (state.turn != Turn.PLAYER or state_ev.optimal_action == Action.NOOP):
+            continue
+
+        print(f"\nState: {state}")
+        print(f"  Optimal Action: {state_ev.optimal_action.name}")
+        print(f"  Total Count: {state_ev.total_count}")
+        print("  Action EVs:")
+        for action, ev in state_ev.action_evs.items():
+            print(f"    {action.name}: {ev:.8f}")
+
+
+def batch_service(
+    num_decks: int,
+    branch_actions: bool = False,
+    strategy_file: Optional[str] = None,
+    exploration_rate: float = 0.0,
+    num_seats: int = 1,
+) -> BlackjackService:
+    player_strategy: Optional[Strategy] = LookupTableStrategy.load(strategy_file) if strategy_file else None
+    if player_strategy is not None and exploration_rate:
+        player_strategy = ExploringStrategy(player_strategy, exploration_rate)
+
+    return BlackjackService(
+        num_decks=num_decks, player_strategy=player_strategy, branch_actions=branch_actions, num_seats=num_seats
+    )
+
+
+def run_batch(
+    num_decks: int,
+    num_rounds: int,
+    shuffle_between_rounds: bool,
+    printable: bool = True,
+    stratify: Optional[str] = None,
+    branch_actions: bool = False,
+    strategy_file: Optional[str] = None,
+    exploration_rate: float = 0.0,
+    num_seats: int = 1,
+    flush_queue: Optional[queue.Queue] = None,
+    flush_rounds: int = 0,
+    flush_seconds: Optional[float] = None,
+    stratum_share: Optional[StratumShare] = None,
+) -> StateTransitionGraph:
+    """
+    Play a batch and return its graph. With a flush_queue, the batch instead puts a (rounds, graph) delta on the queue
+    every flush_rounds rounds or flush_seconds seconds and starts a new graph, so the worker only ever holds one
+    delta, and the returned graph is empty. A stratum_share plays that share of a stratified run allocated by the
+    parent, instead of stratifying num_rounds on its own.
+    """
+    cli = batch_service(num_decks, branch_actions, strategy_file, exploration_rate, num_seats)
+
+    if stratum_share is not None:
+        return cli.play_stratum_share(stratum_share)
+
+    if stratify:
+        return cli.play_stratified_games(num_rounds=num_rounds, allocation=Allocation(stratify))
+
+    if flush_queue is not None:
+        updates = cli.play_games_iter(
+            num_rounds, flush_rounds or num_rounds or 1, shuffle_between_rounds, chunk_seconds=flush_seconds
+        )
+        for update in updates:
+            flush_queue.put((update.rounds, update.graph))
+        return StateTransitionGraph()
+
+    return cli.play_games(
+        num_rounds=num_rounds,
+        shuffle_between_rounds=shuffle_between_rounds,
+        printable=printable,
+    )
+
+
+def run_batch_with_args(args):
+    return run_batch(*args)
+
+
+def split_rounds(num_rounds: int, parallel: int) -> list[int]:
+    base_batch = num_rounds // parallel
+    remainder = num_rounds % parallel
+    return [base_batch + (1 if i < remainder else 0) for i in range(parallel)]
+
+
+def split_into_chunks(num_rounds: int, chunk_size: int) -> list[int]:
+    return [min(chunk_size, num_rounds - start) for start in range(0, num_rounds, chunk_size)]
+
+
+def _accumulate(accumulated: Optional[StateTransitionGraph], graph: StateTransitionGraph) -> StateTransitionGraph:
+    """The graph to yield for a delta: the delta itself, or the accumulated graph with the delta merged in."""
+    if accumulated is None:
+        return graph
+
+    accumulated.merge(graph)
+    return accumulated
+
+
+def iter_parallel_batches(
+    num_decks: int,
+    batch_sizes: list[int],
+    parallel: int,
+    shuffle_between_rounds: bool = True,
+    stratify: Optional[str] = None,
+    branch_actions: bool = False,
+    strategy_file: Optional[str] = None,
+    num_seats: int = 1,
+    stratum_shares: Optional[list[StratumShare]] = None,
+    snapshots: bool = False,
+) -> Iterator[GraphUpdate]:
+    """
+    Run the batches on a worker pool and yield each batch's graph as soon as it completes, or with snapshots the one
+    graph every completed batch has been merged into, like BlackjackService.play_games_iter. With stratum_shares,
+    batch i plays share i of a stratified run.
+    """
+    total_rounds = sum(batch_sizes)
+    played = 0
+    accumulated: Optional[StateTransitionGraph] = StateTransitionGraph() if snapshots else None
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=parallel) as executor:
+        futures = {
+            executor.submit(
+                run_batch,
+                num_decks,
+                batch_size,
+                shuffle_between_rounds,
+                False,
+                stratify,
+                branch_actions,
+                strategy_file,
+                num_seats=num_seats,
+                stratum_share=stratum_shares[i] if stratum_shares else None,
+            ): batch_size
+            for i, batch_size in enumerate(batch_sizes)
+        }
+
+        for future in concurrent.futures.as_completed(futures):
+            batch_size = futures.pop(future)
+            played += batch_size
+            yield GraphUpdate(_accumulate(accumulated, future.result()), batch_size, played, total_rounds)
+
+
+def iter_flushed_batches(
+    num_decks: int,
+    batch_sizes: list[int],
+    parallel: int,
+    flush_rounds: int = 0,
+    flush_seconds: Optional[float] = None,
+    shuffle_between_rounds: bool = True,
+    branch_actions: bool = False,
+    strategy_file: Optional[str] = None,
+    num_seats: int = 1,
+    poll_seconds: float = 0.1,
+    snapshots: bool = False,
+) -> Iterator[GraphUpdate]:
+    """
+    Run the batches on a worker pool with every worker flushing deltas to a shared queue, and yield each delta as it
+    arrives, or with snapshots the one graph every delta so far has been merged into. Workers hold one delta at a
+    time and the pickling is spread over the run rather than left to the end.
+    """
+    total_rounds = sum(batch_sizes)
+    played = 0
+    accumulated: Optional[StateTransitionGraph] = StateTransitionGraph() if snapshots else None
+
+    with multiprocessing.Manager() as manager, concurrent.futures.ProcessPoolExecutor(max_workers=parallel) as executor:
+        deltas = manager.Queue()
+        futures = [
+            executor.submit(
+                run_batch,
+                num_decks,
+                batch_size,
+                shuffle_between_rounds,
+                False,
+                None,
+                branch_actions,
+                strategy_file,
+                num_seats=num_seats,
+                flush_queue=deltas,
+                flush_rounds=flush_rounds,
+                flush_seconds=flush_seconds,
+            )
+            for batch_size in batch_sizes
+        ]
+
+        while played < total_rounds:
+            try:
+                rounds, graph = deltas.get(timeout=poll_seconds)
+            except queue.Empty:
+                # A worker that died will never send its remaining deltas
+                for future in futures:
+                    if future.done():
+                        future.result()
+                continue
+
+            played += rounds
+            yield GraphUpdate(_accumulate(accumulated, graph), rounds, played, total_rounds)
+
+
+def run_batch_to_file(directory: str, *args, **kwargs) -> str:
+    graph = run_batch(*args, **kwargs)
+    fd, path = tempfile.mkstemp(suffix=".graph", dir=directory)
+    with os.fdopen(fd, "wb") as f:
+        pickle.dump(graph, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def merge_graph_files(first_path: str, second_path: str) -> str:
+    """Merge the graph in second_path into the one in first_path, deleting the second file. Returns first_path."""
+    with open(first_path, "rb") as f:
+        graph: StateTransitionGraph = pickle.load(f)
+    with open(second_path, "rb") as f:
+        graph.merge(pickle.load(f))
+
+    with open(first_path, "wb") as f:
+        pickle.dump(graph, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.remove(second_path)
+    return first_path
+
+
+def tree_merge_batches(
+    num_decks: int,
+    batch_sizes: list[int],
+    parallel: int,
+    shuffle_between_rounds: bool = True,
+    stratify: Optional[str] = None,
+    branch_actions: bool = False,
+    strategy_file: Optional[str] = None,
+    num_seats: int = 1,
+    stratum_shares: Optional[list[StratumShare]] = None,
+) -> StateTransitionGraph:
+    """
+    Run the batches and reduce their graphs pairwise on the workers, so P graphs take about log2(P) rounds of
+    parallel merges instead of P serial merges in the parent. Graphs are handed between workers as temporary files;
+    the parent only pairs up paths as they complete and loads the final graph. With stratum_shares, batch i plays
+    share i of a stratified run.
+    """
+    with tempfile.TemporaryDirectory() as directory, concurrent.futures.ProcessPoolExecutor(
+        max_workers=parallel
+    ) as executor:
+        pending: set[concurrent.futures.Future] = {
+            executor.submit(
+                run_batch_to_file,
+                directory,
+                num_decks,
+                batch_size,
+                shuffle_between_rounds,
+                False,
+                stratify,
+                branch_actions,
+                strategy_file,
+                num_seats=num_seats,
+                stratum_share=stratum_shares[i] if stratum_shares else None,
+            )
+            for i, batch_size in enumerate(batch_sizes)
+        }
+        ready: list[str] = []
+
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            ready.extend(future.result() for future in done)
+            while len(ready) >= 2:
+                pending.add(executor.submit(merge_graph_files, ready.pop(), ready.pop()))
+
+        if not ready:
+            return StateTransitionGraph()
+
+        with open(ready[0], "rb") as f:
+            return pickle.load(f)
+
+
+def run_parallel_batches(
+    num_decks: int,
+    num_rounds: int,
+    no_shuffle_between: bool,
+    no_print: bool,
+    parallel: int,
+    main_graph: StateTransitionGraph,
+    stratify: Optional[str] = None,
+    branch_actions: bool = False,
+    strategy_file: Optional[str] = None,
+    num_seats: int = 1,
+    chunk_size: int = 0,
+    tree_merge: bool = False,
+    flush_rounds: int = 0,
+    flush_seconds: Optional[float] = None,
+) -> None:
+    if parallel == 1 or num_rounds == 1:
+        graph = run_batch(
+            num_decks,
+            num_rounds,
+            not no_shuffle_between,
+            not no_print,
+            stratify,
+            branch_actions,
+            strategy_file,
+            num_seats=num_seats,
+        )
+        main_graph.merge(graph)
+        return
+
+    batch_sizes = split_into_chunks(num_rounds, chunk_size) if chunk_size else split_rounds(num_rounds, parallel)
+
+    stratum_shares: Optional[list[StratumShare]] = None
+    if stratify:
+        # Strata are allocated once for the whole run, and every batch plays a share of that allocation, so batches
+        # need not cover every stratum themselves
+        share, pilot_graph = batch_service(num_decks, branch_actions, strategy_file).allocate_strata(
+            num_rounds, Allocation(stratify)
+        )
+        main_graph.merge(pilot_graph)
+        stratum_shares = split_stratum_share(share, len(batch_sizes))
+        batch_sizes = [sum(stratum_share.round_counts) for stratum_share in stratum_shares]
+
+    if tree_merge:
+        main_graph.merge(
+            tree_merge_batches(
+                num_decks,
+                batch_sizes,
+                parallel,
+                not no_shuffle_between,
+                stratify,
+                branch_actions,
+                strategy_file,
+                num_seats,
+                stratum_shares,
+            )
+        )
+        return
+
+    if flush_rounds or flush_seconds:
+        updates = iter_flushed_batches(
+            num_decks,
+            batch_sizes,
+            parallel,
+            flush_rounds,
+            flush_seconds,
+            not no_shuffle_between,
+            branch_actions,
+            strategy_file,
+            num_seats,
+        )
+    else:
+        updates = iter_parallel_batches(
+            num_decks,
+            batch_sizes,
+            parallel,
+            not no_shuffle_between,
+            stratify,
+            branch_actions,
+            strategy_file,
+            num_seats,
+            stratum_shares,
+        )
+
+    for update in updates:
+        main_graph.merge(update.graph)
+        logging.info(f"Merged {update.rounds_played}/{update.total_rounds} rounds")
+
+
+def run_spilling_batches(
+    num_decks: int,
+    num_rounds: int,
+    parallel: int,
+    spilled_graph: SpillingTransitionGraph,
+    chunk_size: int = 10000,
+    shuffle_between_rounds: bool = True,
+    strategy_file: Optional[str] = None,
+    num_seats: int = 1,
+) -> None:
+    """
+    Play num_rounds in chunks of chunk_size and add each chunk's graph to spilled_graph as it completes, so neither
+    the workers nor the parent ever hold more than a chunk's graph besides the spilling graph's buffer.
+    """
+    if parallel == 1:
+        player_strategy = LookupTableStrategy.load(strategy_file) if strategy_file else None
+        service = BlackjackService(num_decks=num_decks, player_strategy=player_strategy, num_seats=num_seats)
+        updates = service.play_games_iter(num_rounds, chunk_size, shuffle_between_rounds)
+    else:
+        batch_sizes = split_into_chunks(num_rounds, chunk_size)
+        updates = iter_parallel_batches(
+            num_decks, batch_sizes, parallel, shuffle_between_rounds, strategy_file=strategy_file, num_seats=num_seats
+        )
+
+    for update in updates:
+        spilled_graph.merge(update.graph)
+        logging.info(
+            f"Merged {update.rounds_played}/{update.total_rounds} rounds, {len(spilled_graph.run_paths)} runs spilled"
+        )
+
+
+def run_summary_batch(
+    num_decks: int,
+    num_rounds: int,
+    shuffle_between_rounds: bool,
+    strategy_file: Optional[str] = None,
+    num_seats: int = 1,
+) -> OutcomeSummary:
+    player_strategy = LookupTableStrategy.load(strategy_file) if strategy_file else None
+    cli = BlackjackService(num_decks=num_decks, player_strategy=player_strategy, num_seats=num_seats)
+    return cli.play_summary_games(num_rounds, shuffle_between_rounds)
+
+
+def run_summary_batches(
+    num_decks: int,
+    num_rounds: int,
+    parallel: int,
+    shuffle_between_rounds: bool = True,
+    strategy_file: Optional[str] = None,
+    num_seats: int = 1,
+    chunk_size: int = 0,
+) -> OutcomeSummary:
+    """Play num_rounds on a worker pool in summary-only mode and merge the workers' summaries."""
+    if parallel == 1 or num_rounds == 1:
+        return run_summary_batch(num_decks, num_rounds, shuffle_between_rounds, strategy_file, num_seats)
+
+    summary = OutcomeSummary()
+    batch_sizes = split_into_chunks(num_rounds, chunk_size) if chunk_size else split_rounds(num_rounds, parallel)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=parallel) as executor:
+        futures = [
+            executor.submit(run_summary_batch, num_decks, batch_size, shuffle_between_rounds, strategy_file, num_seats)
+            for batch_size in batch_sizes
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            summary.merge(future.result())
+
+    return summary
+
+
+def run_policy_iteration(
+    num_decks: int,
+    num_rounds: int,
+    parallel: int,
+    max_iterations: int,
+    exploration_rate: float,
+    main_graph: StateTransitionGraph,
+) -> int:
+    """
+    Simulate num_rounds per iteration with the current policy on one worker pool, then derive the next policy from
+    the accumulated graph, until the optimal actions stop changing. Returns the number of iterations run.
+    """
+    previous_policy = None
+    strategy_file: Optional[str] = None
+
+    with tempfile.TemporaryDirectory() as policy_dir, concurrent.futures.ProcessPoolExecutor(
+        max_workers=parallel
+    ) as executor:
+        for iteration in range(1, max_iterations + 1):
+            args_list = [
+                (num_decks, batch_size, True, False, None, False, strategy_file, exploration_rate)
+                for batch_size in split_rounds(num_rounds, parallel)
+            ]
+            for graph in executor.map(run_batch_with_args, args_list):
+                main_graph.merge(graph)
+
+            state_evs = BlackjackService(num_decks=num_decks).calculate_evs(main_graph)
+            policy = optimal_actions(state_evs)
+            changed = (
+                len(policy)
+                if previous_policy is None
+                else sum(1 for state, action in policy.items() if previous_policy.get(state) != action)
+            )
+            logging.info(f"Policy iteration {iteration}: {changed} decisions changed")
+            if policy == previous_policy:
+                return iteration
+
+            previous_policy = policy
+            strategy_file = os.path.join(policy_dir, f"policy-{iteration}.bjlt")
+            LookupTableStrategy.from_evs(state_evs).save(strategy_file)
+
+    return max_iterations
+
+
+def run_bandit_batch(
+    num_decks: int,
+    num_rounds: int,
+    prior: ActionStatistics,
+    estimates: dict[GraphState, dict[Action, float]],
+) -> tuple[StateTransitionGraph, ActionStatistics]:
+    cli = BlackjackService(num_decks=num_decks)
+    return cli.play_bandit_games(num_rounds, refresh_every=max(num_rounds, 1), prior=prior, estimates=estimates)
+
+
+def run_bandit_batch_with_args(args):
+    return run_bandit_batch(*args)
+
+
+def run_bandit_exploration(
+    num_decks: int,
+    num_rounds: int,
+    parallel: int,
+    epochs: int,
+    main_graph: StateTransitionGraph,
+) -> ActionStatistics:
+    """
+    Split num_rounds into epochs of bandit-driven play on one worker pool. Every epoch starts its workers from the
+    action statistics merged from all previous epochs and EV estimates from the accumulated graph.
+    """
+    statistics = ActionStatistics()
+    estimates: dict[GraphState, dict[Action, float]] = estimates_from_evs(
+        BlackjackService(num_decks=num_decks).calculate_evs(main_graph)
+    )
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=parallel) as executor:
+        for epoch, epoch_rounds in enumerate(split_rounds(num_rounds, epochs), start=1):
+            args_list = [
+                (num_decks, batch_size, statistics, estimates) for batch_size in split_rounds(epoch_rounds, parallel)
+            ]
+            for graph, worker_statistics in executor.map(run_bandit_batch_with_args, args_list):
+                main_graph.merge(graph)
+                statistics.merge(worker_statistics)
+
+            estimates = estimates_from_evs(BlackjackService(num_decks=num_decks).calculate_evs(main_graph))
+            logging.info(f"Bandit epoch {epoch}: {len(statistics.state_counts)} decision states explored")
+
+    return statistics
+
+
+def import_graph(input_file: Optional[str]) -> StateTransitionGraph:
+    if not input_file:
+        return StateTransitionGraph()
+
+    with open(input_file, "rb") as f:
+        return pickle.load(f)
+
+
+def export_graph(graph: StateTransitionGraph, output_file: Optional[str]) -> None:
+    if not output_file:
+        return
+
+    with open(output_file, "wb") as f:
+        return pickle.dump(graph, f)
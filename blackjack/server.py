@@ -0,0 +1,359 @@
+import asyncio
+import concurrent.futures
+import inspect
+import json
+import logging
+import os
+import pickle
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Optional
+
+import click
+
+from blackjack.blackjack_service import BlackjackService
+from blackjack.entities import state as state_module
+from blackjack.entities import state_transition_graph as graph_module
+from blackjack.entities.state import GraphState, PreDealState
+from blackjack.entities.state_transition_graph import StateTransitionGraph
+from blackjack.game import MAX_SEATS
+from blackjack.strategy.lookup_table import LookupTableStrategy
+from blackjack.turn.action import Action
+
+Message = dict[str, Any]
+Send = Callable[[Message], Awaitable[None]]
+
+DEFAULT_CHUNK_ROUNDS: int = 10000
+
+MAX_DECKS: int = 8
+# Services are kept per worker process and configuration, so jobs after the first skip building shoes. Only the most
+# recently used few are kept, so clients cycling through configurations cannot grow a worker without bound
+MAX_WORKER_SERVICES: int = 8
+_worker_services: dict[tuple[int, int], BlackjackService] = {}
+
+
+def _worker_service(num_decks: int, num_seats: int) -> BlackjackService:
+    """The cached service for a configuration, or a new one that is cached only once it has played."""
+    service = _worker_services.pop((num_decks, num_seats), None)
+    return service if service is not None else BlackjackService(num_decks=num_decks, num_seats=num_seats)
+
+
+def _keep_worker_service(service: BlackjackService) -> None:
+    # Reinserting keeps the dict ordered from least to most recently used
+    _worker_services[(service.num_decks, service.num_seats)] = service
+    while len(_worker_services) > MAX_WORKER_SERVICES:
+        del _worker_services[next(iter(_worker_services))]
+
+
+def warm_worker() -> None:
+    simulate_chunk(1, 1, 0)
+
+
+def simulate_chunk(num_decks: int, num_seats: int, num_rounds: int) -> StateTransitionGraph:
+    service = _worker_service(num_decks, num_seats)
+    service.shoe.shuffle()
+    graph = service.play_games(num_rounds, printable=False)
+    _keep_worker_service(service)
+    return graph
+
+
+# Everything a pickled graph refers to, and nothing that could run other code on loading
+GRAPH_GLOBALS: dict[tuple[str, str], Any] = {
+    ("builtins", "int"): int,
+    ("builtins", "float"): float,
+    ("collections", "defaultdict"): defaultdict,
+    (Action.__module__, "Action"): Action,
+    (graph_module.__name__, "StateTransitionGraph"): StateTransitionGraph,
+    (graph_module.__name__, "_default_next_state"): graph_module._default_next_state,
+    (graph_module.__name__, "_default_action_transition"): graph_module._default_action_transition,
+    (state_module.__name__, "Turn"): state_module.Turn,
+    (state_module.__name__, "Outcome"): state_module.Outcome,
+    (state_module.__name__, "rebuild_state"): state_module.rebuild_state,
+    **{
+        (state_module.__name__, name): value
+        for name, value in vars(state_module).items()
+        if inspect.isclass(value) and issubclass(value, GraphState) and value is not GraphState
+    },
+}
+
+
+class GraphUnpickler(pickle.Unpickler):
+    """Loads state transition graphs only, refusing any other global a pickle names."""
+
+    def find_class(self, module: str, name: str) -> Any:
+        if (module, name) not in GRAPH_GLOBALS:
+            raise pickle.UnpicklingError(f"Graph files may not refer to {module}.{name}")
+        return GRAPH_GLOBALS[module, name]
+
+
+def load_graph(path: str) -> StateTransitionGraph:
+    with open(path, "rb") as f:
+        graph = GraphUnpickler(f).load()
+    if not isinstance(graph, StateTransitionGraph):
+        raise ValueError(f"{path} does not hold a state transition graph")
+
+    return graph
+
+
+def save_graph(graph: StateTransitionGraph, path: str) -> None:
+    with open(path, "wb") as f:
+        pickle.dump(graph, f)
+
+
+def summarize_graph_file(graph_file: str, strategy_output_file: Optional[str] = None) -> Message:
+    return summarize_evs(load_graph(graph_file), strategy_output_file)
+
+
+def summarize_evs(graph: StateTransitionGraph, strategy_output_file: Optional[str] = None) -> Message:
+    state_evs = BlackjackService().calculate_evs(graph)
+    if strategy_output_file:
+        LookupTableStrategy.from_evs(state_evs).save(strategy_output_file)
+
+    root = state_evs.get(PreDealState())
+    return {
+        "ev": root.action_evs.get(root.optimal_action) if root else None,
+        "hands": root.total_count if root else 0,
+        "states": len(state_evs),
+    }
+
+
+def _int_field(request: Message, name: str, low: int, high: Optional[int] = None, default: Optional[int] = None) -> int:
+    """An integer field of a request, checked against its range before any work is submitted."""
+    value = request.get(name, default)
+    expected = f"an integer from {low} to {high}" if high is not None else f"an integer of at least {low}"
+    if value is None:
+        raise ValueError(f"{name} is required, {expected}")
+    if isinstance(value, bool) or not isinstance(value, int) or value < low or (high is not None and value > high):
+        raise ValueError(f"{name} must be {expected}, got {value!r}")
+
+    return value
+
+
+class JobServer:
+    """
+    Accepts simulation and EV jobs as newline-delimited JSON and runs them on one pool of warm worker processes.
+
+    Requests: {"type": "simulate", "job": ..., "num_rounds": ..., ["num_decks", "num_seats", "chunk_rounds",
+    "graph_output_file", "strategy_output_file"]}, {"type": "ev", "job": ..., "graph_file": ...,
+    ["strategy_output_file"]} and {"type": "cancel", "job": ...}. Every job answers with "progress" events and
+    then one "result", "cancelled" or "error" event carrying the same job id.
+
+    Job ids belong to the connection that sent them, so clients cannot see or cancel each other's jobs. Files named
+    in requests are relative to data_dir and may not leave it, and graph files are loaded with GraphUnpickler.
+    """
+
+    def __init__(self, workers: Optional[int] = None, data_dir: str = ".") -> None:
+        self.workers: int = workers or os.cpu_count() or 1
+        self.data_dir: str = os.path.realpath(data_dir)
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, initializer=warm_worker)
+        self.jobs: set[asyncio.Task] = set()
+
+    async def warm_up(self) -> None:
+        """Start every worker now, so the first jobs do not pay for process startup and imports."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, warm_worker) for _ in range(self.workers)))
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        await self.warm_up()
+        # Only the user running the server may connect
+        old_umask = os.umask(0o177)
+        try:
+            return await asyncio.start_unix_server(self._handle_connection, path=path)
+        finally:
+            os.umask(old_umask)
+
+    async def start_tcp(self, host: str, port: int) -> asyncio.AbstractServer:
+        await self.warm_up()
+        return await asyncio.start_server(self._handle_connection, host=host, port=port)
+
+    def close(self) -> None:
+        for task in self.jobs:
+            task.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def resolve_path(self, path: object) -> str:
+        """The real path of a file named in a request, which must lie inside the data directory."""
+        if not isinstance(path, str) or not path:
+            raise ValueError(f"Invalid file name: {path!r}")
+
+        resolved = os.path.realpath(os.path.join(self.data_dir, path))
+        if os.path.commonpath([resolved, self.data_dir]) != self.data_dir:
+            raise ValueError(f"{path} is outside the data directory")
+
+        return resolved
+
+    def _optional_path(self, request: Message, key: str) -> Optional[str]:
+        return self.resolve_path(request[key]) if request.get(key) else None
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        write_lock = asyncio.Lock()
+        connection_jobs: dict[str, asyncio.Task] = {}
+
+        async def send(message: Message) -> None:
+            async with write_lock:
+                writer.write(json.dumps(message).encode() + b"\n")
+                await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                try:
+                    request: Message = json.loads(line)
+                except json.JSONDecodeError as exc:
+                    await send({"event": "error", "job": None, "message": f"Invalid request: {exc}"})
+                    continue
+
+                error = self._dispatch(request, send, connection_jobs)
+                if error is not None:
+                    await send({"event": "error", "job": request.get("job"), "message": error})
+
+            # Finish the jobs of a client that stopped sending, so it can still read their results
+            await asyncio.gather(*connection_jobs.values(), return_exceptions=True)
+        finally:
+            for task in connection_jobs.values():
+                task.cancel()
+            writer.close()
+
+    def _dispatch(self, request: Message, send: Send, connection_jobs: dict[str, asyncio.Task]) -> Optional[str]:
+        """Start or cancel a job of one connection, returning why the request was refused, if it was."""
+        job_id = request.get("job")
+        request_type = request.get("type")
+        if not isinstance(job_id, str) or not job_id:
+            return "Requests need a job id string"
+
+        if request_type == "cancel":
+            job = connection_jobs.get(job_id)
+            if job is not None:
+                job.cancel()
+            return None
+
+        if job_id in connection_jobs:
+            return f"Job {job_id} is still running"
+
+        if request_type == "simulate":
+            coroutine = self._simulate(job_id, request, send)
+        elif request_type == "ev":
+            coroutine = self._calculate_evs(job_id, request, send)
+        else:
+            coroutine = self._reject(request_type)
+
+        task = asyncio.create_task(self._run_job(job_id, coroutine, send))
+
+        def forget(done: asyncio.Task) -> None:
+            self.jobs.discard(done)
+            if connection_jobs.get(job_id) is done:
+                del connection_jobs[job_id]
+
+        connection_jobs[job_id] = task
+        self.jobs.add(task)
+        task.add_done_callback(forget)
+        return None
+
+    async def _reject(self, request_type: object) -> Message:
+        raise ValueError(f"Unknown job type: {request_type}")
+
+    async def _run_job(self, job_id: str, coroutine: Awaitable[Message], send: Send) -> None:
+        try:
+            result = await coroutine
+            await send({"event": "result", "job": job_id, **result})
+        except asyncio.CancelledError:
+            await send({"event": "cancelled", "job": job_id})
+        except Exception as exc:
+            logging.exception(f"Job {job_id} failed")
+            await send({"event": "error", "job": job_id, "message": str(exc)})
+
+    async def _simulate(self, job_id: str, request: Message, send: Send) -> Message:
+        loop = asyncio.get_running_loop()
+        num_rounds = _int_field(request, "num_rounds", 1)
+        num_decks = _int_field(request, "num_decks", 1, MAX_DECKS, default=1)
+        num_seats = _int_field(request, "num_seats", 1, MAX_SEATS, default=1)
+        chunk_rounds = _int_field(request, "chunk_rounds", 1, default=DEFAULT_CHUNK_ROUNDS)
+        graph_output_file = self._optional_path(request, "graph_output_file")
+        strategy_output_file = self._optional_path(request, "strategy_output_file")
+
+        # Keep only a couple of chunks per worker queued, so huge jobs do not flood the pool and other jobs interleave
+        chunk_sizes = (min(chunk_rounds, num_rounds - start) for start in range(0, num_rounds, chunk_rounds))
+        chunks: dict[asyncio.Future, int] = {}
+
+        def submit_next() -> None:
+            rounds = next(chunk_sizes, None)
+            if rounds is not None:
+                chunks[loop.run_in_executor(self.executor, simulate_chunk, num_decks, num_seats, rounds)] = rounds
+
+        for _ in range(2 * self.workers):
+            submit_next()
+
+        graph = StateTransitionGraph()
+        played = 0
+        try:
+            while chunks:
+                done, _ = await asyncio.wait(chunks, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    graph.merge(future.result())
+                    played += chunks.pop(future)
+                    submit_next()
+                await send({"event": "progress", "job": job_id, "rounds_played": played, "total_rounds": num_rounds})
+        finally:
+            # Chunks that have not started yet are dropped on cancellation or failure
+            for future in chunks:
+                future.cancel()
+
+        if graph_output_file:
+            # Writing a large graph takes a while, so it happens off the event loop
+            await loop.run_in_executor(None, save_graph, graph, graph_output_file)
+
+        summary = await loop.run_in_executor(self.executor, summarize_evs, graph, strategy_output_file)
+        return {"rounds": played, **summary}
+
+    async def _calculate_evs(self, job_id: str, request: Message, send: Send) -> Message:
+        graph_file = self.resolve_path(request.get("graph_file"))
+        strategy_output_file = self._optional_path(request, "strategy_output_file")
+
+        # The worker loads the graph itself, so it is never unpickled on the event loop or sent between processes
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, summarize_graph_file, graph_file, strategy_output_file)
+
+
+@click.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    default="blackjack.sock",
+    show_default=True,
+    help="Unix socket path to listen on, readable and writable by the current user only.",
+)
+@click.option("--tcp", is_flag=True, help="Listen on --host and --port instead, without any authentication.")
+@click.option("--host", default="127.0.0.1", show_default=True, help="Host to listen on with --tcp.")
+@click.option("--port", default=8765, show_default=True, type=click.IntRange(1, 65535), help="Port to listen on.")
+@click.option(
+    "--data-dir",
+    default=".",
+    show_default=True,
+    type=click.Path(exists=True, file_okay=False),
+    help="Directory that graph and strategy files named in jobs are read from and written to.",
+)
+@click.option(
+    "--workers",
+    default=None,
+    type=click.IntRange(1, 128),
+    help="Number of warm worker processes (default: one per CPU).",
+)
+def main(socket_path, tcp, host, port, data_dir, workers) -> None:
+    """Serve simulation and EV jobs to local clients from a warm worker pool."""
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if tcp:
+        logging.warning(f"Anyone who can reach {host}:{port} can run jobs and write files in {data_dir}")
+
+    async def serve() -> None:
+        server = JobServer(workers, data_dir)
+        try:
+            listener = await (server.start_tcp(host, port) if tcp else server.start_unix(socket_path))
+            logging.info(f"Listening on {f'{host}:{port}' if tcp else socket_path} with {server.workers} workers")
+            async with listener:
+                await listener.serve_forever()
+        finally:
+            server.close()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+import concurrent.futures
+import hashlib
+import json
+import os
+import pickle
+import socket
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from blackjack.entities.state_transition_graph import StateTransitionGraph
+from blackjack.runner import run_batch
+
+MANIFEST_FILE: str = "manifest.json"
+CLAIMS_DIR: str = "claims"
+SHARDS_DIR: str = "shards"
+SHARD_MAGIC: bytes = b"BJSH1"
+CHECKSUM_SIZE: int = hashlib.sha256().digest_size
+
+
+class ShardError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class ShardChunk:
+    chunk_id: str
+    num_rounds: int
+
+
+@dataclass(frozen=True)
+class ShardManifest:
+    num_decks: int
+    num_seats: int
+    strategy_file: Optional[str]
+    chunks: list[ShardChunk]
+
+    @property
+    def num_rounds(self) -> int:
+        return sum(chunk.num_rounds for chunk in self.chunks)
+
+
+def default_node_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class ShardCoordinator:
+    """
+    Coordinates one simulation sharded across nodes through a shared directory, with no other communication.
+
+    The manifest lists the chunks. A node claims a chunk by creating its claim file exclusively and keeps the claim's
+    mtime fresh while it runs; a claim not refreshed within lease_seconds is treated as a dead node's and taken over.
+    Finished chunks are written as shards, a SHA-256 checksum followed by the pickled graph, renamed into place so
+    readers never see a partial file. A chunk finished twice (by a slow node and its replacement) just overwrites
+    its shard, so nodes can join, leave or die at any time. Node clocks must agree to well within the lease.
+    """
+
+    def __init__(self, directory: str, lease_seconds: float = 300.0) -> None:
+        self.directory: str = directory
+        self.lease_seconds: float = lease_seconds
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self.directory, *parts)
+
+    def _claim_path(self, chunk: ShardChunk) -> str:
+        return self._path(CLAIMS_DIR, f"{chunk.chunk_id}.claim")
+
+    def _shard_path(self, chunk: ShardChunk) -> str:
+        return self._path(SHARDS_DIR, f"{chunk.chunk_id}.shard")
+
+    def create_job(
+        self,
+        num_rounds: int,
+        chunk_size: int,
+        num_decks: int = 1,
+        num_seats: int = 1,
+        strategy_file: Optional[str] = None,
+    ) -> ShardManifest:
+        if chunk_size < 1:
+            raise ValueError(f"Chunks need at least one round, got {chunk_size}")
+
+        chunks = [
+            ShardChunk(f"chunk-{i:06d}", min(chunk_size, num_rounds - start))
+            for i, start in enumerate(range(0, num_rounds, chunk_size))
+        ]
+        manifest = ShardManifest(num_decks, num_seats, strategy_file, chunks)
+
+        os.makedirs(self._path(CLAIMS_DIR), exist_ok=True)
+        os.makedirs(self._path(SHARDS_DIR), exist_ok=True)
+        if os.path.exists(self._path(MANIFEST_FILE)):
+            raise ShardError(f"{self.directory} already holds a sharded job")
+
+        self._write_atomically(self._path(MANIFEST_FILE), json.dumps(asdict(manifest), indent=2).encode())
+        return manifest
+
+    def load_manifest(self) -> ShardManifest:
+        try:
+            with open(self._path(MANIFEST_FILE)) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            raise ShardError(f"No sharded job in {self.directory}") from None
+
+        chunks = [ShardChunk(**chunk) for chunk in data.pop("chunks")]
+        return ShardManifest(chunks=chunks, **data)
+
+    def _write_atomically(self, path: str, data: bytes) -> None:
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    def is_done(self, chunk: ShardChunk) -> bool:
+        return os.path.exists(self._shard_path(chunk))
+
+    def _claim_is_stale(self, claim_path: str) -> bool:
+        try:
+            return time.time() - os.path.getmtime(claim_path) > self.lease_seconds
+        except FileNotFoundError:
+            return False
+
+    def try_claim(self, chunk: ShardChunk, node_id: str) -> bool:
+        claim_path = self._claim_path(chunk)
+        if self._claim_is_stale(claim_path):
+            # Only one node wins the rename of a stale claim, the others see it vanish
+            try:
+                os.rename(claim_path, f"{claim_path}.{node_id}.stale")
+            except FileNotFoundError:
+                return False
+
+        try:
+            fd = os.open(claim_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+
+        with os.fdopen(fd, "w") as f:
+            f.write(node_id)
+        return True
+
+    def claim_next(self, node_id: str) -> Optional[ShardChunk]:
+        for chunk in self.load_manifest().chunks:
+            if not self.is_done(chunk) and self.try_claim(chunk, node_id):
+                return chunk
+
+        return None
+
+    def heartbeat(self, chunk: ShardChunk) -> None:
+        try:
+            os.utime(self._claim_path(chunk))
+        except FileNotFoundError:
+            pass
+
+    def write_shard(self, chunk: ShardChunk, graph: StateTransitionGraph) -> None:
+        payload = pickle.dumps(graph, protocol=pickle.HIGHEST_PROTOCOL)
+        self._write_atomically(self._shard_path(chunk), SHARD_MAGIC + hashlib.sha256(payload).digest() + payload)
+
+    def read_shard(self, chunk: ShardChunk) -> StateTransitionGraph:
+        with open(self._shard_path(chunk), "rb") as f:
+            data = f.read()
+
+        magic_size = len(SHARD_MAGIC)
+        header_size = magic_size + CHECKSUM_SIZE
+        magic, checksum, payload = data[:magic_size], data[magic_size:header_size], data[header_size:]
+        if magic != SHARD_MAGIC or hashlib.sha256(payload).digest() != checksum:
+            raise ShardError(f"Shard for {chunk.chunk_id} is corrupt")
+
+        return pickle.loads(payload)
+
+    def discard_shard(self, chunk: ShardChunk) -> None:
+        """Drop a bad shard and its claim, so the chunk is run again."""
+        for path in (self._shard_path(chunk), self._claim_path(chunk)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def missing_chunks(self) -> list[ShardChunk]:
+        return [chunk for chunk in self.load_manifest().chunks if not self.is_done(chunk)]
+
+    def reduce(self) -> StateTransitionGraph:
+        """
+        Merge every shard into one graph. Corrupt shards are discarded so nodes run their chunks again, and a
+        ShardError lists every chunk that still needs running.
+        """
+        graph = StateTransitionGraph()
+        missing: list[str] = []
+
+        for chunk in self.load_manifest().chunks:
+            if not self.is_done(chunk):
+                missing.append(chunk.chunk_id)
+                continue
+
+            try:
+                graph.merge(self.read_shard(chunk))
+            except ShardError:
+                self.discard_shard(chunk)
+                missing.append(chunk.chunk_id)
+
+        if missing:
+            raise ShardError(f"{len(missing)} chunks are not finished: {', '.join(missing)}")
+
+        return graph
+
+
+def _keep_claim_fresh(coordinator: ShardCoordinator, chunk: ShardChunk, stop: threading.Event) -> None:
+    while not stop.wait(coordinator.lease_seconds / 3):
+        coordinator.heartbeat(chunk)
+
+
+def run_node(
+    directory: str,
+    node_id: Optional[str] = None,
+    lease_seconds: float = 300.0,
+    wait: bool = False,
+    poll_seconds: float = 5.0,
+) -> int:
+    """
+    Claim and run chunks until none are left to claim. With wait, keep polling until every chunk has a shard, so
+    this node takes over the chunks of nodes that die. Returns the number of chunks this node finished.
+    """
+    coordinator = ShardCoordinator(directory, lease_seconds)
+    manifest = coordinator.load_manifest()
+    node_id = node_id or default_node_id()
+    finished = 0
+
+    while True:
+        chunk = coordinator.claim_next(node_id)
+        if chunk is None:
+            if not wait or not coordinator.missing_chunks():
+                return finished
+
+            time.sleep(poll_seconds)
+            continue
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=_keep_claim_fresh, args=(coordinator, chunk, stop), daemon=True)
+        heartbeat.start()
+        try:
+            graph = run_batch(
+                manifest.num_decks,
+                chunk.num_rounds,
+                True,
+                False,
+                strategy_file=manifest.strategy_file,
+                num_seats=manifest.num_seats,
+            )
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        coordinator.write_shard(chunk, graph)
+        finished += 1
+
+
+def run_local_nodes(directory: str, workers: int, lease_seconds: float = 300.0, wait: bool = False) -> int:
+    """Run several nodes as local processes against the same directory. Returns the chunks they finished."""
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_node, directory, None, lease_seconds, wait) for _ in range(workers)]
+        return sum(future.result() for future in futures)
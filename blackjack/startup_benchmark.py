@@ -0,0 +1,77 @@
+import concurrent.futures
+import multiprocessing
+import statistics
+import subprocess
+import sys
+import time
+
+import click
+
+from blackjack.runner import run_batch
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Cumulative import time in microseconds of every module loaded by importing `module`, from -X importtime."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    )
+
+    times: dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+
+    return times
+
+
+def cli_first_round_seconds() -> float:
+    """Wall time of a one-round CLI run, from interpreter start to exit."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "blackjack.cli", "--num-rounds", "1", "--no-print"], check=True)
+    return time.perf_counter() - start
+
+
+def worker_first_round_seconds(start_method: str) -> float:
+    """Time from creating a one-worker pool until its first round has come back."""
+    start = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context(start_method)
+    ) as executor:
+        executor.submit(run_batch, 1, 1, True, False).result()
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option("--repeat", default=5, show_default=True, type=click.IntRange(1, 1000), help="Runs per measurement.")
+@click.option("--top", default=10, show_default=True, type=click.IntRange(0, 1000), help="Slowest imports to list.")
+@click.option(
+    "--start-method",
+    default="spawn",
+    show_default=True,
+    type=click.Choice(multiprocessing.get_all_start_methods()),
+    help="How worker processes are started; spawn re-imports the package in every worker.",
+)
+def main(repeat, top, start_method) -> None:
+    """Measure import time of the CLI and time to the first round for the CLI and for a worker process."""
+    times = import_times("blackjack.cli")
+    print(f"import blackjack.cli: {times['blackjack.cli'] / 1000:.1f} ms")
+    # The first entry is blackjack.cli itself
+    slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)
+    end = top + 1
+    for name, cumulative in slowest[1:end]:
+        print(f"  {name}: {cumulative / 1000:.1f} ms")
+
+    cli_seconds = [cli_first_round_seconds() for _ in range(repeat)]
+    print(f"CLI first round: {statistics.median(cli_seconds) * 1000:.1f} ms (median of {repeat})")
+
+    worker_seconds = [worker_first_round_seconds(start_method) for _ in range(repeat)]
+    print(
+        f"Worker first round ({start_method}): {statistics.median(worker_seconds) * 1000:.1f} ms (median of {repeat})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import math
+from collections import Counter
+from typing import Optional, Sequence
+
+from blackjack.entities.hand import Hand
+from blackjack.entities.random_wrapper import RandomWrapper
+from blackjack.entities.state import GraphState, PairState, ProperState, Turn
+from blackjack.ev_calculator import StateEV
+from blackjack.rules.base import Rules
+from blackjack.rules.standard import StandardBlackjackRules
+from blackjack.strategy.base import Strategy
+from blackjack.turn.action import Action
+
+
+class ActionStatistics:
+    """
+    How often each action was chosen at each decision state. Workers keep their own and merge them by addition.
+    """
+
+    def __init__(self) -> None:
+        self.action_counts: Counter[tuple[GraphState, Action]] = Counter()
+        self.state_counts: Counter[GraphState] = Counter()
+
+    def record(self, state: GraphState, action: Action) -> None:
+        self.action_counts[(state, action)] += 1
+        self.state_counts[state] += 1
+
+    def merge(self, other: "ActionStatistics") -> None:
+        self.action_counts.update(other.action_counts)
+        self.state_counts.update(other.state_counts)
+
+
+def estimates_from_evs(state_evs: dict[GraphState, StateEV]) -> dict[GraphState, dict[Action, float]]:
+    return {
+        state: state_ev.action_evs for state, state_ev in state_evs.items() if state_ev.optimal_action != Action.NOOP
+    }
+
+
+class BanditStrategy(Strategy):
+    """
+    Chooses actions at each decision state with UCB1 over running per-action EV estimates, so rounds go to
+    separating actions whose EVs are close rather than being spread uniformly. Actions without an estimate yet are
+    tried first. Counts come from the prior statistics (e.g. merged from other workers) plus this strategy's own.
+    """
+
+    def __init__(
+        self,
+        rules: Optional[Rules] = None,
+        exploration: float = 1.0,
+        prior: Optional[ActionStatistics] = None,
+        estimates: Optional[dict[GraphState, dict[Action, float]]] = None,
+        random_wrapper: Optional[RandomWrapper] = None,
+    ) -> None:
+        self.rules: Rules = rules or StandardBlackjackRules()
+        self.exploration: float = exploration
+        self.prior: ActionStatistics = prior or ActionStatistics()
+        self.statistics: ActionStatistics = ActionStatistics()
+        self.estimates: dict[GraphState, dict[Action, float]] = estimates or {}
+        self.randomizer = random_wrapper or RandomWrapper()
+
+    def update_estimates(self, state_evs: dict[GraphState, StateEV]) -> None:
+        self.estimates = estimates_from_evs(state_evs)
+
+    def _decision_state(self, hand: Hand, game_state: dict[str, object]) -> Optional[GraphState]:
+        upcard_rank = game_state.get("dealer_upcard_rank")
+        turn = game_state.get("turn")
+        split_count = game_state.get("split_count", 0)
+        if not isinstance(upcard_rank, str) or not isinstance(turn, Turn) or not isinstance(split_count, int):
+            return None
+
+        if hand.is_pair():
+            return PairState.of(hand.cards[0].graph_rank, turn, upcard_rank, split_count)
+
+        hand_value = self.rules.hand_value(hand)
+        return ProperState.of(hand_value.value, hand_value.soft, upcard_rank, turn)
+
+    def _count(self, state: GraphState, action: Action) -> int:
+        key = (state, action)
+        return self.prior.action_counts[key] + self.statistics.action_counts[key]
+
+    def choose_action(self, hand: Hand, available_actions: Sequence[Action], game_state: dict[str, object]) -> Action:
+        state = self._decision_state(hand, game_state)
+        if state is None:
+            return self.randomizer.choice(available_actions)
+
+        estimates = self.estimates.get(state, {})
+        untried = [a for a in available_actions if a not in estimates or not self._count(state, a)]
+        if untried:
+            action = self.randomizer.choice(untried)
+        else:
+            log_total = math.log(self.prior.state_counts[state] + self.statistics.state_counts[state])
+            action = max(
+                available_actions,
+                key=lambda a: estimates[a] + self.exploration * math.sqrt(log_total / self._count(state, a)),
+            )
+
+        self.statistics.record(state, action)
+        return action
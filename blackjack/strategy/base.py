@@ -1,7 +1,18 @@
+from typing import Optional, Sequence
+
 from blackjack.entities.hand import Hand
+from blackjack.rules.base import Rules
 from blackjack.turn.action import Action
 
 
 class Strategy:
-    def choose_action(self, hand: Hand, available_actions: list[Action], game_state: dict[str, object]) -> Action:
+    @property
+    def dealer_rules(self) -> Optional[Rules]:
+        """
+        The rules a dealer strategy hits by, when it hits exactly when their dealer_should_hit does. The dealer's hand
+        is then played out in one go by these rules rather than the game's.
+        """
+        return None
+
+    def choose_action(self, hand: Hand, available_actions: Sequence[Action], game_state: dict[str, object]) -> Action:
         raise NotImplementedError  # pragma: nocover
@@ -0,0 +1,183 @@
+import struct
+import zlib
+from typing import Optional, Sequence
+
+from blackjack.entities.card import Card
+from blackjack.entities.hand import Hand
+from blackjack.entities.state import GraphState, PairState, ProperState, Turn
+from blackjack.ev_calculator import StateEV
+from blackjack.rules.base import Rules
+from blackjack.rules.standard import StandardBlackjackRules
+from blackjack.strategy.base import Strategy
+from blackjack.strategy.strategy import RandomStrategy
+from blackjack.turn.action import Action
+
+# Each cell holds the decision actions ranked best first, as one byte per action (0 = no entry).
+RANKED_ACTIONS: list[Action] = [action for action in Action if action != Action.NOOP]
+ACTION_CODES: dict[Action, int] = {action: code for code, action in enumerate(RANKED_ACTIONS, start=1)}
+CELL_WIDTH: int = len(RANKED_ACTIONS)
+
+HAND_VALUES: int = 22
+# Pair slot 0 is used by hands that are not pairs
+PAIR_INDEX: dict[str, int] = {rank: i for i, rank in enumerate(Card.GRAPH_RANKS, start=1)}
+PAIR_SLOTS: int = len(PAIR_INDEX) + 1
+UPCARD_INDEX: dict[str, int] = {rank: i for i, rank in enumerate(Card.GRAPH_RANKS)}
+TURN_INDEX: dict[Turn, int] = {turn: i for i, turn in enumerate(Turn)}
+
+FILE_MAGIC: bytes = b"BJLT"
+FILE_VERSION: int = 1
+FILE_HEADER = struct.Struct("<4sBBB")
+
+
+class LookupTableStrategy(Strategy):
+    """
+    Plays the best action recorded for a decision in a dense table indexed by
+    (hand total, soft, pair rank, dealer upcard, split count, turn). The best ranked action that is
+    available is chosen; decisions missing from the table go to the fallback strategy.
+    """
+
+    def __init__(
+        self,
+        table: bytes,
+        max_split_count: int,
+        rules: Optional[Rules] = None,
+        fallback: Optional[Strategy] = None,
+    ) -> None:
+        if len(table) != self.table_size(max_split_count):
+            raise ValueError(f"Table has {len(table)} bytes, expected {self.table_size(max_split_count)}")
+
+        self.table: bytes = table
+        self.max_split_count: int = max_split_count
+        self.rules: Rules = rules or StandardBlackjackRules()
+        self.fallback: Strategy = fallback or RandomStrategy()
+
+    @staticmethod
+    def table_size(max_split_count: int) -> int:
+        return HAND_VALUES * 2 * PAIR_SLOTS * len(UPCARD_INDEX) * max_split_count * len(TURN_INDEX) * CELL_WIDTH
+
+    def _cell_offset(self, value: int, soft: bool, pair: int, upcard: int, split_count: int, turn: int) -> int:
+        cell = ((value * 2 + soft) * PAIR_SLOTS + pair) * len(UPCARD_INDEX) + upcard
+        cell = (cell * self.max_split_count + split_count) * len(TURN_INDEX) + turn
+        return cell * CELL_WIDTH
+
+    def _state_offset(self, state: GraphState) -> Optional[int]:
+        if isinstance(state, ProperState):
+            if state.player_hand_value >= HAND_VALUES:
+                return None
+
+            return self._cell_offset(
+                state.player_hand_value,
+                state.player_hand_soft,
+                0,
+                UPCARD_INDEX[state.dealer_upcard_rank],
+                0,
+                TURN_INDEX[state.turn],
+            )
+        elif isinstance(state, PairState):
+            if state.split_count >= self.max_split_count:
+                return None
+
+            return self._cell_offset(
+                0,
+                False,
+                PAIR_INDEX[state.pair_rank],
+                UPCARD_INDEX[state.dealer_upcard],
+                state.split_count,
+                TURN_INDEX[state.turn],
+            )
+
+        return None
+
+    @classmethod
+    def from_evs(
+        cls,
+        state_evs: dict[GraphState, StateEV],
+        rules: Optional[Rules] = None,
+        fallback: Optional[Strategy] = None,
+    ) -> "LookupTableStrategy":
+        max_split_count = 1 + max(
+            (state.split_count for state in state_evs if isinstance(state, PairState)),
+            default=0,
+        )
+        strategy = cls(bytes(cls.table_size(max_split_count)), max_split_count, rules, fallback)
+        table = bytearray(strategy.table)
+
+        for state, state_ev in state_evs.items():
+            if state_ev.optimal_action == Action.NOOP:
+                continue
+
+            offset = strategy._state_offset(state)
+            if offset is None:
+                continue
+
+            ranked = sorted(
+                (action for action in state_ev.action_evs if action != Action.NOOP),
+                key=lambda a: state_ev.action_evs[a],
+                reverse=True,
+            )
+            for i, action in enumerate(ranked):
+                table[offset + i] = ACTION_CODES[action]
+
+        strategy.table = bytes(table)
+        return strategy
+
+    def to_bytes(self) -> bytes:
+        header = FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, self.max_split_count, CELL_WIDTH)
+        return header + zlib.compress(self.table, level=9)
+
+    @classmethod
+    def from_bytes(
+        cls, data: bytes, rules: Optional[Rules] = None, fallback: Optional[Strategy] = None
+    ) -> "LookupTableStrategy":
+        magic, version, max_split_count, cell_width = FILE_HEADER.unpack_from(data)
+        if magic != FILE_MAGIC or version != FILE_VERSION or cell_width != CELL_WIDTH:
+            raise ValueError("Not a lookup table strategy file, or written by an incompatible version")
+
+        header_size = FILE_HEADER.size
+        return cls(zlib.decompress(data[header_size:]), max_split_count, rules, fallback)
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(
+        cls, path: str, rules: Optional[Rules] = None, fallback: Optional[Strategy] = None
+    ) -> "LookupTableStrategy":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read(), rules, fallback)
+
+    def _hand_offset(self, hand: Hand, game_state: dict[str, object]) -> Optional[int]:
+        upcard_rank = game_state.get("dealer_upcard_rank")
+        turn = game_state.get("turn")
+        split_count = game_state.get("split_count", 0)
+        if not isinstance(upcard_rank, str) or not isinstance(turn, Turn) or not isinstance(split_count, int):
+            return None
+
+        if hand.is_pair():
+            if split_count >= self.max_split_count:
+                return None
+
+            return self._cell_offset(
+                0, False, PAIR_INDEX[hand.cards[0].graph_rank], UPCARD_INDEX[upcard_rank], split_count, TURN_INDEX[turn]
+            )
+
+        hand_value = self.rules.hand_value(hand)
+        if hand_value.value >= HAND_VALUES:
+            return None
+
+        return self._cell_offset(hand_value.value, hand_value.soft, 0, UPCARD_INDEX[upcard_rank], 0, TURN_INDEX[turn])
+
+    def choose_action(self, hand: Hand, available_actions: Sequence[Action], game_state: dict[str, object]) -> Action:
+        offset = self._hand_offset(hand, game_state)
+        if offset is not None:
+            for i in range(offset, offset + CELL_WIDTH):
+                code = self.table[i]
+                if not code:
+                    break
+
+                action = RANKED_ACTIONS[code - 1]
+                if action in available_actions:
+                    return action
+
+        return self.fallback.choose_action(hand, available_actions, game_state)
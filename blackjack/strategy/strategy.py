@@ -1,7 +1,8 @@
-from typing import Union
+from typing import Optional, Sequence, Union
 
 from blackjack.entities.hand import Hand
 from blackjack.entities.random_wrapper import RandomWrapper
+from blackjack.rules.base import Rules
 from blackjack.rules.standard import StandardBlackjackRules
 from blackjack.strategy.base import Strategy
 from blackjack.turn.action import Action
@@ -11,19 +12,40 @@ class RandomStrategy(Strategy):
     def __init__(self, random_wrapper: Union[RandomWrapper, None] = None):
         self.randomizer = random_wrapper or RandomWrapper()
 
-    def choose_action(self, hand: Hand, available_actions: list[Action], game_state: dict[str, object]) -> Action:
+    def choose_action(self, hand: Hand, available_actions: Sequence[Action], game_state: dict[str, object]) -> Action:
         if not available_actions:
             raise ValueError("No available actions to choose from.")
 
         return self.randomizer.choice(available_actions)
 
 
+class ExploringStrategy(Strategy):
+    """Follows another strategy, but picks a random available action with probability exploration_rate."""
+
+    def __init__(
+        self, strategy: Strategy, exploration_rate: float, random_wrapper: Union[RandomWrapper, None] = None
+    ) -> None:
+        self.strategy = strategy
+        self.exploration_rate = exploration_rate
+        self.randomizer = random_wrapper or RandomWrapper()
+
+    def choose_action(self, hand: Hand, available_actions: Sequence[Action], game_state: dict[str, object]) -> Action:
+        if self.randomizer.random() < self.exploration_rate:
+            return self.randomizer.choice(available_actions)
+
+        return self.strategy.choose_action(hand, available_actions, game_state)
+
+
 class StandardDealerStrategy(Strategy):
-    def choose_action(self, hand: Hand, available_actions: list[Action], game_state: dict[str, object]) -> Action:
-        rules = StandardBlackjackRules()
-        hv = rules.hand_value(hand)
+    def __init__(self, rules: Optional[Rules] = None) -> None:
+        self.rules: Rules = rules or StandardBlackjackRules()
+
+    @property
+    def dealer_rules(self) -> Optional[Rules]:
+        return self.rules
 
-        if hv.value < 17 and Action.HIT in available_actions:
+    def choose_action(self, hand: Hand, available_actions: Sequence[Action], game_state: dict[str, object]) -> Action:
+        if self.rules.dealer_should_hit(hand) and Action.HIT in available_actions:
             return Action.HIT
 
         if Action.STAND in available_actions:
@@ -0,0 +1,167 @@
+import math
+from collections import Counter
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+
+from blackjack.entities.card import Card
+from blackjack.entities.deck_schema import DeckSchema
+from blackjack.entities.state import TerminalState
+from blackjack.entities.state_transition_graph import StateTransitionGraph
+from blackjack.rules.base import Rules
+
+
+class Allocation(Enum):
+    FIXED = "fixed"
+    PROPORTIONAL = "proportional"
+    OPTIMAL = "optimal"
+
+
+@dataclass(frozen=True)
+class InitialDealStratum:
+    """
+    One initial deal (player cards and dealer upcard, by graph rank) with its exact probability for a fresh shoe.
+    The player's cards are unordered, so the probability covers both dealing orders.
+    """
+
+    player_first_rank: str
+    player_second_rank: str
+    dealer_upcard_rank: str
+    probability: float
+
+    def deal_order(self) -> list[str]:
+        """Graph ranks in the order the pre-deal hands them out: player, dealer upcard, player."""
+        return [self.player_first_rank, self.dealer_upcard_rank, self.player_second_rank]
+
+
+@dataclass(frozen=True)
+class StratumShare:
+    """
+    Rounds of a stratified run left for one worker to play: round_counts[i] rounds of stratum i, out of total_counts[i]
+    rounds of that stratum in the whole run (pilot rounds included). The totals set every round's weight, so the
+    shares of all workers merged carry the mass of num_rounds random rounds.
+    """
+
+    round_counts: tuple[int, ...]
+    total_counts: tuple[int, ...]
+    num_rounds: int
+
+
+def split_stratum_share(share: StratumShare, parts: int) -> list[StratumShare]:
+    """Split a share into parts whose rounds per stratum, and in total, differ by at most one."""
+    round_counts = [[0] * len(share.round_counts) for _ in range(parts)]
+    offset = 0
+    for i, count in enumerate(share.round_counts):
+        base, remainder = divmod(count, parts)
+        for part in range(parts):
+            # The parts getting a spare round rotate from stratum to stratum
+            round_counts[part][i] = base + (1 if (part - offset) % parts < remainder else 0)
+        offset = (offset + remainder) % parts
+
+    return [StratumShare(tuple(counts), share.total_counts, share.num_rounds) for counts in round_counts]
+
+
+def rank_counts(deck_schema: DeckSchema, num_decks: int) -> Counter[str]:
+    counts: Counter[str] = Counter()
+    for (rank, suit), count in deck_schema.card_counts().items():
+        counts[Card(rank, suit).graph_rank] += count * num_decks
+
+    return counts
+
+
+def enumerate_initial_deals(deck_schema: DeckSchema, num_decks: int) -> list[InitialDealStratum]:
+    counts = rank_counts(deck_schema, num_decks)
+    total = sum(counts.values())
+    ranks = [rank for rank in Card.GRAPH_RANKS if counts[rank]]
+
+    def ordered_probability(first: str, upcard: str, second: str) -> float:
+        remaining = counts.copy()
+        probability = 1.0
+        for i, rank in enumerate((first, upcard, second)):
+            if remaining[rank] <= 0:
+                return 0.0
+
+            probability *= remaining[rank] / (total - i)
+            remaining[rank] -= 1
+
+        return probability
+
+    strata: list[InitialDealStratum] = []
+    for i, first in enumerate(ranks):
+        for second in ranks[i:]:
+            for upcard in ranks:
+                probability = ordered_probability(first, upcard, second)
+                if first != second:
+                    probability += ordered_probability(second, upcard, first)
+
+                if probability > 0:
+                    strata.append(InitialDealStratum(first, second, upcard, probability))
+
+    return strata
+
+
+def allocation_weights(
+    strata: list[InitialDealStratum], allocation: Allocation, stds: Optional[list[float]] = None
+) -> list[float]:
+    if allocation == Allocation.FIXED:
+        return [1.0] * len(strata)
+    elif allocation == Allocation.PROPORTIONAL:
+        return [stratum.probability for stratum in strata]
+    elif allocation == Allocation.OPTIMAL:
+        if stds is None or len(stds) != len(strata):
+            raise ValueError("Optimal allocation needs a standard deviation estimate for every stratum")
+
+        weights = [stratum.probability * std for stratum, std in zip(strata, stds)]
+        if not any(weights):
+            return [stratum.probability for stratum in strata]
+
+        return weights
+
+    raise ValueError(f"Unknown allocation: {allocation}")
+
+
+def allocate_rounds(weights: list[float], num_rounds: int, minimum: int = 1) -> list[int]:
+    """Split num_rounds across strata in proportion to their weights (largest remainder), at least `minimum` each."""
+    if num_rounds < minimum * len(weights):
+        raise ValueError(
+            f"Need at least {minimum * len(weights)} rounds to cover {len(weights)} strata, got {num_rounds}"
+        )
+
+    spare = num_rounds - minimum * len(weights)
+    total_weight = sum(weights)
+    shares = [spare * weight / total_weight for weight in weights] if total_weight else [0.0] * len(weights)
+
+    allocated = [minimum + math.floor(share) for share in shares]
+    leftover = num_rounds - sum(allocated)
+    by_remainder = sorted(range(len(weights)), key=lambda i: shares[i] - math.floor(shares[i]), reverse=True)
+    for i in by_remainder[:leftover]:
+        allocated[i] += 1
+
+    return allocated
+
+
+def payout_std(graph: StateTransitionGraph, rules: Rules) -> float:
+    """
+    Standard deviation of the unit-bet payout over the terminal edges of a graph. Doubles and splits are not
+    weighted, which is fine for comparing strata against each other.
+    """
+    total = 0.0
+    payout_sum = 0.0
+    payout_square_sum = 0.0
+
+    for actions in graph.get_graph().values():
+        for next_states in actions.values():
+            for next_state, count in next_states.items():
+                if not isinstance(next_state, TerminalState):
+                    continue
+
+                payout = rules.get_outcome_payout(next_state.outcome)
+                total += count
+                payout_sum += payout * count
+                payout_square_sum += payout * payout * count
+
+    if not total:
+        return 0.0
+
+    mean = payout_sum / total
+    return math.sqrt(max(payout_square_sum / total - mean * mean, 0.0))
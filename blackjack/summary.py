@@ -0,0 +1,85 @@
+import math
+from collections import defaultdict
+
+from blackjack.entities.shoe import RANK_INDEX
+
+# The player's two initial graph ranks, lower first, and the dealer's upcard rank
+InitialHand = tuple[str, str, str]
+
+
+class RunningStats:
+    """Count, mean and sum of squared deviations of a stream of payouts, updated one value at a time (Welford)."""
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.mean: float = 0.0
+        self.m2: float = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: "RunningStats") -> None:
+        """Combine with another stream's stats as if every value had been added here (Chan et al.)."""
+        if not other.count:
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def standard_error(self) -> float:
+        return math.sqrt(self.variance / self.count) if self.count else 0.0
+
+
+class OutcomeSummary:
+    """
+    Net payout per round, overall and per initial hand, for runs that only need the house edge. Doubled hands count
+    twice and split hands are summed into their round's payout. Workers keep their own and merge them.
+    """
+
+    def __init__(self) -> None:
+        self.overall: RunningStats = RunningStats()
+        self.by_initial_hand: defaultdict[InitialHand, RunningStats] = defaultdict(RunningStats)
+
+    def record(self, initial_hand: InitialHand, payout: float) -> None:
+        self.overall.add(payout)
+        self.by_initial_hand[initial_hand].add(payout)
+
+    def merge(self, other: "OutcomeSummary") -> None:
+        self.overall.merge(other.overall)
+        for initial_hand, stats in other.by_initial_hand.items():
+            self.by_initial_hand[initial_hand].merge(stats)
+
+    @property
+    def rounds(self) -> int:
+        return self.overall.count
+
+    @property
+    def house_edge(self) -> float:
+        return -self.overall.mean
+
+    def frequencies(self) -> dict[InitialHand, float]:
+        return {initial_hand: stats.count / self.rounds for initial_hand, stats in self.by_initial_hand.items()}
+
+
+def print_summary(summary: OutcomeSummary) -> None:
+    print("\n=== Outcome Summary ===")
+    print(f"Rounds: {summary.rounds}")
+    print(f"EV per round: {summary.overall.mean:.6f} ± {summary.overall.standard_error:.6f}")
+    print(f"House edge: {summary.house_edge:.4%}")
+    print("\nPlayer  Upcard  Frequency        EV")
+    by_rank = sorted(
+        summary.by_initial_hand.items(), key=lambda item: [RANK_INDEX[rank] for rank in (item[0][2], *item[0][:2])]
+    )
+    for (low, high, upcard), stats in by_rank:
+        print(f"{low:>3},{high:<3} {upcard:>6}  {stats.count / summary.rounds:9.5f} {stats.mean:9.5f}")
@@ -0,0 +1,148 @@
+import concurrent.futures
+import csv
+import itertools
+from dataclasses import astuple, dataclass, fields, replace
+from typing import Optional, TextIO
+
+from blackjack.blackjack_service import BlackjackService
+from blackjack.entities.state import PreDealState
+from blackjack.entities.state_transition_graph import StateTransitionGraph
+from blackjack.ev_calculator import EVCalculator
+from blackjack.rules.standard import StandardBlackjackRules
+from blackjack.strategy.base import Strategy
+from blackjack.strategy.lookup_table import LookupTableStrategy
+
+
+@dataclass(frozen=True)
+class SweepConfig:
+    num_decks: int
+    max_splits: int
+    resplit_aces: bool
+    play_split_aces: bool
+    num_rounds: int
+
+    def rules(self) -> StandardBlackjackRules:
+        return StandardBlackjackRules(
+            resplit_aces=self.resplit_aces, play_split_aces=self.play_split_aces, max_splits=self.max_splits
+        )
+
+    def service(self, strategy_file: Optional[str] = None) -> BlackjackService:
+        rules = self.rules()
+        player_strategy: Optional[Strategy] = LookupTableStrategy.load(strategy_file, rules) if strategy_file else None
+        return BlackjackService(num_decks=self.num_decks, rules=rules, player_strategy=player_strategy)
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    config: SweepConfig
+    hands: float
+    ev: float
+
+    @property
+    def house_edge(self) -> float:
+        return -self.ev
+
+
+def expand_grid(
+    num_decks: list[int],
+    max_splits: list[int],
+    resplit_aces: list[bool],
+    play_split_aces: list[bool],
+    num_rounds: list[int],
+) -> list[SweepConfig]:
+    return [
+        SweepConfig(*values)
+        for values in itertools.product(num_decks, max_splits, resplit_aces, play_split_aces, num_rounds)
+    ]
+
+
+# Services are kept per worker process and configuration, so only a config's first chunk on a worker builds its shoe
+_worker_services: dict[tuple[SweepConfig, Optional[str]], BlackjackService] = {}
+
+
+def _worker_service(config: SweepConfig, strategy_file: Optional[str]) -> BlackjackService:
+    # The number of rounds does not change the service, so configs differing only in it share one
+    key = (replace(config, num_rounds=0), strategy_file)
+    if key not in _worker_services:
+        _worker_services[key] = config.service(strategy_file)
+
+    return _worker_services[key]
+
+
+def play_config_chunk(config: SweepConfig, num_rounds: int, strategy_file: Optional[str]) -> StateTransitionGraph:
+    service = _worker_service(config, strategy_file)
+    service.shoe.shuffle()
+    return service.play_games(num_rounds, printable=False)
+
+
+def evaluate_config(config: SweepConfig, graph: StateTransitionGraph) -> SweepResult:
+    root = EVCalculator(config.rules()).calculate_evs(graph).get(PreDealState())
+    if root is None:
+        return SweepResult(config, 0, 0.0)
+
+    return SweepResult(config, root.total_count, root.action_evs[root.optimal_action])
+
+
+def run_sweep(
+    configs: list[SweepConfig], parallel: int, chunk_size: int, strategy_file: Optional[str] = None
+) -> list[SweepResult]:
+    """
+    Run every configuration on one worker pool. All (config, chunk) pairs are queued up front, interleaved across
+    configs, and each config's EVs are calculated on the pool as soon as its last chunk is merged.
+    """
+    graphs: list[StateTransitionGraph] = [StateTransitionGraph() for _ in configs]
+    chunks_left: list[int] = [0] * len(configs)
+    results: list[Optional[SweepResult]] = [None] * len(configs)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=parallel) as executor:
+        play_futures: dict[concurrent.futures.Future, int] = {}
+        evaluate_futures: dict[concurrent.futures.Future, int] = {}
+
+        chunk_lists = [
+            [min(chunk_size, config.num_rounds - start) for start in range(0, config.num_rounds, chunk_size)]
+            for config in configs
+        ]
+        for i, chunks in enumerate(chunk_lists):
+            chunks_left[i] = len(chunks)
+            if not chunks:
+                evaluate_futures[executor.submit(evaluate_config, configs[i], graphs[i])] = i
+
+        for round_robin in itertools.zip_longest(*chunk_lists):
+            for i, rounds in enumerate(round_robin):
+                if rounds is not None:
+                    play_futures[executor.submit(play_config_chunk, configs[i], rounds, strategy_file)] = i
+
+        for future in concurrent.futures.as_completed(play_futures):
+            i = play_futures[future]
+            graphs[i].merge(future.result())
+            chunks_left[i] -= 1
+            if not chunks_left[i]:
+                evaluate_futures[executor.submit(evaluate_config, configs[i], graphs[i])] = i
+
+        for future in concurrent.futures.as_completed(evaluate_futures):
+            results[evaluate_futures[future]] = future.result()
+
+    return [result for result in results if result is not None]
+
+
+RESULT_COLUMNS: list[str] = [field.name for field in fields(SweepConfig)] + ["hands", "ev", "house_edge"]
+
+
+def result_row(result: SweepResult) -> list[object]:
+    return [*astuple(result.config), result.hands, result.ev, result.house_edge]
+
+
+def format_results_table(results: list[SweepResult]) -> str:
+    rows = [RESULT_COLUMNS] + [
+        [*map(str, astuple(result.config)), f"{result.hands:g}", f"{result.ev:.6f}", f"{result.house_edge:.4%}"]
+        for result in results
+    ]
+    widths = [max(len(row[column]) for row in rows) for column in range(len(RESULT_COLUMNS))]
+    return "\n".join("  ".join(value.rjust(width) for value, width in zip(row, widths)) for row in rows)
+
+
+def write_results_csv(results: list[SweepResult], f: TextIO) -> None:
+    writer = csv.writer(f)
+    writer.writerow(RESULT_COLUMNS)
+    for result in results:
+        writer.writerow(result_row(result))
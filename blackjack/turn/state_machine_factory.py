@@ -59,6 +59,7 @@ def blackjack_state_machine():
             },
             TurnState.DEALER_TURN: {
                 Decision.STAND: TurnState.EVALUATE_GAME,
+                Decision.BUST: TurnState.EVALUATE_GAME,
                 Decision.HIT: TurnState.CHECK_DEALER_CARD_STATE,
             },
             TurnState.CHECK_DEALER_CARD_STATE: {
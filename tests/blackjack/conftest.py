@@ -2,11 +2,14 @@ import pytest
 
 from blackjack.entities.card import Card
 from blackjack.entities.deck_schema import StandardBlackjackSchema
+from blackjack.entities.hand import Hand
 from blackjack.entities.shoe import Shoe
+from blackjack.entities.state import PreDealState
 from blackjack.game_events import GameEventType
 from blackjack.rules.standard import StandardBlackjackRules
 from blackjack.strategy.base import Strategy
 from blackjack.strategy.strategy import StandardDealerStrategy
+from blackjack.turn.action import Action
 
 
 class AlwaysStandStrategy(Strategy):
@@ -77,3 +80,14 @@ def parse_final_hands_and_outcomes(event_log):
             if e.outcome is not None:
                 outcomes[e.name] = e.outcome
     return hands, outcomes
+
+
+def rounds_in(graph):
+    return sum(graph.get_graph()[PreDealState()][Action.NOOP].values())
+
+
+def make_hand(*ranks):
+    hand = Hand()
+    for rank in ranks:
+        hand.add_card(Card(rank, "♠"))
+    return hand
@@ -0,0 +1,46 @@
+import pickle
+
+import pytest
+
+from blackjack.entities.card import DECK, Card
+from blackjack.entities.deck_schema import StandardBlackjackSchema
+from blackjack.entities.shoe import Shoe
+
+
+def test_cards_are_shared_instances():
+    assert Card("A", "♠") is Card("A", "♠")
+    assert Card("A", "♠") is not Card("A", "♥")
+    assert len(set(map(id, DECK))) == 52
+
+
+def test_derived_attributes_are_precomputed():
+    king = Card("K", "♦")
+    ace = Card("A", "♣")
+    seven = Card("7", "♥")
+
+    assert (king.rank_value, king.graph_rank, king.is_ten(), king.is_ace()) == (10, "10", True, False)
+    assert (ace.rank_value, ace.graph_rank, ace.is_ten(), ace.is_ace()) == (11, "A", False, True)
+    assert (seven.rank_value, seven.graph_rank, seven.is_ten(), seven.is_ace()) == (7, "7", False, False)
+
+
+def test_cards_are_immutable():
+    with pytest.raises(AttributeError):
+        Card("2", "♠").rank = "3"
+
+
+def test_invalid_cards_are_rejected():
+    with pytest.raises(ValueError, match="Invalid rank"):
+        Card("1", "♠")
+    with pytest.raises(ValueError, match="Invalid suit"):
+        Card("2", "x")
+
+
+def test_unpickled_cards_are_the_shared_instances():
+    assert pickle.loads(pickle.dumps(Card("Q", "♣"))) is Card("Q", "♣")
+
+
+def test_shoes_hold_only_shared_instances():
+    shoe = Shoe(StandardBlackjackSchema(), num_decks=6)
+
+    assert len(shoe.cards) == 312
+    assert {id(card) for card in shoe.cards} == {id(card) for card in DECK}
@@ -0,0 +1,63 @@
+import random
+
+from blackjack.blackjack_service import BlackjackService
+from blackjack.entities.card import Card
+from blackjack.entities.deck_schema import StandardBlackjackSchema
+from blackjack.entities.shoe import Shoe
+from blackjack.strategy.base import Strategy
+from blackjack.turn.action import Action
+
+
+def rescanned(cards):
+    return tuple(sum(1 for card in cards if card.graph_rank == rank) for rank in Card.GRAPH_RANKS)
+
+
+def test_full_shoe_composition():
+    shoe = Shoe(StandardBlackjackSchema(), num_decks=2)
+
+    assert shoe.composition() == (8, 8, 8, 8, 8, 8, 8, 8, 32, 8)
+    assert shoe.remaining("10") == 32
+
+
+def test_composition_follows_deals_rewinds_and_shuffles():
+    shoe = Shoe(StandardBlackjackSchema(), num_decks=1)
+    rng = random.Random(7)
+
+    for _ in range(500):
+        operation = rng.random()
+        if operation < 0.7 and shoe.cards_left():
+            shoe.deal_card()
+        elif operation < 0.9:
+            shoe.rewind(rng.randint(0, shoe.dealt_count()))
+        else:
+            shoe.shuffle()
+
+        assert shoe.composition() == rescanned(shoe.cards)
+
+
+def test_unseen_cards_count_as_left():
+    shoe = Shoe(StandardBlackjackSchema(), num_decks=1)
+    card = shoe.deal_card()
+
+    assert shoe.composition([card]) == (4, 4, 4, 4, 4, 4, 4, 4, 16, 4)
+    assert shoe.composition() != shoe.composition([card])
+
+
+class RecordingStrategy(Strategy):
+    def __init__(self):
+        self.game_states = []
+
+    def choose_action(self, hand, available_actions, game_state):
+        self.game_states.append(game_state)
+        return Action.STAND if Action.STAND in available_actions else available_actions[0]
+
+
+def test_strategies_see_the_composition_without_the_hole_card():
+    strategy = RecordingStrategy()
+    service = BlackjackService(num_decks=1, player_strategy=strategy)
+
+    service.play_games(20, printable=False)
+
+    assert strategy.game_states
+    for game_state in strategy.game_states:
+        assert sum(game_state["shoe_composition"]) == 52 - 3
@@ -0,0 +1,121 @@
+import os
+import weakref
+
+import pytest
+from click.testing import CliRunner
+
+from blackjack.blackjack_service import BlackjackService
+from blackjack.cli import main
+from blackjack.entities.spilling_graph import SpillingTransitionGraph
+from blackjack.entities.state import SplitState
+from blackjack.runner import run_spilling_batches
+
+
+def plain(graph):
+    return {state: {action: dict(next_states) for action, next_states in actions.items()} for state, actions in graph}
+
+
+def test_spilled_runs_merge_back_to_the_same_graph():
+    graph = BlackjackService(num_decks=1).play_games(200, printable=False)
+
+    with SpillingTransitionGraph(max_entries=10) as spilled:
+        spilled.merge(graph)
+        spilled.merge(graph, weight=0.5)
+
+        assert len(spilled.run_paths) > 1
+        assert plain(spilled.iter_states()) == {
+            state: {action: {s: c * 1.5 for s, c in next_states.items()} for action, next_states in actions.items()}
+            for state, actions in graph.get_graph().items()
+        }
+        assert plain(spilled.to_graph().get_graph().items()) == plain(spilled.iter_states())
+
+
+class Actions(dict):
+    """A state's transitions that can be weakly referenced, to tell when the solver lets go of them."""
+
+
+def test_states_come_bottom_up():
+    graph = BlackjackService(num_decks=1).play_games(300, printable=False)
+
+    with SpillingTransitionGraph(max_entries=25) as spilled:
+        spilled.merge(graph)
+        states = list(spilled.iter_states_bottom_up())
+
+        assert plain(states) == plain(spilled.iter_states())
+        assert sorted(os.listdir(spilled.directory)) == sorted(os.path.basename(path) for path in spilled.run_paths)
+
+    seen = set()
+    for state, actions in states:
+        for next_states in actions.values():
+            for next_state in next_states:
+                if isinstance(next_state, SplitState):
+                    assert {next_state.first_hand_state, next_state.second_hand_state} <= seen
+                else:
+                    assert next_state in seen or next_state not in graph.get_graph()
+        seen.add(state)
+
+
+def test_evs_stream_from_the_spilled_graph():
+    service = BlackjackService(num_decks=1)
+    graph = service.play_games(300, printable=False)
+    refs = []
+    most_held = 0
+
+    def tracked(states):
+        nonlocal most_held
+        for state, actions in states:
+            actions = Actions(actions)
+            refs.append(weakref.ref(actions))
+            most_held = max(most_held, sum(ref() is not None for ref in refs))
+            yield state, actions
+            del actions
+
+    with SpillingTransitionGraph(max_entries=25) as spilled:
+        spilled.merge(graph)
+        state_evs = service.calculate_evs_from_states(tracked(spilled.iter_states_bottom_up()))
+
+    # Only the arriving state's transitions and the previous state's, still bound to the solver's loop, are held
+    assert most_held <= 2
+    assert len(refs) > 100
+    expected = service.calculate_evs(graph)
+    assert state_evs.keys() == expected.keys()
+    for state, state_ev in expected.items():
+        assert state_evs[state].action_evs == pytest.approx(state_ev.action_evs)
+
+
+def test_close_removes_the_runs():
+    spilled = SpillingTransitionGraph(max_entries=1)
+    spilled.merge(BlackjackService(num_decks=1).play_games(5, printable=False))
+    directory = spilled.directory
+
+    spilled.close()
+
+    assert not os.path.exists(directory)
+    assert not list(spilled.iter_states())
+
+
+def test_buffer_needs_room():
+    with pytest.raises(ValueError, match="at least one"):
+        SpillingTransitionGraph(max_entries=0)
+
+
+def test_run_spilling_batches_plays_every_round():
+    with SpillingTransitionGraph(max_entries=50) as spilled:
+        run_spilling_batches(num_decks=1, num_rounds=45, parallel=2, spilled_graph=spilled, chunk_size=10)
+        graph = spilled.to_graph()
+
+    assert graph.transitions
+    root = BlackjackService(num_decks=1).calculate_evs(graph)
+    assert sum(state_ev.total_count for state, state_ev in root.items() if type(state).__name__ == "PreDealState") == 45
+
+
+def test_cli_spills_and_writes_a_strategy(tmp_path):
+    strategy_file = tmp_path / "strategy.bjlt"
+
+    result = CliRunner().invoke(
+        main,
+        ["--num-rounds", "200", "--no-print", "--spill-entries", "20", "--strategy-output-file", str(strategy_file)],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert strategy_file.exists()
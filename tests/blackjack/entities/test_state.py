@@ -0,0 +1,56 @@
+import pickle
+
+from blackjack.entities.state import (
+    NewSplitHandState,
+    Outcome,
+    PairState,
+    PendingSplitHandState,
+    PreDealState,
+    ProperState,
+    SplitState,
+    TerminalState,
+    Turn,
+)
+
+
+def test_of_returns_one_instance_per_value():
+    state = ProperState.of(12, False, "10", Turn.PLAYER)
+
+    assert state is ProperState.of(12, False, "10", Turn.PLAYER)
+    assert state is not ProperState.of(12, True, "10", Turn.PLAYER)
+    assert TerminalState.of(Outcome.WIN) is TerminalState.of(Outcome.WIN)
+    assert PreDealState.of() is PreDealState.of()
+
+
+def test_interned_and_constructed_states_are_interchangeable():
+    interned = PairState.of("8", Turn.PLAYER, "6", 0)
+    constructed = PairState(pair_rank="8", turn=Turn.PLAYER, dealer_upcard="6", split_count=0)
+
+    assert interned == constructed
+    assert hash(interned) == hash(constructed)
+    assert {constructed: 1}[interned] == 1
+
+
+def test_states_of_different_types_with_the_same_fields_differ():
+    new_hand = NewSplitHandState.of("8", "6", 1)
+    pending_hand = PendingSplitHandState.of("8", "6", 1)
+
+    assert new_hand != pending_hand
+    assert len({new_hand, pending_hand}) == 2
+
+
+def test_unpickled_states_are_interned():
+    split = SplitState.of(NewSplitHandState.of("A", "10", 1), PendingSplitHandState.of("A", "10", 1))
+
+    assert pickle.loads(pickle.dumps(split)) is split
+    assert pickle.loads(pickle.dumps(ProperState(20, False, "A", Turn.DEALER))) is ProperState.of(
+        20, False, "A", Turn.DEALER
+    )
+
+
+def test_states_pickled_as_plain_dataclasses_still_load():
+    state = object.__new__(ProperState)
+    state.__dict__.update(player_hand_value=15, player_hand_soft=True, dealer_upcard_rank="7", turn=Turn.PLAYER)
+
+    assert state == ProperState.of(15, True, "7", Turn.PLAYER)
+    assert hash(state) == hash(ProperState.of(15, True, "7", Turn.PLAYER))
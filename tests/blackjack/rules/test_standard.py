@@ -1,18 +1,15 @@
+import pytest
+
 from blackjack.cli import BlackjackService
 from blackjack.entities.card import Card
-from blackjack.entities.hand import Hand
-from blackjack.entities.state import Outcome
+from blackjack.entities.state import Outcome, Turn
 from blackjack.game_events import GameEventType
+from blackjack.rules.standard import StandardBlackjackRules
 from blackjack.strategy.base import Strategy
 from blackjack.strategy.strategy import StandardDealerStrategy
-from tests.blackjack.conftest import parse_final_hands_and_outcomes
-
-
-def make_hand(cards):
-    hand = Hand()
-    for rank, suit in cards:
-        hand.add_card(Card(rank, suit))
-    return hand
+from blackjack.turn.action import Action
+from blackjack.turn.turn_state import TurnState
+from tests.blackjack.conftest import make_hand, parse_final_hands_and_outcomes
 
 
 class AlwaysHitStrategy(Strategy):
@@ -136,3 +133,51 @@ def test_available_actions_and_can_continue():
     assert hands["Dealer"] == [Card("10", "♠"), Card("7", "♠")]
     player_events = [e for e in event_log if getattr(e, "player", None) == "Player"]
     assert any(e.event_type == GameEventType.BUST for e in player_events)
+
+
+def branching_available_actions(rules, turn_state, hand, split_count):
+    """The rules' action logic as it read before the tables were compiled."""
+    if turn_state.turn == Turn.DEALER:
+        return [Action.HIT, Action.STAND]
+
+    actions = [Action.STAND]
+    if split_count == 0 or not hand.cards[0].is_ace() or rules.play_split_aces:
+        actions.append(Action.HIT)
+        if turn_state == TurnState.PLAYER_INITIAL_TURN:
+            actions.append(Action.DOUBLE)
+
+    if hand.is_pair() and split_count < rules.max_splits:
+        if split_count == 0 or not hand.cards[0].is_ace() or rules.resplit_aces:
+            actions.append(Action.SPLIT)
+
+    return actions
+
+
+@pytest.mark.parametrize("resplit_aces", [False, True])
+@pytest.mark.parametrize("play_split_aces", [False, True])
+@pytest.mark.parametrize("max_splits", [0, 1, 3])
+def test_compiled_actions_match_the_branching_rules(resplit_aces, play_split_aces, max_splits):
+    rules = StandardBlackjackRules(resplit_aces=resplit_aces, play_split_aces=play_split_aces, max_splits=max_splits)
+    hands = [
+        make_hand("A", "A"),
+        make_hand("A", "7"),
+        make_hand("8", "8"),
+        make_hand("K", "Q"),
+        make_hand("9", "5", "2"),
+    ]
+    turn_states = [TurnState.PLAYER_INITIAL_TURN, TurnState.PLAYER_TURN_CONTINUED, TurnState.DEALER_TURN]
+
+    for turn_state in turn_states:
+        for hand in hands:
+            for split_count in range(max_splits + 3):
+                expected = branching_available_actions(rules, turn_state, hand, split_count)
+                assert list(rules.available_actions(turn_state, hand, split_count)) == expected
+
+
+def test_viable_actions_after_each_action():
+    rules = StandardBlackjackRules()
+
+    assert rules.get_viable_actions(Action.HIT) == {Action.HIT, Action.STAND}
+    assert rules.get_viable_actions(Action.DOUBLE) == {Action.STAND}
+    assert rules.get_viable_actions(Action.SPLIT) == {Action.HIT, Action.STAND, Action.DOUBLE, Action.SPLIT}
+    assert rules.get_viable_actions(Action.STAND) == set()
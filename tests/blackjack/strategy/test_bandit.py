@@ -0,0 +1,92 @@
+import random
+
+import pytest
+from click.testing import CliRunner
+
+from blackjack.blackjack_service import BlackjackService
+from blackjack.cli import main
+from blackjack.entities.random_wrapper import RandomWrapper
+from blackjack.entities.state import PairState, ProperState, Turn
+from blackjack.strategy.bandit import ActionStatistics, BanditStrategy
+from blackjack.turn.action import Action
+from tests.blackjack.conftest import make_hand
+
+STATE_16 = ProperState(16, False, "10", Turn.PLAYER)
+GAME_STATE = {"dealer_upcard_rank": "10", "split_count": 0, "turn": Turn.PLAYER}
+
+
+def statistics_with(counts):
+    statistics = ActionStatistics()
+    for (state, action), count in counts.items():
+        for _ in range(count):
+            statistics.record(state, action)
+    return statistics
+
+
+def test_tries_actions_without_estimates_first():
+    random_wrapper = RandomWrapper(null=True, choice_responses=[Action.HIT])
+    strategy = BanditStrategy(estimates={STATE_16: {Action.STAND: -0.5}}, random_wrapper=random_wrapper)
+
+    action = strategy.choose_action(make_hand("10", "6"), [Action.STAND, Action.HIT], GAME_STATE)
+
+    assert action == Action.HIT
+    assert strategy.statistics.action_counts[(STATE_16, Action.HIT)] == 1
+
+
+def test_picks_highest_upper_confidence_bound():
+    prior = statistics_with({(STATE_16, Action.STAND): 90, (STATE_16, Action.HIT): 10})
+    estimates = {STATE_16: {Action.STAND: -0.5, Action.HIT: -0.55}}
+    hand = make_hand("10", "6")
+
+    explorer = BanditStrategy(exploration=1.0, prior=prior, estimates=estimates)
+    exploiter = BanditStrategy(exploration=0.0, prior=prior, estimates=estimates)
+
+    assert explorer.choose_action(hand, [Action.STAND, Action.HIT], GAME_STATE) == Action.HIT
+    assert exploiter.choose_action(hand, [Action.STAND, Action.HIT], GAME_STATE) == Action.STAND
+
+
+def test_pairs_are_keyed_by_split_count():
+    strategy = BanditStrategy(random_wrapper=RandomWrapper(null=True))
+
+    strategy.choose_action(make_hand("8", "8"), [Action.SPLIT, Action.STAND], dict(GAME_STATE, split_count=1))
+
+    assert list(strategy.statistics.state_counts) == [PairState("8", Turn.PLAYER, "10", 1)]
+
+
+def test_statistics_merge_by_addition():
+    first = statistics_with({(STATE_16, Action.HIT): 2})
+    second = statistics_with({(STATE_16, Action.HIT): 1, (STATE_16, Action.STAND): 3})
+
+    first.merge(second)
+
+    assert first.action_counts == {(STATE_16, Action.HIT): 3, (STATE_16, Action.STAND): 3}
+    assert first.state_counts == {STATE_16: 6}
+
+
+def test_bandit_games_concentrate_on_the_better_action():
+    # The shoe and the bandit's tie-breaking use the random module, so seed it to keep the run reproducible
+    random.seed(30)
+    service = BlackjackService()
+    graph, statistics = service.play_bandit_games(num_rounds=3000, refresh_every=500, exploration=0.5)
+
+    hard_20 = [
+        state for state in statistics.state_counts if isinstance(state, ProperState) and state.player_hand_value == 20
+    ]
+    stands = sum(statistics.action_counts[(state, Action.STAND)] for state in hard_20)
+    hits = sum(statistics.action_counts[(state, Action.HIT)] for state in hard_20)
+    assert stands > hits
+
+    # The service's own strategy is restored afterwards
+    assert not isinstance(service.player_strategy, BanditStrategy)
+    assert graph.get_graph()
+
+
+def test_bandit_games_reject_invalid_refresh():
+    with pytest.raises(ValueError, match="refreshed"):
+        BlackjackService().play_bandit_games(num_rounds=10, refresh_every=0)
+
+
+def test_cli_rejects_options_bandit_exploration_would_ignore():
+    result = CliRunner().invoke(main, ["--num-rounds", "10", "--no-print", "--bandit-epochs", "2", "--seats", "3"])
+
+    assert result.exit_code == 1
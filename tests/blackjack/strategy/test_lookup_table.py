@@ -0,0 +1,93 @@
+import pytest
+
+from blackjack.blackjack_service import BlackjackService
+from blackjack.entities.card import Card
+from blackjack.entities.state import PairState, ProperState, TerminalState, Turn
+from blackjack.ev_calculator import StateEV
+from blackjack.game_events import GameEventType
+from blackjack.strategy.lookup_table import LookupTableStrategy
+from blackjack.turn.action import Action
+from tests.blackjack.conftest import AlwaysStandStrategy, make_hand
+
+STATE_EVS = {
+    ProperState(16, False, "10", Turn.PLAYER): StateEV(
+        Action.HIT, {Action.HIT: -0.5, Action.STAND: -0.6, Action.DOUBLE: -1.1}, 10
+    ),
+    PairState("8", Turn.PLAYER, "10", 1): StateEV(
+        Action.SPLIT, {Action.SPLIT: -0.4, Action.HIT: -0.5, Action.STAND: -0.6}, 10
+    ),
+    ProperState(16, False, "10", Turn.DEALER): StateEV(Action.NOOP, {Action.NOOP: -0.6}, 10),
+    TerminalState(None): StateEV(Action.NOOP, {Action.NOOP: 0.0}, 0),
+}
+
+
+def game_state(upcard="10", split_count=0, turn=Turn.PLAYER):
+    return {"dealer_upcard_rank": upcard, "split_count": split_count, "turn": turn}
+
+
+def test_chooses_best_available_action():
+    strategy = LookupTableStrategy.from_evs(STATE_EVS, fallback=AlwaysStandStrategy())
+    hand = make_hand("10", "6")
+
+    assert strategy.choose_action(hand, [Action.STAND, Action.HIT, Action.DOUBLE], game_state()) == Action.HIT
+    assert strategy.choose_action(hand, [Action.DOUBLE, Action.STAND], game_state()) == Action.STAND
+
+    pair = make_hand("8", "8")
+    actions = [Action.STAND, Action.HIT, Action.SPLIT]
+    assert strategy.choose_action(pair, actions, game_state(split_count=1)) == Action.SPLIT
+
+
+def test_missing_decisions_use_fallback():
+    strategy = LookupTableStrategy.from_evs(STATE_EVS, fallback=AlwaysStandStrategy())
+    actions = [Action.STAND, Action.HIT]
+
+    assert strategy.choose_action(make_hand("10", "6"), actions, game_state(upcard="9")) == Action.STAND
+    assert strategy.choose_action(make_hand("8", "8"), actions, game_state(split_count=0)) == Action.STAND
+    assert strategy.choose_action(make_hand("8", "8"), actions, game_state(split_count=3)) == Action.STAND
+    assert strategy.choose_action(make_hand("10", "6", "10"), actions, game_state()) == Action.STAND
+    assert strategy.choose_action(make_hand("10", "6"), actions, {}) == Action.STAND
+
+
+def test_round_trips_through_a_compact_file(tmp_path):
+    strategy = LookupTableStrategy.from_evs(STATE_EVS)
+    path = tmp_path / "strategy.bjlt"
+    strategy.save(str(path))
+
+    loaded = LookupTableStrategy.load(str(path), fallback=AlwaysStandStrategy())
+
+    assert loaded.table == strategy.table
+    assert loaded.max_split_count == 2
+    assert path.stat().st_size < 1024
+    assert loaded.choose_action(make_hand("10", "6"), [Action.STAND, Action.HIT], game_state()) == Action.HIT
+
+
+def test_rejects_invalid_data():
+    with pytest.raises(ValueError, match="Not a lookup table"):
+        LookupTableStrategy.from_bytes(b"XXXX\x01\x01\x04")
+
+    with pytest.raises(ValueError, match="expected"):
+        LookupTableStrategy(b"\x00", max_split_count=1)
+
+
+def test_game_passes_decision_context_to_strategy():
+    shoe_cards = [
+        Card("10", "♠"),  # Player first
+        Card("10", "♣"),  # Dealer first
+        Card("6", "♦"),  # Player second (16)
+        Card("7", "♣"),  # Dealer second
+        Card("3", "♥"),  # Player hit (19)
+        Card("5", "♥"),
+    ]
+    event_log = []
+    service = BlackjackService.create_null(
+        shoe_cards=list(reversed(shoe_cards)),
+        player_strategy=LookupTableStrategy.from_evs(STATE_EVS, fallback=AlwaysStandStrategy()),
+        output_tracker=event_log.append,
+    )
+
+    service.play_games(printable=False)
+
+    player_actions = [
+        e.action for e in event_log if e.event_type == GameEventType.CHOOSE_ACTION and e.player == "Player"
+    ]
+    assert player_actions == [Action.HIT, Action.STAND]
@@ -0,0 +1,114 @@
+import pytest
+
+from blackjack.blackjack_service import BlackjackService
+from blackjack.entities.card import Card
+from blackjack.entities.deck_schema import StandardBlackjackSchema
+from blackjack.entities.player import Player
+from blackjack.entities.shoe import Shoe
+from blackjack.entities.state import Outcome, ProperState, SplitState, Turn
+from blackjack.gameplay.game_context import GameContext
+from blackjack.rules.standard import StandardBlackjackRules
+from blackjack.strategy.strategy import StandardDealerStrategy
+from blackjack.turn.action import Action
+from tests.blackjack.conftest import AlwaysStandStrategy, parse_final_hands_and_outcomes
+
+
+def test_snapshot_restore_rewinds_shoe_and_hands():
+    shoe = Shoe.create_null(StandardBlackjackSchema(), cards=[Card("2", "♠"), Card("8", "♦"), Card("8", "♣")])
+    shoe.shuffle()
+    player = Player("Player", AlwaysStandStrategy())
+    dealer = Player("Dealer", StandardDealerStrategy())
+    context = GameContext(player, shoe, StandardBlackjackRules(), dealer)
+    player.hand.add_card(shoe.deal_card())
+    player.hand.add_card(shoe.deal_card())
+
+    snapshot = context.snapshot()
+    player.split_active_hand()
+    player.hand.add_card(shoe.deal_card())
+    player.active_index = 1
+    dealer.hand.add_card(Card("K", "♠"))
+    context.forced_action = Action.HIT
+
+    context.restore(snapshot)
+
+    assert [hand.cards for hand in player.hands] == [[Card("8", "♣"), Card("8", "♦")]]
+    assert player.active_index == 0
+    assert dealer.hand.cards == []
+    assert context.forced_action is None
+    assert shoe.cards_left() == 1
+    assert shoe.deal_card() == Card("2", "♠")
+
+
+def test_rewind_rejects_unknown_position():
+    shoe = Shoe(StandardBlackjackSchema())
+
+    with pytest.raises(ValueError, match="Cannot rewind"):
+        shoe.rewind(1)
+
+
+def test_branching_plays_every_action_on_the_same_cards():
+    shoe_cards = [
+        Card("10", "♠"),  # Player first
+        Card("9", "♣"),  # Dealer first
+        Card("6", "♦"),  # Player second (16)
+        Card("8", "♣"),  # Dealer second (17)
+        Card("5", "♥"),  # Next card for every branch that draws
+        Card("10", "♥"),
+    ]
+    event_log = []
+    service = BlackjackService.create_null(
+        shoe_cards=list(reversed(shoe_cards)),
+        player_strategy=AlwaysStandStrategy(),
+        output_tracker=event_log.append,
+        branch_actions=True,
+    )
+
+    graph = service.play_games(printable=False)
+
+    state_16 = ProperState(16, False, "9", Turn.PLAYER)
+    assert {action: sum(next_states.values()) for action, next_states in graph.get_graph()[state_16].items()} == {
+        Action.HIT: 1,
+        Action.DOUBLE: 1,
+        Action.STAND: 1,
+    }
+
+    evs = service.calculate_evs(graph)
+    assert evs[state_16].action_evs == {Action.HIT: 1.0, Action.DOUBLE: 2.0, Action.STAND: -1.0}
+
+    # Only the strategy's own line is reported to the output tracker
+    hands, outcomes = parse_final_hands_and_outcomes(event_log)
+    assert outcomes["Player"] == Outcome.LOSE
+    assert hands["Player"] == [Card("10", "♠"), Card("6", "♦")]
+
+
+def test_branching_restores_after_a_split():
+    shoe_cards = [
+        Card("8", "♠"),  # Player first
+        Card("10", "♣"),  # Dealer first
+        Card("8", "♦"),  # Player second
+        Card("9", "♣"),  # Dealer second (19)
+        Card("3", "♥"),
+        Card("2", "♥"),
+        Card("10", "♥"),
+        Card("10", "♦"),
+    ]
+    event_log = []
+    service = BlackjackService.create_null(
+        shoe_cards=list(reversed(shoe_cards)),
+        player_strategy=AlwaysStandStrategy(),
+        output_tracker=event_log.append,
+        branch_actions=True,
+    )
+
+    graph = service.play_games(printable=False)
+
+    assert any(
+        isinstance(next_state, SplitState)
+        for actions in graph.get_graph().values()
+        for next_states in actions.values()
+        for next_state in next_states
+    )
+    hands, outcomes = parse_final_hands_and_outcomes(event_log)
+    assert hands["Player"] == [Card("8", "♠"), Card("8", "♦")]
+    assert hands["Dealer"] == [Card("10", "♣"), Card("9", "♣")]
+    assert outcomes["Player"] == Outcome.LOSE
@@ -0,0 +1,115 @@
+import random
+
+import pytest
+from click.testing import CliRunner
+
+from blackjack.blackjack_service import BlackjackService
+from blackjack.cli import main
+from blackjack.compaction import compact_graph, prune_rare_transitions
+from blackjack.entities.state import (
+    Outcome,
+    PreDealState,
+    ProperState,
+    TerminalState,
+    Turn,
+)
+from blackjack.entities.state_transition_graph import StateTransitionGraph
+from blackjack.turn.action import Action
+
+WIN = TerminalState.of(Outcome.WIN)
+LOSE = TerminalState.of(Outcome.LOSE)
+
+
+def best_ev(state_evs, state):
+    state_ev = state_evs[state]
+    return state_ev.action_evs[state_ev.optimal_action]
+
+
+def test_compacted_graph_keeps_every_remaining_states_ev():
+    random.seed(7)
+    service = BlackjackService(num_decks=2)
+    graph = service.play_games(3000, printable=False)
+
+    compacted, report = compact_graph(graph)
+
+    assert report.states_after < report.states_before
+    assert report.edges_after < report.edges_before
+    assert report.collapsed_states == report.states_before - report.states_after
+    assert report.pruned_edges == 0
+    assert len(compacted.get_graph()) == report.states_after
+
+    state_evs = service.calculate_evs(graph)
+    compacted_evs = service.calculate_evs(compacted)
+    assert PreDealState.of() in compacted_evs
+    for state in compacted_evs:
+        assert best_ev(compacted_evs, state) == pytest.approx(best_ev(state_evs, state))
+
+
+def test_chain_before_a_decision_is_kept_after_a_non_noop_action():
+    # Doubling is worth more at the decision state, but a HIT leading to it only allows HIT or STAND afterwards
+    hit_from = ProperState.of(11, False, "6", Turn.PLAYER)
+    link = ProperState.of(15, False, "6", Turn.INTERMEDIATE)
+    decision = ProperState.of(15, False, "6", Turn.PLAYER)
+    graph = StateTransitionGraph()
+    graph.add_transition(PreDealState.of(), Action.NOOP, hit_from)
+    graph.add_transition(hit_from, Action.HIT, link)
+    graph.add_transition(link, Action.NOOP, decision)
+    graph.add_transition(decision, Action.STAND, LOSE)
+    graph.add_transition(decision, Action.DOUBLE, WIN)
+
+    compacted, report = compact_graph(graph)
+
+    assert report.collapsed_states == 0
+    assert compacted.get_graph()[hit_from][Action.HIT] == {link: 1}
+    service = BlackjackService(num_decks=1)
+    assert best_ev(service.calculate_evs(graph), PreDealState.of()) == 2
+    assert best_ev(service.calculate_evs(compacted), PreDealState.of()) == 2
+
+
+def test_noop_chains_are_skipped():
+    root = PreDealState.of()
+    setup = ProperState.of(20, False, "10", Turn.SETUP)
+    dealer = ProperState.of(20, False, "10", Turn.DEALER)
+    finalize = ProperState.of(20, False, "10", Turn.FINALIZE)
+    graph = StateTransitionGraph()
+    graph.add_transition(root, Action.NOOP, setup, 3)
+    graph.add_transition(setup, Action.NOOP, dealer, 3)
+    graph.add_transition(dealer, Action.NOOP, finalize, 3)
+    graph.add_transition(finalize, Action.NOOP, WIN, 3)
+
+    compacted, report = compact_graph(graph)
+
+    assert compacted.get_graph() == {root: {Action.NOOP: {WIN: 3}}}
+    assert (report.states_before, report.states_after, report.edges_before, report.edges_after) == (4, 1, 4, 1)
+    assert report.state_reduction == 0.75
+
+
+def test_pruning_moves_rare_counts_to_the_remaining_next_states():
+    root = PreDealState.of()
+    common = ProperState.of(20, False, "10", Turn.PLAYER)
+    rare = ProperState.of(12, False, "10", Turn.PLAYER)
+    transitions = {
+        root: {Action.NOOP: {common: 9, rare: 1}},
+        common: {Action.STAND: {WIN: 6, LOSE: 3}, Action.HIT: {LOSE: 1}},
+        rare: {Action.HIT: {LOSE: 1}},
+    }
+
+    pruned, pruned_edges = prune_rare_transitions(transitions, 2)
+
+    assert pruned_edges == 1
+    assert pruned[root] == {Action.NOOP: {common: 10}}
+    # An action seen too rarely still keeps its most frequent next state
+    assert pruned[common] == {Action.STAND: {WIN: 6, LOSE: 3}, Action.HIT: {LOSE: 1}}
+    assert rare not in pruned
+
+
+def test_cli_compacts_the_graph():
+    result = CliRunner().invoke(main, ["--num-rounds", "50", "--no-print", "--compact", "--prune-below", "2"])
+
+    assert result.exit_code == 0
+
+
+def test_cli_rejects_pruning_without_compacting():
+    result = CliRunner().invoke(main, ["--num-rounds", "10", "--prune-below", "2"])
+
+    assert result.exit_code == 1
@@ -1,7 +1,25 @@
+import pickle
+import random
+
+import pytest
+
 from blackjack.blackjack_service import BlackjackService
 from blackjack.entities.card import Card
-from blackjack.entities.state import Outcome, ProperState, TerminalState, Turn
+from blackjack.entities.state import (
+    CompoundState,
+    Outcome,
+    PreDealState,
+    ProperState,
+    SplitState,
+    TerminalState,
+    Turn,
+)
 from blackjack.entities.state_transition_graph import StateTransitionGraph
+from blackjack.ev_calculator import (
+    EncodedTransitions,
+    EVCalculator,
+    partition_by_upcard,
+)
 from blackjack.rules.standard import StandardBlackjackRules
 from blackjack.turn.action import Action
 from tests.blackjack.conftest import (
@@ -413,3 +431,106 @@ class TestEVCalculator:
             assert result[player_state_16_soft].optimal_action == Action.DOUBLE
             # Double EV should be 2.0 (doubled from 1.0 win)
             assert result[player_state_16_soft].action_evs[Action.DOUBLE] == 2.0
+
+    def test_next_state_ev_is_limited_to_actions_viable_after_the_previous_action(self):
+        # Doubling is best at 15, but a hand that hit to 15 can only hit or stand
+        hit_from = ProperState(11, False, "6", Turn.PLAYER)
+        hit_to = ProperState(15, False, "6", Turn.PLAYER)
+        graph = StateTransitionGraph()
+        graph.add_transition(hit_from, Action.HIT, hit_to)
+        graph.add_transition(hit_to, Action.STAND, TerminalState(Outcome.PUSH))
+        graph.add_transition(hit_to, Action.HIT, TerminalState(Outcome.LOSE))
+        graph.add_transition(hit_to, Action.DOUBLE, TerminalState(Outcome.WIN))
+
+        result = BlackjackService.create_null().calculate_evs(graph)
+
+        assert result[hit_to].optimal_action == Action.DOUBLE
+        assert result[hit_from].action_evs[Action.HIT] == 0.0
+
+    def test_next_state_without_viable_actions_raises(self):
+        doubled_from = ProperState(11, False, "6", Turn.PLAYER)
+        doubled_to = ProperState(15, False, "6", Turn.PLAYER)
+        graph = StateTransitionGraph()
+        graph.add_transition(doubled_from, Action.DOUBLE, doubled_to)
+        graph.add_transition(doubled_to, Action.HIT, TerminalState(Outcome.WIN))
+
+        with pytest.raises(RuntimeError, match="No allowed actions"):
+            BlackjackService.create_null().calculate_evs(graph)
+
+
+def test_encoded_transitions_round_trip():
+    random.seed(5)
+    graph = BlackjackService(num_decks=1).play_games(500, printable=False)
+    hand = ProperState.of(16, False, "9", Turn.PLAYER)
+    compound = CompoundState.of(0, (hand, ProperState.of(12, False, "9", Turn.SETUP)), "9", Turn.PLAYER)
+    graph.add_transition(compound, Action.STAND, hand, 0.5)
+    transitions = graph.get_graph()
+    assert any(
+        isinstance(state, SplitState) for actions in transitions.values() for s in actions.values() for state in s
+    )
+
+    states, encoded = EncodedTransitions.encode_with_states(transitions)
+    decoded = pickle.loads(pickle.dumps(encoded)).decode()
+
+    assert all(isinstance(state, tuple) for state in encoded.states)
+    assert decoded == transitions
+    assert [list(actions) for actions in decoded.values()] == [list(actions) for actions in transitions.values()]
+    assert all(state is original for state, original in zip(decoded, transitions))
+    assert all(state is rebuilt for state, rebuilt in zip(states, encoded.decode_states(), strict=True))
+
+
+def test_encoded_transitions_pickle_smaller_than_the_transitions():
+    random.seed(5)
+    graph = BlackjackService(num_decks=2, num_seats=2).play_games(2000, printable=False)
+    _, parts = partition_by_upcard(graph.get_graph())
+
+    for part in parts:
+        pickled = pickle.dumps(EncodedTransitions.encode(part))
+
+        # No state classes are pickled, only their codes
+        assert b"ProperState" not in pickled
+        assert len(pickled) < 0.9 * len(pickle.dumps(part))
+
+
+def test_graph_is_partitioned_by_dealer_upcard():
+    random.seed(5)
+    graph = BlackjackService(num_decks=1).play_games(500, printable=False)
+
+    partitions = partition_by_upcard(graph.get_graph())
+
+    assert partitions is not None
+    root, parts = partitions
+    assert list(root) == [PreDealState()]
+    assert len(parts) == 10
+    assert sum(len(part) for part in parts) == len(graph.get_graph()) - 1
+
+
+def test_graph_crossing_upcards_is_not_partitioned():
+    graph = StateTransitionGraph()
+    graph.add_transition(ProperState(12, False, "6", Turn.PLAYER), Action.HIT, ProperState(15, False, "6", Turn.PLAYER))
+    graph.add_transition(ProperState(12, False, "5", Turn.PLAYER), Action.HIT, ProperState(15, False, "6", Turn.PLAYER))
+
+    assert partition_by_upcard(graph.get_graph()) is None
+
+
+def test_parallel_evs_match_single_process():
+    random.seed(5)
+    service = BlackjackService(num_decks=2, num_seats=2)
+    graph = service.play_games(1000, printable=False)
+
+    assert service.calculate_evs(graph, parallel=2) == service.calculate_evs(graph)
+
+
+def test_streamed_states_must_come_after_the_states_they_lead_to():
+    player = ProperState.of(20, False, "10", Turn.PLAYER)
+    finalize = ProperState.of(20, False, "10", Turn.FINALIZE)
+    states = [
+        (player, {Action.STAND: {finalize: 1}}),
+        (finalize, {Action.NOOP: {TerminalState.of(Outcome.WIN): 1}}),
+    ]
+
+    with pytest.raises(ValueError, match="came before"):
+        EVCalculator(StandardBlackjackRules()).calculate_evs_from_states(states)
+
+    state_evs = EVCalculator(StandardBlackjackRules()).calculate_evs_from_states(reversed(states))
+    assert state_evs[player].action_evs == {Action.STAND: 1}
@@ -0,0 +1,66 @@
+import queue
+
+import pytest
+
+from blackjack.blackjack_service import BlackjackService
+from blackjack.runner import iter_flushed_batches, run_batch, run_parallel_batches
+from tests.blackjack.conftest import rounds_in
+
+
+def test_run_batch_flushes_deltas_and_keeps_nothing():
+    deltas: queue.Queue = queue.Queue()
+
+    graph = run_batch(1, 25, True, False, flush_queue=deltas, flush_rounds=10)
+
+    flushed = [deltas.get_nowait() for _ in range(deltas.qsize())]
+    assert not graph.get_graph()
+    assert [rounds for rounds, _ in flushed] == [10, 10, 5]
+    assert [rounds_in(delta) for _, delta in flushed] == [10, 10, 5]
+
+
+def test_timed_chunks_play_at_least_one_round():
+    service = BlackjackService.create_null(num_decks=1)
+
+    updates = list(service.play_games_iter(3, chunk_size=100, chunk_seconds=1e-9))
+
+    assert [update.rounds for update in updates] == [1, 1, 1]
+    assert updates[-1].rounds_played == 3
+
+
+def test_flushed_batches_deliver_every_round():
+    updates = list(iter_flushed_batches(num_decks=1, batch_sizes=[30, 20], parallel=2, flush_rounds=10))
+
+    assert len(updates) == 5
+    assert updates[-1].rounds_played == updates[-1].total_rounds == 50
+    assert sum(rounds_in(update.graph) for update in updates) == 50
+
+
+def test_flushed_snapshots_hold_every_round_so_far():
+    updates = iter_flushed_batches(num_decks=1, batch_sizes=[30, 20], parallel=2, flush_rounds=10, snapshots=True)
+
+    assert [rounds_in(update.graph) for update in updates] == [10, 20, 30, 40, 50]
+
+
+def test_run_parallel_batches_merges_flushed_deltas():
+    main_graph = run_batch(1, 5, True, False)
+
+    run_parallel_batches(
+        num_decks=1,
+        num_rounds=40,
+        no_shuffle_between=False,
+        no_print=True,
+        parallel=2,
+        main_graph=main_graph,
+        flush_seconds=0.01,
+    )
+
+    assert rounds_in(main_graph) == 45
+
+
+def test_flushed_batches_raise_worker_errors(tmp_path):
+    updates = iter_flushed_batches(
+        num_decks=1, batch_sizes=[10], parallel=1, flush_rounds=5, strategy_file=str(tmp_path / "missing.bjlt")
+    )
+
+    with pytest.raises(FileNotFoundError):
+        list(updates)
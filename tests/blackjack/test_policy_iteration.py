@@ -0,0 +1,92 @@
+import pytest
+from click.testing import CliRunner
+
+from blackjack.blackjack_service import BlackjackService, optimal_actions
+from blackjack.cli import main
+from blackjack.entities.card import Card
+from blackjack.entities.hand import Hand
+from blackjack.entities.random_wrapper import RandomWrapper
+from blackjack.entities.state import ProperState, Turn
+from blackjack.ev_calculator import StateEV
+from blackjack.strategy.strategy import ExploringStrategy
+from blackjack.turn.action import Action
+from tests.blackjack.conftest import AlwaysHitStrategy, AlwaysStandStrategy
+
+SHOE_CARDS = [
+    Card("10", "♠"),  # Player first
+    Card("9", "♣"),  # Dealer first
+    Card("6", "♦"),  # Player second (16)
+    Card("8", "♣"),  # Dealer second (17)
+    Card("10", "♥"),  # Player hit (bust)
+]
+
+
+def test_optimal_actions_only_keeps_player_decisions():
+    player_state = ProperState(16, False, "9", Turn.PLAYER)
+    dealer_state = ProperState(16, False, "9", Turn.DEALER)
+    state_evs = {
+        player_state: StateEV(Action.STAND, {Action.STAND: -1.0, Action.HIT: -1.0}, 1),
+        dealer_state: StateEV(Action.NOOP, {Action.NOOP: -1.0}, 1),
+    }
+
+    assert optimal_actions(state_evs) == {player_state: Action.STAND}
+
+
+def test_exploring_strategy_delegates_unless_exploring():
+    hand = Hand()
+    actions = [Action.STAND, Action.HIT]
+
+    randomizer = RandomWrapper(null=True, choice_responses=[Action.STAND], random_responses=[0.5])
+    sometimes = ExploringStrategy(AlwaysHitStrategy(), 0.6, randomizer)
+    assert sometimes.choose_action(hand, actions, {}) == Action.STAND
+    assert sometimes.choose_action(hand, actions, {}) == Action.HIT
+
+    assert 0.0 <= RandomWrapper().random() < 1.0
+
+
+def test_policy_iteration_stops_when_policy_is_stable():
+    service = BlackjackService.create_null(shoe_cards=list(reversed(SHOE_CARDS)), player_strategy=AlwaysStandStrategy())
+    initial_strategy = service.player_strategy
+
+    result = service.iterate_policy(rounds_per_iteration=2, exploration_rate=0.0)
+
+    assert result.converged
+    assert result.iterations == 2
+    assert service.player_strategy is initial_strategy
+
+    state_16 = ProperState(16, False, "9", Turn.PLAYER)
+    assert result.state_evs[state_16].optimal_action == Action.STAND
+    assert sum(sum(n.values()) for n in result.graph.get_graph()[state_16].values()) == 4
+    game_state = {"dealer_upcard_rank": "9", "split_count": 0, "turn": Turn.PLAYER}
+    hand = Hand()
+    hand.cards = [Card("10", "♠"), Card("6", "♦")]
+    assert result.strategy.choose_action(hand, [Action.HIT, Action.STAND], game_state) == Action.STAND
+
+
+def test_policy_iteration_reports_when_not_converged():
+    service = BlackjackService.create_null(shoe_cards=list(reversed(SHOE_CARDS)), player_strategy=AlwaysHitStrategy())
+
+    result = service.iterate_policy(rounds_per_iteration=1, max_iterations=1)
+
+    assert not result.converged
+    assert result.iterations == 1
+
+    with pytest.raises(ValueError, match="at least one iteration"):
+        service.iterate_policy(rounds_per_iteration=1, max_iterations=0)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        ["--seats", "2"],
+        ["--stratify", "proportional"],
+        ["--branch-actions"],
+        ["--strategy-file", "strategy.bjlt"],
+        ["--no-shuffle-between"],
+        ["--bandit-epochs", "2"],
+    ],
+)
+def test_cli_rejects_options_policy_iteration_would_ignore(options):
+    result = CliRunner().invoke(main, ["--num-rounds", "10", "--no-print", "--policy-iterations", "2", *options])
+
+    assert result.exit_code == 1
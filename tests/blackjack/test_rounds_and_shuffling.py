@@ -1,12 +1,18 @@
+import random
+
+import pytest
+
 from blackjack.cli import BlackjackService
 from blackjack.entities.card import Card
+from blackjack.entities.player import Player
+from blackjack.entities.state import PreDealState
 from blackjack.entities.state_transition_graph import StateTransitionGraph
 from blackjack.game import Game
 from blackjack.rules.standard import StandardBlackjackRules
 from blackjack.strategy.strategy import StandardDealerStrategy
 from blackjack.turn.action import Action
 from blackjack.turn.state_machine_factory import blackjack_state_machine
-from tests.blackjack.conftest import parse_final_hands_and_outcomes
+from tests.blackjack.conftest import AlwaysStandStrategy, parse_final_hands_and_outcomes
 
 # Fixed shoe: alternating player and dealer cards for deterministic results
 # 1st round: Player1: 2♥, 3♥; Dealer: 4♥, 5♥; 2nd round: Player1: 6♥, 7♥; Dealer: 8♥, 9♥, etc.
@@ -84,3 +90,89 @@ def test_face_cards_shown_as_tens_in_graph(stacked_shoe, always_stand_strategy):
             found = True
             break
     assert found
+
+
+def play_fresh_games(service, num_rounds):
+    """Play rounds the way play_games did before games were reused: a new Game, players and hands every round."""
+    graph = StateTransitionGraph()
+    for round_num in range(1, num_rounds + 1):
+        Game(
+            service.player_strategy,
+            service.shoe,
+            service.rules,
+            service.state_machine,
+            service.dealer_strategy,
+            state_transition_graph=graph,
+            num_seats=service.num_seats,
+        ).play_round()
+        if round_num < num_rounds:
+            service.shoe.shuffle()
+    return graph
+
+
+@pytest.mark.parametrize("num_seats", [1, 3])
+def test_reused_games_build_the_same_graph_as_fresh_ones(num_seats):
+    random.seed(1234)
+    reused = BlackjackService(num_decks=2, num_seats=num_seats).play_games(2000, printable=False)
+
+    random.seed(1234)
+    fresh = play_fresh_games(BlackjackService(num_decks=2, num_seats=num_seats), 2000)
+
+    assert reused.get_graph() == fresh.get_graph()
+
+
+def test_reused_players_recycle_split_hands():
+    player = Player("Player", AlwaysStandStrategy())
+    player.hand.add_card(Card("8", "♠"))
+    player.hand.add_card(Card("8", "♥"))
+    player.split_active_hand()
+    split_hand = player.hands[1]
+
+    player.reset()
+
+    assert len(player.hands) == 1
+    assert player.active_index == 0
+    assert not player.hand.cards
+    assert not split_hand.cards
+
+    player.hand.add_card(Card("9", "♠"))
+    player.hand.add_card(Card("9", "♥"))
+    player.split_active_hand()
+    assert player.hands[1] is split_hand
+
+
+def test_aggregated_rounds_reach_the_graph_on_flush():
+    service = BlackjackService.create_null(num_decks=1)
+    graph = StateTransitionGraph()
+    game = service._new_game(graph)
+
+    for _ in range(50):
+        game.play_round()
+        service.shoe.shuffle()
+
+    assert not graph.get_graph()
+    assert sum(game.round_signatures.values()) == 50
+
+    assert game.flush() is graph
+    assert not game.round_signatures
+    assert sum(graph.get_graph()[PreDealState()][Action.NOOP].values()) == 50
+
+
+def test_round_signatures_are_flushed_once_the_limit_is_reached():
+    random.seed(45)
+    service = BlackjackService(num_decks=6)
+    graph = StateTransitionGraph()
+    game = service._new_game(graph)
+    game.max_round_signatures = 20
+
+    most_counted = 0
+    for _ in range(500):
+        game.play_round()
+        service.shoe.shuffle()
+        most_counted = max(most_counted, len(game.round_signatures))
+
+    assert most_counted < 20
+    assert graph.get_graph()
+
+    game.flush()
+    assert sum(graph.get_graph()[PreDealState()][Action.NOOP].values()) == 500
@@ -0,0 +1,213 @@
+import asyncio
+import json
+import os
+import pickle
+import stat
+
+import pytest
+
+from blackjack import server
+from blackjack.server import JobServer, load_graph
+
+
+async def read_until_done(reader, job):
+    events = []
+    while True:
+        event = json.loads(await reader.readline())
+        assert event["job"] == job
+        events.append(event)
+        if event["event"] != "progress":
+            return events
+
+
+def run_with_server(tmp_path, client):
+    async def main():
+        server = JobServer(workers=1, data_dir=str(tmp_path))
+        socket_path = str(tmp_path / "jobs.sock")
+        try:
+            listener = await server.start_unix(socket_path)
+            async with listener:
+                reader, writer = await asyncio.open_unix_connection(socket_path)
+                try:
+                    return await client(reader, writer, socket_path)
+                finally:
+                    writer.close()
+        finally:
+            server.close()
+
+    return asyncio.run(main())
+
+
+def send(writer, request):
+    writer.write(json.dumps(request).encode() + b"\n")
+
+
+def test_simulation_job_streams_progress_then_result(tmp_path):
+    graph_file = "graph.pkl"
+
+    async def client(reader, writer, socket_path):
+        send(
+            writer,
+            {"type": "simulate", "job": "a", "num_rounds": 200, "chunk_rounds": 100, "graph_output_file": graph_file},
+        )
+        simulation = await read_until_done(reader, "a")
+
+        send(writer, {"type": "ev", "job": "b", "graph_file": graph_file})
+        ev = await read_until_done(reader, "b")
+        return simulation, ev
+
+    simulation, ev = run_with_server(tmp_path, client)
+
+    assert [(e["event"], e.get("rounds_played")) for e in simulation] == [
+        ("progress", 100),
+        ("progress", 200),
+        ("result", None),
+    ]
+    assert simulation[-1]["rounds"] == 200
+    assert simulation[-1]["hands"] == 200
+    assert ev[-1]["event"] == "result"
+    assert ev[-1]["ev"] == pytest.approx(simulation[-1]["ev"])
+    assert (tmp_path / graph_file).exists()
+
+
+def test_jobs_can_be_cancelled(tmp_path):
+    async def client(reader, writer, socket_path):
+        send(writer, {"type": "simulate", "job": "long", "num_rounds": 100000000, "chunk_rounds": 100})
+        first = json.loads(await reader.readline())
+        send(writer, {"type": "cancel", "job": "long"})
+        return first, await read_until_done(reader, "long")
+
+    first, events = run_with_server(tmp_path, client)
+
+    assert first["event"] == "progress"
+    assert events[-1]["event"] == "cancelled"
+
+
+def test_bad_requests_get_errors(tmp_path):
+    async def client(reader, writer, socket_path):
+        send(writer, {"type": "juggle", "job": "x"})
+        unknown = json.loads(await reader.readline())
+        writer.write(b"not json\n")
+        invalid = json.loads(await reader.readline())
+        send(writer, {"type": "simulate", "num_rounds": 10})
+        missing_id = json.loads(await reader.readline())
+        return unknown, invalid, missing_id
+
+    unknown, invalid, missing_id = run_with_server(tmp_path, client)
+
+    assert unknown == {"event": "error", "job": "x", "message": "Unknown job type: juggle"}
+    assert invalid["event"] == "error"
+    assert invalid["message"].startswith("Invalid request")
+    assert missing_id == {"event": "error", "job": None, "message": "Requests need a job id string"}
+
+
+def test_socket_is_private(tmp_path):
+    async def client(reader, writer, socket_path):
+        return stat.S_IMODE(os.stat(socket_path).st_mode)
+
+    assert run_with_server(tmp_path, client) & 0o077 == 0
+
+
+@pytest.mark.parametrize("key", ["graph_file", "strategy_output_file"])
+def test_files_outside_the_data_directory_are_refused(tmp_path, key):
+    outside = str(tmp_path.parent / "outside.pkl")
+    request = {"type": "ev", "job": "e", "graph_file": "graph.pkl", key: outside}
+
+    async def client(reader, writer, socket_path):
+        send(writer, request)
+        return await read_until_done(reader, "e")
+
+    events = run_with_server(tmp_path, client)
+
+    assert events[-1] == {"event": "error", "job": "e", "message": f"{outside} is outside the data directory"}
+    assert not os.path.exists(outside)
+
+
+def test_graph_files_cannot_run_code(tmp_path):
+    class Exploit:
+        def __reduce__(self):
+            return os.system, ("touch " + str(tmp_path / "pwned"),)
+
+    with open(tmp_path / "graph.pkl", "wb") as f:
+        pickle.dump(Exploit(), f)
+
+    with pytest.raises(pickle.UnpicklingError):
+        load_graph(str(tmp_path / "graph.pkl"))
+    assert not (tmp_path / "pwned").exists()
+
+
+def test_duplicate_live_job_ids_are_refused(tmp_path):
+    async def client(reader, writer, socket_path):
+        send(writer, {"type": "simulate", "job": "a", "num_rounds": 100000000, "chunk_rounds": 100})
+        send(writer, {"type": "simulate", "job": "a", "num_rounds": 10})
+        events = []
+        while not any(event["event"] == "error" for event in events):
+            events.append(json.loads(await reader.readline()))
+        send(writer, {"type": "cancel", "job": "a"})
+        return events + await read_until_done(reader, "a")
+
+    events = run_with_server(tmp_path, client)
+
+    assert {"event": "error", "job": "a", "message": "Job a is still running"} in events
+    assert events[-1]["event"] == "cancelled"
+
+
+def test_connections_cannot_cancel_each_others_jobs(tmp_path):
+    async def client(reader, writer, socket_path):
+        send(writer, {"type": "simulate", "job": "a", "num_rounds": 300, "chunk_rounds": 100})
+        other_reader, other_writer = await asyncio.open_unix_connection(socket_path)
+        try:
+            send(other_writer, {"type": "cancel", "job": "a"})
+            send(other_writer, {"type": "simulate", "job": "a", "num_rounds": 10})
+            other = await read_until_done(other_reader, "a")
+        finally:
+            other_writer.close()
+        return other, await read_until_done(reader, "a")
+
+    other, events = run_with_server(tmp_path, client)
+
+    assert other[-1]["event"] == "result"
+    assert other[-1]["rounds"] == 10
+    assert events[-1]["event"] == "result"
+    assert events[-1]["rounds"] == 300
+
+
+@pytest.mark.parametrize(
+    "fields, message",
+    [
+        ({}, "num_rounds is required, an integer of at least 1"),
+        ({"num_rounds": 0}, "num_rounds must be an integer of at least 1, got 0"),
+        ({"num_rounds": "10"}, "num_rounds must be an integer of at least 1, got '10'"),
+        ({"num_rounds": 10, "num_decks": 1000}, "num_decks must be an integer from 1 to 8, got 1000"),
+        ({"num_rounds": 10, "num_seats": 9}, "num_seats must be an integer from 1 to 7, got 9"),
+        ({"num_rounds": 10, "chunk_rounds": True}, "chunk_rounds must be an integer of at least 1, got True"),
+    ],
+)
+def test_simulation_fields_are_checked(tmp_path, fields, message):
+    async def client(reader, writer, socket_path):
+        send(writer, {"type": "simulate", "job": "s", **fields})
+        return await read_until_done(reader, "s")
+
+    events = run_with_server(tmp_path, client)
+
+    assert events == [{"event": "error", "job": "s", "message": message}]
+
+
+def test_worker_services_are_cached_only_once_they_played_and_capped(monkeypatch):
+    monkeypatch.setattr(server, "_worker_services", {})
+
+    with pytest.raises(ValueError, match="1 to 7 seats"):
+        server.simulate_chunk(1, 9, 1)
+    assert not server._worker_services
+
+    for num_decks in range(1, server.MAX_WORKER_SERVICES + 1):
+        server.simulate_chunk(num_decks, 1, 1)
+    first = server._worker_services[1, 1]
+    server.simulate_chunk(1, 1, 1)
+    assert server._worker_services[1, 1] is first
+
+    # The least recently used service makes room
+    server.simulate_chunk(1, 2, 1)
+    assert len(server._worker_services) == server.MAX_WORKER_SERVICES
+    assert (2, 1) not in server._worker_services
+    assert (1, 1) in server._worker_services
@@ -0,0 +1,87 @@
+import os
+import time
+
+import pytest
+from click.testing import CliRunner
+
+from blackjack.cli import main
+from blackjack.sharding import ShardCoordinator, ShardError, run_local_nodes, run_node
+from tests.blackjack.conftest import rounds_in
+
+
+def test_local_nodes_cover_every_chunk(tmp_path):
+    coordinator = ShardCoordinator(str(tmp_path))
+    manifest = coordinator.create_job(num_rounds=250, chunk_size=50)
+
+    finished = run_local_nodes(str(tmp_path), workers=3)
+
+    assert len(manifest.chunks) == 5
+    assert finished == 5
+    assert coordinator.missing_chunks() == []
+    assert rounds_in(coordinator.reduce()) == 250
+
+
+def test_claimed_chunks_are_left_to_their_node_until_the_lease_expires(tmp_path):
+    coordinator = ShardCoordinator(str(tmp_path), lease_seconds=60)
+    first, second = coordinator.create_job(num_rounds=20, chunk_size=10).chunks
+    assert coordinator.try_claim(first, "busy-node")
+
+    assert run_node(str(tmp_path), lease_seconds=60) == 1
+    assert coordinator.missing_chunks() == [first]
+    with pytest.raises(ShardError, match="chunk-000000"):
+        coordinator.reduce()
+
+    # The busy node dies: once its claim goes stale, a late node takes the chunk over
+    claim_path = os.path.join(str(tmp_path), "claims", "chunk-000000.claim")
+    an_hour_ago = time.time() - 3600
+    os.utime(claim_path, (an_hour_ago, an_hour_ago))
+
+    assert run_node(str(tmp_path), lease_seconds=60) == 1
+    assert rounds_in(coordinator.reduce()) == 20
+
+
+def test_corrupt_shards_are_discarded_for_rerun(tmp_path):
+    coordinator = ShardCoordinator(str(tmp_path))
+    (chunk,) = coordinator.create_job(num_rounds=10, chunk_size=10).chunks
+    run_node(str(tmp_path))
+
+    shard_path = os.path.join(str(tmp_path), "shards", "chunk-000000.shard")
+    with open(shard_path, "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        f.write(b"\x00")
+
+    with pytest.raises(ShardError, match="not finished"):
+        coordinator.reduce()
+    assert coordinator.missing_chunks() == [chunk]
+
+    run_node(str(tmp_path))
+    assert rounds_in(coordinator.reduce()) == 10
+
+
+def test_one_job_per_directory(tmp_path):
+    coordinator = ShardCoordinator(str(tmp_path))
+    coordinator.create_job(num_rounds=10, chunk_size=10)
+
+    with pytest.raises(ShardError, match="already holds"):
+        coordinator.create_job(num_rounds=10, chunk_size=10)
+    with pytest.raises(ShardError, match="No sharded job"):
+        ShardCoordinator(str(tmp_path / "missing")).load_manifest()
+
+
+def test_shard_subcommands(tmp_path):
+    directory = str(tmp_path / "job")
+    graph_file = str(tmp_path / "graph.pkl")
+    runner = CliRunner()
+
+    created = runner.invoke(main, ["shard", "create", directory, "--num-rounds", "30", "--chunk-rounds", "10"])
+    early = runner.invoke(main, ["shard", "reduce", directory, "--no-print"])
+    node = runner.invoke(main, ["shard", "node", directory, "--workers", "2"])
+    reduced = runner.invoke(main, ["shard", "reduce", directory, "--no-print", "--graph-output-file", graph_file])
+
+    assert created.exit_code == 0, created.output
+    assert early.exit_code != 0
+    assert "3 chunks are not finished" in early.output
+    assert node.exit_code == 0, node.output
+    assert "Finished 3 chunks" in node.output
+    assert reduced.exit_code == 0, reduced.output
+    assert os.path.exists(graph_file)
@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+from click.testing import CliRunner
+
+from blackjack.startup_benchmark import (
+    cli_first_round_seconds,
+    import_times,
+    main,
+    worker_first_round_seconds,
+)
+
+
+def test_cli_import_does_not_load_the_simulation():
+    completed = subprocess.run(
+        [sys.executable, "-c", "import sys, blackjack.cli; print(sorted(m for m in sys.modules if 'blackjack' in m))"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert completed.stdout.strip() == "['blackjack', 'blackjack.cli']"
+
+
+def test_stratify_choices_match_allocations():
+    from blackjack.cli import STRATIFY_CHOICES
+    from blackjack.stratification import Allocation
+
+    assert STRATIFY_CHOICES == [allocation.value for allocation in Allocation]
+
+
+def test_startup_benchmark_measurements():
+    times = import_times("blackjack.cli")
+
+    assert times["blackjack.cli"] >= times["click"] > 0
+    assert "blackjack.blackjack_service" not in times
+    assert cli_first_round_seconds() > 0
+    assert worker_first_round_seconds("fork") > 0
+
+
+def test_startup_benchmark_command():
+    result = CliRunner().invoke(main, ["--repeat", "1", "--top", "3", "--start-method", "fork"])
+
+    assert result.exit_code == 0, result.output
+    assert "import blackjack.cli" in result.output
+    assert "Worker first round (fork)" in result.output
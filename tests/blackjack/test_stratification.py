@@ -0,0 +1,155 @@
+import math
+
+import pytest
+
+from blackjack.blackjack_service import BlackjackService
+from blackjack.entities.deck_schema import StandardBlackjackSchema
+from blackjack.entities.shoe import Shoe
+from blackjack.entities.state import PreDealState, ProperState, TerminalState
+from blackjack.entities.state_transition_graph import StateTransitionGraph
+from blackjack.rules.standard import StandardBlackjackRules
+from blackjack.runner import run_parallel_batches
+from blackjack.stratification import (
+    Allocation,
+    StratumShare,
+    allocate_rounds,
+    allocation_weights,
+    enumerate_initial_deals,
+    payout_std,
+    split_stratum_share,
+)
+from blackjack.turn.action import Action
+from tests.blackjack.conftest import AlwaysStandStrategy
+
+
+def test_initial_deals_cover_every_combination_exactly_once():
+    strata = enumerate_initial_deals(StandardBlackjackSchema(), num_decks=1)
+
+    # 55 unordered player hands against 10 upcards
+    assert len(strata) == 550
+    assert math.isclose(sum(stratum.probability for stratum in strata), 1.0)
+
+
+def test_initial_deal_probability_accounts_for_card_removal():
+    strata = enumerate_initial_deals(StandardBlackjackSchema(), num_decks=1)
+
+    aces = next(s for s in strata if (s.player_first_rank, s.player_second_rank, s.dealer_upcard_rank) == ("A",) * 3)
+    assert math.isclose(aces.probability, (4 / 52) * (3 / 51) * (2 / 50))
+
+    mixed = next(
+        s for s in strata if (s.player_first_rank, s.player_second_rank, s.dealer_upcard_rank) == ("10", "A", "2")
+    )
+    assert math.isclose(mixed.probability, 2 * (16 / 52) * (4 / 51) * (4 / 50))
+
+
+def test_allocation_weights():
+    strata = enumerate_initial_deals(StandardBlackjackSchema(), num_decks=1)[:3]
+
+    assert allocation_weights(strata, Allocation.FIXED) == [1.0, 1.0, 1.0]
+    assert allocation_weights(strata, Allocation.PROPORTIONAL) == [s.probability for s in strata]
+    assert allocation_weights(strata, Allocation.OPTIMAL, [0.0, 1.0, 2.0]) == [
+        0.0,
+        strata[1].probability,
+        strata[2].probability * 2,
+    ]
+    assert allocation_weights(strata, Allocation.OPTIMAL, [0.0] * 3) == [s.probability for s in strata]
+
+    with pytest.raises(ValueError, match="standard deviation"):
+        allocation_weights(strata, Allocation.OPTIMAL)
+
+
+def test_allocate_rounds_uses_largest_remainder():
+    assert allocate_rounds([1.0, 1.0, 2.0], 10) == [3, 3, 4]
+    assert allocate_rounds([0.0, 1.0], 5, minimum=0) == [0, 5]
+    assert sum(allocate_rounds([0.3, 0.3, 0.4], 7)) == 7
+
+    with pytest.raises(ValueError, match="Need at least 3 rounds"):
+        allocate_rounds([1.0, 1.0, 1.0], 2)
+
+
+def test_stack_top_deals_requested_ranks_in_order():
+    shoe = Shoe(StandardBlackjackSchema(), num_decks=1)
+    shoe.stack_top(["A", "10", "5"])
+
+    assert [shoe.deal_card().graph_rank for _ in range(3)] == ["A", "10", "5"]
+    assert shoe.cards_left() == 49
+
+    with pytest.raises(ValueError, match="No card of rank A"):
+        shoe.stack_top(["A"] * 4)
+
+
+def test_merge_scales_counts_by_weight():
+    source = StateTransitionGraph()
+    source.add_transition(PreDealState(), Action.NOOP, TerminalState(outcome=None), count=2)
+
+    graph = StateTransitionGraph()
+    graph.merge(source, weight=0.25)
+
+    assert graph.get_graph()[PreDealState()][Action.NOOP][TerminalState(outcome=None)] == 0.5
+
+
+def test_payout_std():
+    rules = StandardBlackjackRules()
+    graph = StateTransitionGraph()
+    assert payout_std(graph, rules) == 0.0
+
+    service = BlackjackService(player_strategy=AlwaysStandStrategy())
+    graph = service.play_games(num_rounds=50, printable=False)
+    assert 0.0 < payout_std(graph, rules) <= 1.5
+
+
+@pytest.mark.parametrize("allocation", [Allocation.FIXED, Allocation.PROPORTIONAL])
+def test_stratified_games_reweight_initial_deals_exactly(allocation):
+    service = BlackjackService(player_strategy=AlwaysStandStrategy())
+    graph = service.play_stratified_games(num_rounds=1100, allocation=allocation)
+
+    first_states = graph.get_graph()[PreDealState()][Action.NOOP]
+    assert math.isclose(sum(first_states.values()), 1100)
+
+    ace_up = sum(
+        count
+        for state, count in first_states.items()
+        if (state.dealer_upcard_rank if isinstance(state, ProperState) else state.dealer_upcard) == "A"
+    )
+    assert math.isclose(ace_up, 1100 / 13)
+
+
+def test_optimal_stratified_games_run_pilot_first():
+    service = BlackjackService(player_strategy=AlwaysStandStrategy())
+    graph = service.play_stratified_games(num_rounds=1200, allocation=Allocation.OPTIMAL, pilot_rounds=2)
+
+    first_states = graph.get_graph()[PreDealState()][Action.NOOP]
+    assert math.isclose(sum(first_states.values()), 1200)
+
+    with pytest.raises(ValueError, match="pilot"):
+        service.play_stratified_games(num_rounds=100, allocation=Allocation.OPTIMAL)
+
+
+def test_split_stratum_share_balances_parts():
+    share = StratumShare((3, 0, 5, 1), (3, 2, 5, 1), 9)
+
+    parts = split_stratum_share(share, 2)
+
+    assert [sum(counts) for counts in zip(*(part.round_counts for part in parts))] == [3, 0, 5, 1]
+    assert sorted(sum(part.round_counts) for part in parts) == [4, 5]
+    assert all(part.total_counts == share.total_counts and part.num_rounds == 9 for part in parts)
+
+
+@pytest.mark.parametrize("chunk_size, tree_merge", [(0, False), (300, False), (0, True)])
+def test_parallel_stratified_batches_share_one_allocation(chunk_size, tree_merge):
+    # Fewer rounds per batch than there are strata
+    graph = StateTransitionGraph()
+    run_parallel_batches(
+        num_decks=1,
+        num_rounds=1000,
+        no_shuffle_between=False,
+        no_print=True,
+        parallel=2,
+        main_graph=graph,
+        stratify="proportional",
+        chunk_size=chunk_size,
+        tree_merge=tree_merge,
+    )
+
+    first_states = graph.get_graph()[PreDealState()][Action.NOOP]
+    assert math.isclose(sum(first_states.values()), 1000)
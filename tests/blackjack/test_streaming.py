@@ -0,0 +1,53 @@
+import pytest
+
+from blackjack.blackjack_service import BlackjackService
+from blackjack.runner import iter_parallel_batches, split_into_chunks
+from tests.blackjack.conftest import rounds_in
+
+
+def test_play_games_iter_yields_chunk_deltas():
+    service = BlackjackService()
+
+    updates = list(service.play_games_iter(num_rounds=25, chunk_size=10))
+
+    assert [(u.rounds, u.rounds_played, u.total_rounds) for u in updates] == [(10, 10, 25), (10, 20, 25), (5, 25, 25)]
+    assert [rounds_in(u.graph) for u in updates] == [10, 10, 5]
+    assert len({id(u.graph) for u in updates}) == 3
+
+
+def test_play_games_iter_snapshots_accumulate_one_graph():
+    service = BlackjackService()
+
+    counts = [
+        (u.graph, rounds_in(u.graph)) for u in service.play_games_iter(num_rounds=25, chunk_size=10, snapshots=True)
+    ]
+
+    assert [count for _, count in counts] == [10, 20, 25]
+    assert len({id(graph) for graph, _ in counts}) == 1
+
+
+def test_play_games_iter_rejects_empty_chunks():
+    with pytest.raises(ValueError, match="at least one round"):
+        next(BlackjackService().play_games_iter(num_rounds=10, chunk_size=0))
+
+
+def test_parallel_updates_arrive_per_chunk():
+    batch_sizes = split_into_chunks(25, 10)
+
+    updates = list(iter_parallel_batches(num_decks=1, batch_sizes=batch_sizes, parallel=2))
+
+    assert batch_sizes == [10, 10, 5]
+    assert sorted(u.rounds for u in updates) == [5, 10, 10]
+    assert [u.rounds_played for u in updates][-1] == 25
+    assert sum(rounds_in(u.graph) for u in updates) == 25
+
+
+def test_parallel_snapshots_merge_into_one_graph():
+    updates = [
+        (u.graph, rounds_in(u.graph), u.rounds_played)
+        for u in iter_parallel_batches(num_decks=1, batch_sizes=[10, 10, 5], parallel=2, snapshots=True)
+    ]
+
+    assert [count for _, count, _ in updates] == [played for _, _, played in updates]
+    assert updates[-1][1] == 25
+    assert len({id(graph) for graph, _, _ in updates}) == 1
@@ -0,0 +1,127 @@
+import random
+
+import pytest
+from click.testing import CliRunner
+
+from blackjack.blackjack_service import BlackjackService
+from blackjack.cli import main
+from blackjack.entities.card import Card
+from blackjack.entities.state import PreDealState
+from blackjack.game_events import RoundResultEvent
+from blackjack.rules.standard import StandardBlackjackRules
+from blackjack.runner import run_summary_batches
+from blackjack.strategy.base import Strategy
+from blackjack.summary import OutcomeSummary, RunningStats
+from tests.blackjack.conftest import AlwaysDoubleStrategy, AlwaysStandStrategy
+
+
+class SplitAndDoubleStrategy(Strategy):
+    """Splits every pair and doubles every other hand it can, standing otherwise, so it never hits."""
+
+    def choose_action(self, hand, available_actions, game_state):
+        for name in ("SPLIT", "DOUBLE", "STAND"):
+            action = next((a for a in available_actions if a.name == name), None)
+            if action is not None:
+                return action
+        return available_actions[0]
+
+
+def test_merged_stats_match_one_stream():
+    values = [random.uniform(-2, 2) for _ in range(101)]
+    whole, first, second = RunningStats(), RunningStats(), RunningStats()
+    for value in values:
+        whole.add(value)
+    for value in values[:40]:
+        first.add(value)
+    for value in values[40:]:
+        second.add(value)
+
+    first.merge(second)
+    first.merge(RunningStats())
+
+    assert first.count == whole.count == 101
+    assert first.mean == pytest.approx(whole.mean)
+    assert first.variance == pytest.approx(whole.variance)
+
+
+def test_doubled_hands_pay_twice():
+    # Player 5, 6 and doubles into a 10 for 21; the dealer stands on 10, 7
+    cards = [Card("5", "♠"), Card("10", "♠"), Card("6", "♠"), Card("7", "♠"), Card("10", "♥")]
+    service = BlackjackService.create_null(player_strategy=AlwaysDoubleStrategy(), shoe_cards=list(reversed(cards)))
+
+    summary = service.play_summary_games(1)
+
+    assert summary.rounds == 1
+    assert summary.overall.mean == 2.0
+    assert dict(summary.frequencies()) == {("5", "6", "10"): 1.0}
+
+
+@pytest.mark.parametrize("num_seats", [1, 3])
+def test_summary_matches_the_graph_for_a_fixed_strategy(num_seats):
+    random.seed(42)
+    summary = BlackjackService(
+        num_decks=2, player_strategy=AlwaysStandStrategy(), num_seats=num_seats
+    ).play_summary_games(3000)
+
+    random.seed(42)
+    service = BlackjackService(num_decks=2, player_strategy=AlwaysStandStrategy(), num_seats=num_seats)
+    root = service.calculate_evs(service.play_games(3000, printable=False))[PreDealState()]
+
+    assert summary.rounds == root.total_count
+    assert summary.overall.mean == pytest.approx(root.action_evs[root.optimal_action])
+    assert sum(summary.frequencies().values()) == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("num_seats", [1, 3])
+def test_summary_sums_split_and_doubled_hands(num_seats):
+    random.seed(47)
+    summary = BlackjackService(
+        num_decks=2, player_strategy=SplitAndDoubleStrategy(), num_seats=num_seats
+    ).play_summary_games(2000)
+
+    results = []
+
+    def track(event):
+        # The dealer's result carries no outcome
+        if isinstance(event, RoundResultEvent) and event.outcome is not None:
+            results.append(event)
+
+    random.seed(47)
+    BlackjackService(
+        num_decks=2, player_strategy=SplitAndDoubleStrategy(), num_seats=num_seats, output_tracker=track
+    ).play_games(2000, printable=False)
+
+    # Without hits, a hand of three cards is a doubled one
+    rules = StandardBlackjackRules()
+    payouts = [rules.get_outcome_payout(e.outcome) * (2 if len(e.hand) == 3 else 1) for e in results]
+    assert len(results) > 2000 * num_seats
+    assert any(len(e.hand) == 3 for e in results)
+    assert summary.rounds == summary.overall.count == 2000 * num_seats
+    assert summary.overall.mean == pytest.approx(sum(payouts) / (2000 * num_seats))
+
+
+def test_summaries_merge_across_workers():
+    summary = run_summary_batches(num_decks=1, num_rounds=500, parallel=2, chunk_size=100)
+
+    assert isinstance(summary, OutcomeSummary)
+    assert summary.rounds == 500
+    assert sum(stats.count for stats in summary.by_initial_hand.values()) == 500
+
+
+def test_cli_prints_the_summary():
+    result = CliRunner().invoke(main, ["--num-rounds", "200", "--no-print", "--summary-only"])
+
+    assert result.exit_code == 0, result.output
+    assert "Rounds: 200" in result.output
+    assert "House edge:" in result.output
+
+
+def test_cli_rejects_graph_options_with_summary_only():
+    result = CliRunner().invoke(main, ["--num-rounds", "10", "--summary-only", "--graph-output-file", "graph.pkl"])
+
+    assert result.exit_code == 1
+
+
+def test_summaries_need_a_graph_free_game():
+    with pytest.raises(ValueError, match="outcome summary"):
+        BlackjackService(num_decks=1, branch_actions=True).play_summary_games(1)
@@ -0,0 +1,78 @@
+import csv
+
+from click.testing import CliRunner
+
+from blackjack import sweep
+from blackjack.cli import main
+from blackjack.sweep import (
+    SweepConfig,
+    expand_grid,
+    format_results_table,
+    play_config_chunk,
+    run_sweep,
+)
+from tests.blackjack.conftest import rounds_in
+
+
+def test_expand_grid_covers_every_combination():
+    configs = expand_grid([1, 6], [1, 3], [False, True], [False], [100])
+
+    assert len(configs) == 8
+    assert configs[0] == SweepConfig(1, 1, False, False, 100)
+    assert configs[0].rules().max_splits == 1
+
+
+def test_chunks_of_a_config_share_one_service(monkeypatch):
+    monkeypatch.setattr(sweep, "_worker_services", {})
+
+    first = play_config_chunk(SweepConfig(2, 3, False, False, 100), 30, None)
+    second = play_config_chunk(SweepConfig(2, 3, False, False, 500), 20, None)
+    play_config_chunk(SweepConfig(2, 1, False, False, 100), 10, None)
+
+    assert len(sweep._worker_services) == 2
+    assert rounds_in(first) == 30
+    assert rounds_in(second) == 20
+
+
+def test_run_sweep_reports_every_config_in_order():
+    configs = expand_grid([1, 2], [3], [False], [False], [150, 0])
+
+    results = run_sweep(configs, parallel=2, chunk_size=50)
+
+    assert [result.config for result in results] == configs
+    assert [result.hands for result in results] == [150, 0, 150, 0]
+    assert results[0].house_edge == -results[0].ev
+
+    table = format_results_table(results).splitlines()
+    assert table[0].split() == [
+        "num_decks",
+        "max_splits",
+        "resplit_aces",
+        "play_split_aces",
+        "num_rounds",
+        "hands",
+        "ev",
+        "house_edge",
+    ]
+    assert len(table) == 5
+
+
+def test_sweep_subcommand_writes_csv(tmp_path):
+    output_file = tmp_path / "sweep.csv"
+
+    result = CliRunner().invoke(
+        main,
+        ["sweep", "--num-decks", "1", "--max-splits", "1", "--max-splits", "2", "--num-rounds", "20", "--parallel", "1"]
+        + ["--output-file", str(output_file)],
+    )
+
+    assert result.exit_code == 0, result.output
+    with open(output_file) as f:
+        rows = list(csv.DictReader(f))
+    assert [row["max_splits"] for row in rows] == ["1", "2"]
+
+
+def test_plain_options_still_run_a_simulation():
+    result = CliRunner().invoke(main, ["--num-rounds", "2", "--no-print"])
+
+    assert result.exit_code == 0, result.output
@@ -0,0 +1,96 @@
+import pytest
+
+from blackjack.blackjack_service import BlackjackService
+from blackjack.entities.card import Card
+from blackjack.entities.state import Outcome, PreDealState
+from blackjack.game_events import GameEventType
+from blackjack.turn.action import Action
+from tests.blackjack.conftest import (
+    AlwaysHitStrategy,
+    AlwaysStandStrategy,
+    parse_final_hands_and_outcomes,
+)
+
+
+def test_seats_share_the_deal_and_one_dealer_hand():
+    shoe_cards = [
+        Card("10", "♠"),  # Seat 1 first
+        Card("10", "♣"),  # Seat 2 first
+        Card("9", "♣"),  # Dealer first
+        Card("9", "♦"),  # Seat 1 second (19)
+        Card("6", "♦"),  # Seat 2 second (16)
+        Card("7", "♣"),  # Dealer second (16)
+        Card("10", "♥"),  # Dealer hits and busts
+    ]
+    event_log = []
+    service = BlackjackService.create_null(
+        shoe_cards=list(reversed(shoe_cards)),
+        player_strategy=AlwaysStandStrategy(),
+        output_tracker=event_log.append,
+        num_seats=2,
+    )
+
+    graph = service.play_games(printable=False)
+
+    deals = [(e.to, e.card) for e in event_log if e.event_type == GameEventType.DEAL]
+    assert deals == [
+        ("Player 1", Card("10", "♠")),
+        ("Player 2", Card("10", "♣")),
+        ("Dealer", Card("9", "♣")),
+        ("Player 1", Card("9", "♦")),
+        ("Player 2", Card("6", "♦")),
+        ("Dealer", Card("7", "♣")),
+    ]
+    assert [e.player for e in event_log if e.event_type == GameEventType.HIT] == ["Dealer"]
+
+    hands, outcomes = parse_final_hands_and_outcomes(event_log)
+    assert outcomes["Player 1"] == Outcome.WIN
+    assert outcomes["Player 2"] == Outcome.WIN
+    assert hands["Dealer"] == [Card("9", "♣"), Card("7", "♣"), Card("10", "♥")]
+
+    assert sum(graph.get_graph()[PreDealState()][Action.NOOP].values()) == 2
+
+
+def test_dealer_does_not_draw_when_every_seat_busts():
+    shoe_cards = [
+        Card("10", "♠"),
+        Card("10", "♣"),
+        Card("9", "♣"),
+        Card("6", "♦"),
+        Card("5", "♦"),
+        Card("7", "♣"),  # Dealer 16
+        Card("10", "♥"),  # Seat 1 busts
+        Card("10", "♦"),  # Seat 2 busts
+        Card("2", "♥"),
+    ]
+    event_log = []
+    service = BlackjackService.create_null(
+        shoe_cards=list(reversed(shoe_cards)),
+        player_strategy=AlwaysHitStrategy(),
+        output_tracker=event_log.append,
+        num_seats=2,
+    )
+
+    service.play_games(printable=False)
+
+    hands, outcomes = parse_final_hands_and_outcomes(event_log)
+    assert outcomes["Player 1"] == Outcome.LOSE
+    assert outcomes["Player 2"] == Outcome.LOSE
+    assert hands["Dealer"] == [Card("9", "♣"), Card("7", "♣")]
+
+
+def test_full_table_records_every_seat_in_one_graph():
+    service = BlackjackService(num_decks=2, num_seats=7)
+
+    graph = service.play_games(num_rounds=50, printable=False)
+
+    assert sum(graph.get_graph()[PreDealState()][Action.NOOP].values()) == 350
+    assert service.calculate_evs(graph)[PreDealState()].total_count == 350
+
+
+@pytest.mark.parametrize("num_seats, branch_actions", [(0, False), (8, False), (2, True)])
+def test_rejects_invalid_tables(num_seats, branch_actions):
+    service = BlackjackService(num_seats=num_seats, branch_actions=branch_actions)
+
+    with pytest.raises(ValueError):
+        service.play_games(printable=False)
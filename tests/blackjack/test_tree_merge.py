@@ -0,0 +1,54 @@
+import os
+import pickle
+
+from blackjack.entities.state import PreDealState, TerminalState
+from blackjack.entities.state_transition_graph import StateTransitionGraph
+from blackjack.runner import merge_graph_files, run_parallel_batches, tree_merge_batches
+from blackjack.turn.action import Action
+from tests.blackjack.conftest import rounds_in
+
+
+def write_graph(path, count):
+    graph = StateTransitionGraph()
+    graph.add_transition(PreDealState(), Action.NOOP, TerminalState(outcome=None), count=count)
+    with open(path, "wb") as f:
+        pickle.dump(graph, f)
+    return str(path)
+
+
+def test_merge_graph_files_merges_into_the_first(tmp_path):
+    first = write_graph(tmp_path / "first.graph", 2)
+    second = write_graph(tmp_path / "second.graph", 3)
+
+    assert merge_graph_files(first, second) == first
+
+    assert not os.path.exists(second)
+    with open(first, "rb") as f:
+        assert rounds_in(pickle.load(f)) == 5
+
+
+def test_tree_merge_combines_every_batch():
+    graph = tree_merge_batches(num_decks=1, batch_sizes=[10, 10, 10, 10, 5], parallel=2)
+
+    assert rounds_in(graph) == 45
+
+
+def test_tree_merge_of_nothing_is_empty():
+    assert not tree_merge_batches(num_decks=1, batch_sizes=[], parallel=2).get_graph()
+
+
+def test_run_parallel_batches_with_tree_merge_keeps_the_starting_graph():
+    main_graph = StateTransitionGraph()
+    main_graph.add_transition(PreDealState(), Action.NOOP, TerminalState(outcome=None), count=7)
+
+    run_parallel_batches(
+        num_decks=1,
+        num_rounds=40,
+        no_shuffle_between=False,
+        no_print=True,
+        parallel=4,
+        main_graph=main_graph,
+        tree_merge=True,
+    )
+
+    assert rounds_in(main_graph) == 47
@@ -4,7 +4,9 @@ from blackjack.cli import BlackjackService
 from blackjack.entities.card import Card
 from blackjack.entities.state import Outcome
 from blackjack.game_events import GameEventType
+from blackjack.rules.standard import StandardBlackjackRules
 from blackjack.strategy.base import Strategy
+from blackjack.strategy.strategy import StandardDealerStrategy
 from blackjack.turn.action import Action
 from tests.blackjack.conftest import (
     AlwaysDoubleStrategy,
@@ -927,3 +929,61 @@ def test_take_turn_handler_player_double_multiple_rounds():
     hands, outcomes = parse_final_hands_and_outcomes(event_log)
     # Both rounds should result in wins
     assert len([o for o in outcomes.values() if o == Outcome.WIN]) >= 1
+
+
+class SteppedDealerStrategy(StandardDealerStrategy):
+    dealer_rules = None
+
+
+@pytest.mark.parametrize(
+    "dealer_cards",
+    [
+        ["9", "8"],  # Stands at once
+        ["6", "5", "10"],  # Hits to 21
+        ["6", "2", "3", "4", "4"],  # Hits through 15 to 19
+        ["10", "6", "9"],  # Busts
+    ],
+)
+def test_dealer_kernel_matches_stepped_dealer_turn(dealer_cards):
+    player_cards = ["10", "9"]
+    first_four = [player_cards[0], dealer_cards[0], player_cards[1], dealer_cards[1]]
+    shoe_cards = [Card(rank, "♠") for rank in first_four + dealer_cards[2:]]
+
+    results = []
+    for dealer_strategy in (StandardDealerStrategy(), SteppedDealerStrategy()):
+        event_log = []
+        cli = BlackjackService.create_null(
+            shoe_cards=list(reversed(shoe_cards)),
+            player_strategy=AlwaysStandStrategy(),
+            dealer_strategy=dealer_strategy,
+            output_tracker=event_log.append,
+        )
+        graph = cli.play_games(printable=False)
+        results.append((event_log, graph.get_graph()))
+
+    assert results[0] == results[1]
+
+
+class HitSeventeenRules(StandardBlackjackRules):
+    def dealer_should_hit(self, hand):
+        return self.hand_value(hand).value < 18
+
+
+def test_dealer_kernel_hits_by_the_dealer_strategys_rules():
+    # The game's rules stand on 17, but the dealer strategy's rules hit it
+    shoe_cards = [Card(rank, "♠") for rank in ["10", "10", "9", "7", "2"]]
+
+    results = []
+    for dealer_strategy in (StandardDealerStrategy(HitSeventeenRules()), SteppedDealerStrategy(HitSeventeenRules())):
+        event_log = []
+        cli = BlackjackService.create_null(
+            shoe_cards=list(reversed(shoe_cards)),
+            player_strategy=AlwaysStandStrategy(),
+            dealer_strategy=dealer_strategy,
+            output_tracker=event_log.append,
+        )
+        graph = cli.play_games(printable=False)
+        results.append((event_log, graph.get_graph()))
+
+    assert results[0] == results[1]
+    assert any(e.event_type == GameEventType.HIT and e.player == "Dealer" for e in results[0][0])